@@ -0,0 +1,3 @@
+"""
+Offline performance benchmarks (CPU only, no models, no Ollama): see benchmarks/run.py.
+"""
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_audio import speech_like, to_pcm16, write_wav
+from client.classes.FileProcessor import FileProcessor
+from client.classes.MicrophoneProcessor import MicrophoneProcessor
+
+
+class ReplaySource:
+    """
+    Capture source that plays back an int16 array `speed` times faster than real time,
+    then signals `finished` and keeps delivering silence.
+    """
+
+    def __init__(self, audio, sample_rate=16000, speed=1.0, frames_per_buffer=1024):
+        self.audio = audio.reshape(-1, 1)
+        self.sample_rate = sample_rate
+        self.speed = speed
+        self.frames_per_buffer = frames_per_buffer
+        self.finished = threading.Event()
+        self._position = 0
+        self._started = None
+
+    def open(self):
+        self._started = time.perf_counter()
+
+    def read(self):
+        # Pace the blocks like a sound card would (sped up by `speed`).
+        due = self._started + (self._position + self.frames_per_buffer) / self.sample_rate / self.speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        block = self.audio[self._position:self._position + self.frames_per_buffer]
+        self._position += self.frames_per_buffer
+        if len(block) < self.frames_per_buffer:
+            self.finished.set()
+            block = np.concatenate([block, np.zeros((self.frames_per_buffer - len(block), 1), dtype=np.int16)])
+        return block
+
+    def close(self):
+        pass
+
+
+def run_file(stt_address, llm_url, work_dir, audio_sec=300, max_in_flight=4, seed=0, sample_rate=16000):
+    """
+    File mode end to end: FileProcessor on a synthetic `audio_sec`-second WAV file
+    (segmentation, concurrent STT requests, map-reduce summary).
+    """
+    path = os.path.join(work_dir, f"bench_{audio_sec}s.wav")
+    write_wav(path, speech_like(audio_sec, sample_rate, seed=seed), sample_rate)
+
+    processor = FileProcessor(stt_address=stt_address, sample_rate=sample_rate,
+                              llm_endpoint=f"{llm_url}/summarize_transcript",
+                              output_file=os.path.join(work_dir, "bench_file_summary.md"),
+                              max_in_flight=max_in_flight, resume=False)
+    start = time.perf_counter()
+    processor.process_file(path, "meeting")
+    wall_sec = time.perf_counter() - start
+    return {
+        "config": {"audio_sec": audio_sec, "max_in_flight": max_in_flight},
+        "wall_sec": round(wall_sec, 3),
+        "rtf": round(wall_sec / audio_sec, 4),
+        **processor.metrics.summary(),
+    }
+
+
+def run_live(stt_address, llm_url, work_dir, audio_sec=60, speed=4.0, summarize_interval_sec=20, seed=1,
+             sample_rate=16000):
+    """
+    Live mode end to end: MicrophoneProcessor fed by a ReplaySource running `speed` times
+    faster than real time. Its stage spans show how long each segment waited and took to
+    transcribe and how long the summaries took, i.e. how far the notes lag behind the audio.
+    """
+    source = ReplaySource(to_pcm16(speech_like(audio_sec, sample_rate, seed=seed)), sample_rate, speed)
+    processor = MicrophoneProcessor(stt_address=stt_address, sample_rate=sample_rate,
+                                    llm_endpoint=f"{llm_url}/process_text",
+                                    output_file=os.path.join(work_dir, "bench_live_summary.md"), source=source)
+    processor.summarize_interval_sec = summarize_interval_sec
+
+    loop = threading.Thread(target=processor.start, daemon=True)
+    start = time.perf_counter()
+    loop.start()
+    source.finished.wait()
+    # Flush the audio after the last cut, wait until every segment is transcribed, then stop.
+    processor.capture.stop()
+    processor.audio_queue.join()
+    processor.stop()
+    loop.join()
+
+    stages = processor.metrics.summary()
+    return {
+        "config": {"audio_sec": audio_sec, "speed": speed, "summarize_interval_sec": summarize_interval_sec},
+        "wall_sec": round(time.perf_counter() - start, 3),
+        "segments": stages["stages"].get("stt", {}).get("count", 0),
+        "dropped_sec": round(processor.capture.dropped_frames / sample_rate, 2),
+        **stages,
+    }
@@ -0,0 +1,190 @@
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER = (
+    "the team agreed to move the review to next week and asked for an updated budget "
+    "before the council votes on the proposal while the open questions about the timeline "
+    "stay with the project lead"
+).split()
+
+
+class FakeOllama:
+    """
+    Local stand-in for Ollama's `/api/generate`, so the LLM side can be benchmarked offline.
+
+    A request takes `latency_sec` plus the prompt at `prompt_tokens_per_sec` plus the answer at
+    `tokens_per_sec`, and at most `parallel` requests are served at once (like OLLAMA_NUM_PARALLEL);
+    the rest wait. Prompts asking for CHUNK_PART/UPDATED_CONTEXT get an answer in that format,
+    "in around N tokens" prompts get N tokens, anything else `response_tokens`. Streaming
+    (`"stream": true`) answers with NDJSON lines like Ollama does. Tokens are counted as words.
+
+    Like Ollama, every answer carries a `context` (token ids of prompt and answer) that a later
+    request can send back to continue from, and each of the `parallel` slots keeps the tokens of
+    its last request: only the part of a prompt after the longest prefix shared with a cached
+    slot is evaluated, and that is what `prompt_eval_count` reports.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_sec=0.05, tokens_per_sec=200.0,
+                 prompt_tokens_per_sec=2000.0, response_tokens=150, parallel=4):
+        """
+        :param host: Interface to listen on.
+        :param port: Port to listen on (0 = any free port, see `url`).
+        :param latency_sec: Fixed time before the first token.
+        :param tokens_per_sec: Generation speed.
+        :param prompt_tokens_per_sec: Prompt evaluation speed.
+        :param response_tokens: Answer length for prompts that do not ask for one.
+        :param parallel: Requests served at the same time.
+        """
+        self.latency_sec = latency_sec
+        self.tokens_per_sec = tokens_per_sec
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.response_tokens = response_tokens
+        self._slots = threading.Semaphore(parallel)
+        self._lock = threading.Lock()
+        self._vocab = {}
+        self._cache = deque(maxlen=parallel)
+        self.reset_stats()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": "llama3.1:latest"}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                fake._generate(self, body)
+
+            def _send_json(self, data):
+                payload = json.dumps(data).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {"requests": 0, "prompt_tokens": 0, "prefill_tokens": 0, "response_tokens": 0,
+                           "max_concurrent": 0}
+            self._active = 0
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _answer(self, prompt):
+        # Answers differ from prompt to prompt (like a real rolling context does).
+        offset = len(prompt) % len(FILLER)
+        words = iter(FILLER[offset:] + FILLER * 1000)
+        requested = re.search(r"in around (\d+) tokens", prompt)
+        if "CHUNK_PART" in prompt:
+            part = " ".join(next(words) for _ in range(self.response_tokens))
+            context = " ".join(next(words) for _ in range(self.response_tokens // 3))
+            return f"CHUNK_PART\n## Discussion\n* {part}\n---\nUPDATED_CONTEXT\n{context}"
+        n_tokens = int(requested.group(1)) if requested else self.response_tokens
+        return " ".join(next(words) for _ in range(n_tokens))
+
+    def _ids(self, words):
+        return [self._vocab.setdefault(word, len(self._vocab)) for word in words]
+
+    def _prefill(self, sequence):
+        """
+        Tokens of `sequence` not covered by the longest prefix it shares with a cached slot.
+        """
+        shared = 0
+        for cached in self._cache:
+            common = 0
+            for a, b in zip(cached, sequence):
+                if a != b:
+                    break
+                common += 1
+            shared = max(shared, common)
+        return len(sequence) - shared
+
+    def _generate(self, handler, body):
+        prompt = body.get("prompt", "")
+        answer = self._answer(prompt)
+        prompt_tokens = len(prompt.split())
+        tokens = answer.split(" ")
+
+        with self._slots:
+            with self._lock:
+                sequence = list(body.get("context") or []) + self._ids(prompt.split())
+                prefill_tokens = self._prefill(sequence)
+                sequence += self._ids(tokens)
+                self._cache.append(sequence)
+                self._active += 1
+                self._stats["requests"] += 1
+                self._stats["prompt_tokens"] += prompt_tokens
+                self._stats["prefill_tokens"] += prefill_tokens
+                self._stats["response_tokens"] += len(tokens)
+                self._stats["max_concurrent"] = max(self._stats["max_concurrent"], self._active)
+            try:
+                start = time.perf_counter()
+                time.sleep(self.latency_sec + prefill_tokens / self.prompt_tokens_per_sec)
+                final = {"model": body.get("model", ""), "done": True, "prompt_eval_count": prefill_tokens,
+                         "eval_count": len(tokens), "context": sequence}
+
+                if not body.get("stream", True):
+                    time.sleep(len(tokens) / self.tokens_per_sec)
+                    final["response"] = answer
+                    final["total_duration"] = int((time.perf_counter() - start) * 1e9)
+                    handler._send_json(final)
+                    return
+
+                handler.send_response(200)
+                handler.send_header("Content-Type", "application/x-ndjson")
+                handler.send_header("Transfer-Encoding", "chunked")
+                handler.end_headers()
+                for i, token in enumerate(tokens):
+                    time.sleep(1 / self.tokens_per_sec)
+                    text = token if i == 0 else " " + token
+                    self._write_chunk(handler, {"model": body.get("model", ""), "response": text, "done": False})
+                final["response"] = ""
+                final["total_duration"] = int((time.perf_counter() - start) * 1e9)
+                self._write_chunk(handler, final)
+                handler.wfile.write(b"0\r\n\r\n")
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+    @staticmethod
+    def _write_chunk(handler, data):
+        line = (json.dumps(data) + "\n").encode("utf-8")
+        handler.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        handler.wfile.flush()
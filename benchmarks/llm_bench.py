@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+from benchmarks.fake_ollama import FILLER
+from benchmarks.report import latency_stats
+from llm.llm_client import LLMClient
+from common.metrics import Metrics
+from llm.summarizer import Summarizer
+
+
+def words(n, offset=0):
+    """
+    `n` words of filler text, starting `offset` words into the filler.
+    """
+    return " ".join(FILLER[(offset + i) % len(FILLER)] for i in range(n))
+
+
+def transcript(n_words, words_per_line=40):
+    """
+    A transcript of `n_words` words, one line per segment like FileProcessor writes it.
+    """
+    return "\n".join(words(min(words_per_line, n_words - start), start)
+                     for start in range(0, n_words, words_per_line))
+
+
+def run(fake, **kwargs):
+    """
+    Run `measure` on its own event loop.
+    """
+    return asyncio.run(measure(fake, **kwargs))
+
+
+async def measure(fake, chunks=8, chunk_words=600, history_summaries=30, summary_words=400, transcript_words=15000,
+                  file_type="meeting"):
+    """
+    Latency of the Summarizer's three jobs against a FakeOllama:
+      - process_chunk: `chunks` consecutive chunks with a rolling context (the live path; tokens
+        prefilled by Ollama), then the same with process_chunk_stream (time to the first piece of summary),
+      - reduce_history: shrinking `history_summaries` summaries of `summary_words` words (rounds and calls),
+      - map_reduce_summary: a whole `transcript_words`-word transcript (the file path).
+    """
+    config = {"chunks": chunks, "chunk_words": chunk_words, "history_summaries": history_summaries,
+              "summary_words": summary_words, "transcript_words": transcript_words,
+              "ollama_latency_sec": fake.latency_sec, "ollama_tokens_per_sec": fake.tokens_per_sec}
+    summarizer = Summarizer(metrics=Metrics("llm"), llm_client=LLMClient([fake.url]))
+    results = {"config": config}
+
+    # Live path: one chunk after the other, each with the context returned by the previous one.
+    fake.reset_stats()
+    context = file_type
+    latencies = []
+    parsed = 0
+    for index in range(chunks):
+        start = time.perf_counter()
+        chunk_part, updated_context = await summarizer.process_chunk(words(chunk_words, index), context, file_type,
+                                                               "bench", index)
+        latencies.append(time.perf_counter() - start)
+        # Unparsed answers come back whole, delimiters included.
+        parsed += int(bool(chunk_part) and "UPDATED_CONTEXT" not in chunk_part)
+        context = updated_context
+    results["process_chunk"] = {
+        "latency": latency_stats(latencies),
+        "parsed": parsed,
+        "prompt_tokens": fake.stats()["prompt_tokens"],
+        "prefill_tokens": fake.stats()["prefill_tokens"],
+    }
+
+    # The same chunks streamed: time to the first piece of summary vs. the whole answer.
+    fake.reset_stats()
+    context = file_type
+    first_pieces = []
+    latencies = []
+    for index in range(chunks):
+        start = time.perf_counter()
+        first_piece = None
+        async for event in summarizer.process_chunk_stream(words(chunk_words, index), context, file_type, "bench", index):
+            if event["type"] == "chunk_part" and first_piece is None:
+                first_piece = time.perf_counter() - start
+            elif event["type"] == "done":
+                context = event["updated_context"]
+        latencies.append(time.perf_counter() - start)
+        if first_piece is not None:
+            first_pieces.append(first_piece)
+    results["process_chunk_stream"] = {
+        "first_piece": latency_stats(first_pieces),
+        "latency": latency_stats(latencies),
+        "prefill_tokens": fake.stats()["prefill_tokens"],
+    }
+
+    # Final report path: shrink a long history under FINAL_SUMMARY_THRESHOLD.
+    fake.reset_stats()
+    rounds_before = summarizer.metrics.summary()["stages"].get("reduce_round", {}).get("count", 0)
+    history = [words(summary_words, i) for i in range(history_summaries)]
+    start = time.perf_counter()
+    reduced = await summarizer.reduce_history(history)
+    results["reduce_history"] = {
+        "wall_sec": round(time.perf_counter() - start, 3),
+        "rounds": summarizer.metrics.summary()["stages"].get("reduce_round", {}).get("count", 0) - rounds_before,
+        "llm_requests": fake.stats()["requests"],
+        "input_tokens": summarizer._count_tokens(" ".join(history)),
+        "output_tokens": summarizer._count_tokens(" ".join(reduced)),
+    }
+
+    # File path: map-reduce over a whole transcript.
+    fake.reset_stats()
+    start = time.perf_counter()
+    _, sections = await summarizer.map_reduce_summary(transcript(transcript_words), file_type, "bench")
+    stats = fake.stats()
+    results["map_reduce_summary"] = {
+        "wall_sec": round(time.perf_counter() - start, 3),
+        "sections": len(sections),
+        "llm_requests": stats["requests"],
+        "max_concurrent": stats["max_concurrent"],
+    }
+
+    results["stages"] = summarizer.metrics.summary()["stages"]
+    results["tokens"] = summarizer.metrics.summary()["tokens"]
+    await summarizer.llm_client.aclose()
+    return results
@@ -0,0 +1,95 @@
+import math
+
+# Metrics where a larger value is better; every other timing/count metric is better when smaller.
+HIGHER_IS_BETTER = ("throughput", "audio_sec_per_sec")
+LOWER_IS_BETTER = ("_ms", "_sec", "rtf", "calls", "rounds", "requests", "prefill_tokens")
+
+
+def latency_stats(seconds):
+    """
+    count/mean/p50/p90/p99/max of a list of durations in seconds, reported in milliseconds.
+    """
+    values = sorted(seconds)
+    if not values:
+        return {"count": 0}
+
+    def percentile(q):
+        # Nearest-rank percentile.
+        return values[max(0, math.ceil(q * len(values)) - 1)]
+
+    return {
+        "count": len(values),
+        "mean_ms": round(1000 * sum(values) / len(values), 2),
+        "p50_ms": round(1000 * percentile(0.50), 2),
+        "p90_ms": round(1000 * percentile(0.90), 2),
+        "p99_ms": round(1000 * percentile(0.99), 2),
+        "max_ms": round(1000 * values[-1], 2),
+    }
+
+
+def flatten(results, prefix=""):
+    """
+    {"a": {"b": 1}} -> {"a.b": 1}, numbers only. "config" sections (the settings of a run) are skipped.
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if key == "config":
+            continue
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def direction(name):
+    """
+    +1 if larger is better, -1 if smaller is better, 0 for informational values (counts, sizes).
+    """
+    leaf = name.rsplit(".", 1)[-1]
+    if any(marker in leaf for marker in HIGHER_IS_BETTER):
+        return 1
+    if leaf in ("p50", "p99", "mean") or any(leaf.endswith(marker) for marker in LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(baseline, current, tolerance=0.15, min_abs_ms=5.0):
+    """
+    Compare two result dicts metric by metric.
+
+    :param tolerance: Relative change that counts as a regression (0.15 = 15% worse).
+    :param min_abs_ms: Millisecond metrics that moved less than this are noise, not regressions.
+    :return: (list of (name, baseline, current, relative change, status) rows, number of regressions)
+    """
+    old, new = flatten(baseline), flatten(current)
+    rows = []
+    regressions = 0
+    for name in sorted(old.keys() & new.keys()):
+        sign = direction(name)
+        if sign == 0:
+            continue
+        before, after = old[name], new[name]
+        change = (after - before) / abs(before) if before else (0.0 if after == before else math.inf)
+        worse = -sign * change
+        if name.endswith("_ms") and abs(after - before) < min_abs_ms:
+            status = "same"
+        elif worse > tolerance:
+            status = "REGRESSION"
+            regressions += 1
+        elif worse < -tolerance:
+            status = "better"
+        else:
+            status = "same"
+        rows.append((name, before, after, change, status))
+    return rows, regressions
+
+
+def print_comparison(rows, regressions, tolerance):
+    print(f"\n--- Comparison with baseline (tolerance {tolerance:.0%}) ---")
+    for name, before, after, change, status in rows:
+        if status != "same":
+            print(f"  {status:10} {name:60} {before:>12.4g} -> {after:>12.4g} ({change:+.1%})")
+    unchanged = sum(1 for row in rows if row[4] == "same")
+    print(f"{len(rows)} metrics compared, {unchanged} within tolerance, {regressions} regressions")
@@ -0,0 +1,152 @@
+"""
+Reproducible performance benchmarks that run offline on CPU.
+
+The STT service runs in-process with the simulated backend (no model, a fixed real-time
+factor), the LLM service runs in-process against FakeOllama (a local /api/generate with a
+fixed latency and token rate), and all audio is synthetic and seeded. Results are written as
+JSON so two versions can be compared:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+
+Suites: "stt" (gRPC service throughput and real-time factor), "llm" (Summarizer latency and
+reduction rounds) and "client" (file and live pipelines end to end). With --compare, the
+exit status is 1 if any metric got worse than the baseline by more than --tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import client_bench, llm_bench, stt_bench
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.report import compare, print_comparison
+from benchmarks.services import LLMServer, STTServer
+
+SUITES = ("stt", "llm", "client")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.contextmanager
+def quiet(enabled):
+    # The services and processors print every transcription and span; keep the report readable.
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def run_suites(args, work_dir):
+    results = {}
+    fake = FakeOllama(latency_sec=args.ollama_latency, tokens_per_sec=args.ollama_tokens_per_sec,
+                      parallel=args.ollama_parallel).start()
+    try:
+        if "stt" in args.suites:
+            print("[benchmarks] stt ...", file=sys.stderr)
+            with quiet(not args.verbose):
+                results["stt"] = stt_bench.run(streams=args.streams, audio_sec=args.audio_sec,
+                                               rtf=args.model_rtf, seed=args.seed)
+
+        if "llm" in args.suites:
+            print("[benchmarks] llm ...", file=sys.stderr)
+            with quiet(not args.verbose):
+                results["llm"] = llm_bench.run(fake)
+
+        if "client" in args.suites:
+            print("[benchmarks] client ...", file=sys.stderr)
+            stt_server = STTServer(backend_options={"rtf": args.model_rtf}).start()
+            llm_server = LLMServer(fake.url).start()
+            try:
+                with quiet(not args.verbose):
+                    results["client"] = {
+                        "file": client_bench.run_file(stt_server.address, llm_server.url, work_dir,
+                                                      audio_sec=args.file_audio_sec, seed=args.seed),
+                        "live": client_bench.run_live(stt_server.address, llm_server.url, work_dir,
+                                                      audio_sec=args.live_audio_sec, speed=args.live_speed,
+                                                      seed=args.seed + 1),
+                    }
+            finally:
+                llm_server.stop()
+                stt_server.stop()
+    finally:
+        fake.stop()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks.")
+    parser.add_argument("--suites", nargs="+", default=list(SUITES), choices=SUITES)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare the results with")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Relative change counted as a regression")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic audio")
+    parser.add_argument("--streams", type=int, default=4, help="Concurrent STT streams")
+    parser.add_argument("--audio-sec", type=float, default=120, help="Audio per STT stream (seconds)")
+    parser.add_argument("--model-rtf", type=float, default=0.05, help="Real-time factor of the simulated model")
+    parser.add_argument("--file-audio-sec", type=float, default=300, help="Length of the file-mode recording")
+    parser.add_argument("--live-audio-sec", type=float, default=60, help="Length of the live-mode recording")
+    parser.add_argument("--live-speed", type=float, default=4.0, help="Live-mode playback speed (x real time)")
+    parser.add_argument("--ollama-latency", type=float, default=0.05, help="Fake Ollama time to first token")
+    parser.add_argument("--ollama-tokens-per-sec", type=float, default=400.0, help="Fake Ollama generation speed")
+    parser.add_argument("--ollama-parallel", type=int, default=4, help="Requests the fake Ollama serves at once")
+    parser.add_argument("--verbose", action="store_true", help="Show the services' own output")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Summaries, WAV files and LLM scratch files go to a throwaway directory.
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as work_dir:
+        os.chdir(work_dir)
+        try:
+            start = time.perf_counter()
+            results = run_suites(args, work_dir)
+            total_sec = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "verbose")},
+        "total_sec": round(total_sec, 1),
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[benchmarks] Results written to {output}", file=sys.stderr)
+
+    if baseline is not None:
+        if baseline.get("config") != report["config"]:
+            print("[benchmarks] Warning: the baseline was run with different settings", file=sys.stderr)
+        rows, regressions = compare(baseline["results"], results, tolerance=args.tolerance)
+        with contextlib.redirect_stdout(sys.stderr):
+            print_comparison(rows, regressions, args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import asyncio
+import socket
+import threading
+import time
+
+import grpc
+
+from stt.classes.AudioStreamServicer import AudioStreamServicer
+from stt.classes.InferenceExecutor import InferenceExecutor
+from common.metrics import Metrics
+from stt.classes.STT import STT
+from stt.proto_repo import audio_pb2_grpc
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class STTServer:
+    """
+    The STT gRPC service (STT + AudioStreamServicer on an InferenceExecutor, wired like
+    stt/app.py) running in-process on its own event loop thread.
+    """
+
+    def __init__(self, backend="simulated", model_size="base", backend_options=None, vad_mode="energy",
+                 workers=8, max_queue=32, cache_entries=0):
+        self.metrics = Metrics("stt")
+        self.stt = STT(backend=backend, model_size=model_size, max_batch_size=workers, vad_mode=vad_mode,
+                       backend_options=backend_options, cache_entries=cache_entries, metrics=self.metrics)
+        self.executor = InferenceExecutor(max_workers=workers, max_queue=max_queue)
+        self.port = free_port()
+        self.address = f"127.0.0.1:{self.port}"
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        ready = threading.Event()
+
+        async def serve():
+            server = grpc.aio.server()
+            audio_pb2_grpc.add_AudioStreamServicer_to_server(
+                AudioStreamServicer(stt_function=self.stt.transcribe, executor=self.executor, metrics=self.metrics),
+                server)
+            server.add_insecure_port(self.address)
+            await server.start()
+            ready.set()
+            # Poll instead of waking the loop from another thread: grpc.aio does not always notice that.
+            while not self._stop_event.is_set():
+                await asyncio.sleep(0.05)
+            await server.stop(grace=1)
+
+        self._thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.executor.shutdown()
+        self.stt.scheduler.stop()
+
+
+class LLMServer:
+    """
+    The LLM FastAPI service (llm/app.py) running in-process under uvicorn, with its
+    Summarizer pointed at `ollama_url` (e.g. a FakeOllama).
+    """
+
+    def __init__(self, ollama_url):
+        import uvicorn
+        from llm import app as llm_app, llm_processing
+        from llm.llm_client import LLMClient
+
+        llm_app.llm_client = llm_processing.summarizer.llm_client = LLMClient([ollama_url])
+        self.metrics = llm_processing.metrics
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(uvicorn.Config(llm_app.app, host="127.0.0.1", port=self.port,
+                                                     log_level="warning"))
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join()
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from benchmarks.report import latency_stats
+from benchmarks.services import STTServer
+from benchmarks.synthetic_audio import speech_like, to_pcm16
+from client.classes.STTClient import STTClient
+
+
+def run(streams=4, audio_sec=120, segment_sec=10, rtf=0.05, vad="energy", workers=8, seed=0, sample_rate=16000):
+    """
+    Throughput and latency of the STT gRPC service: `streams` concurrent sessions, each
+    sending `audio_sec` seconds of synthetic speech as `segment_sec` segments one after
+    the other (like the live processors), against the simulated model.
+
+    :param rtf: Real-time factor of the simulated model.
+    :param vad: VAD mode of the service ("energy", "webrtc" or "off").
+    :param workers: Inference threads (and the maximum batch size).
+    """
+    config = {"streams": streams, "audio_sec": audio_sec, "segment_sec": segment_sec, "model_rtf": rtf,
+              "vad": vad, "workers": workers}
+    server = STTServer(backend_options={"rtf": rtf}, vad_mode=None if vad == "off" else vad,
+                       workers=workers).start()
+    client = STTClient(server.address, encoding="int16", sample_rate=sample_rate)
+
+    segment_samples = int(segment_sec * sample_rate)
+    audio = [to_pcm16(speech_like(audio_sec, sample_rate, seed=seed + i)) for i in range(streams)]
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def stream(index):
+        session = client.session(session_id=f"bench-{index}")
+        try:
+            for start in range(0, len(audio[index]), segment_samples):
+                sent = time.perf_counter()
+                session.submit(audio[index][start:start + segment_samples]).result()
+                with lock:
+                    latencies.append(time.perf_counter() - sent)
+        except Exception as e:
+            errors.append(repr(e))
+        finally:
+            session.close()
+
+    try:
+        # One warm-up segment, so model loading is not part of the measurement.
+        client.transcribe(audio[0][:segment_samples])
+
+        threads = [threading.Thread(target=stream, args=(i,)) for i in range(streams)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_sec = time.perf_counter() - start
+    finally:
+        client.close()
+        server.stop()
+
+    total_audio_sec = streams * audio_sec
+    return {
+        "config": config,
+        "errors": len(errors),
+        "wall_sec": round(wall_sec, 3),
+        "audio_sec_per_sec": round(total_audio_sec / wall_sec, 2),
+        "segment_latency": latency_stats(latencies),
+        **server.metrics.summary(),
+        "vad_skipped_ratio": round(server.stt.vad_stats()["skipped_ratio"], 3),
+    }
@@ -0,0 +1,60 @@
+import wave
+
+import numpy as np
+
+
+def speech_like(duration_sec, sample_rate=16000, seed=0):
+    """
+    Deterministic speech-like test audio (mono float32 in [-1, 1]): utterances of 1-6 s made
+    of voiced "syllables" (a few harmonics of a wandering pitch, amplitude modulated at
+    ~4 Hz) separated by pauses of 0.3-1.5 s, over a faint noise floor.
+
+    It is not intelligible speech, but it has what the pipeline reacts to: loud voiced
+    stretches for the VAD and real pauses for the segmenters to cut at.
+
+    :param duration_sec: Length of the audio in seconds.
+    :param sample_rate: Sample rate (Hz).
+    :param seed: Random seed; the same seed always gives the same samples.
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = int(duration_sec * sample_rate)
+    audio = (rng.standard_normal(n_samples) * 0.001).astype(np.float32)
+
+    position = 0
+    while position < n_samples:
+        utterance = int(rng.uniform(1.0, 6.0) * sample_rate)
+        end = min(n_samples, position + utterance)
+        t = np.arange(end - position) / sample_rate
+
+        pitch = rng.uniform(90, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.2, 0.6) * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3.0, 5.0) * t), 0, None) ** 0.5
+        audio[position:end] += (0.15 * voiced * syllables).astype(np.float32)
+
+        position = end + int(rng.uniform(0.3, 1.5) * sample_rate)
+
+    return np.clip(audio, -1.0, 1.0)
+
+
+def silence(duration_sec, sample_rate=16000, seed=0):
+    """
+    Near-silent audio (a faint noise floor), float32.
+    """
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(duration_sec * sample_rate)) * 0.001).astype(np.float32)
+
+
+def to_pcm16(audio):
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def write_wav(path, audio, sample_rate=16000):
+    """
+    Write float32 audio as a mono 16-bit WAV file.
+    """
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(to_pcm16(audio).tobytes())
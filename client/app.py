@@ -1,8 +1,16 @@
 import os
+import sys
+
+# Shared modules (common/) live next to the service directories.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from classes.FileProcessor import FileProcessor
 from classes.MicrophoneProcessor import MicrophoneProcessor
 from classes.SystemAudioProcessor import SystemAudioProcessor
 
+# Set CLIENT_LOG_SPANS=1 to print every timing span with its session and chunk ids.
+CLIENT_LOG_SPANS = os.environ.get("CLIENT_LOG_SPANS", "0") == "1"
+
 # MEDIA_FILE = "resources/2024-07-17 Council Meeting.mp3"       # Shorter meeting audio file
 # MEDIA_FILE = "resources/2024-08-20 Planning Meeting.mp3"      # Big
 # MEDIA_FILE = "resources/ASP.mp4"                              # Lecture
@@ -44,8 +52,9 @@ def main():
             stt_address=stt_address,
             chunk_sec=5,
             sample_rate=16000,
-            llm_endpoint="http://localhost:8001/process_text",
-            output_file="C:/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/Audio_file_processing.md"
+            llm_endpoint="http://localhost:8001/summarize_transcript",
+            output_file="C:/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/Audio_file_processing.md",
+            log_spans=CLIENT_LOG_SPANS
         )
         processor.process_file(MEDIA_FILE, chosen_file_type)
 
@@ -56,9 +65,10 @@ def main():
             chunk_sec=10,
             sample_rate=16000,
             channels=1,
-            llm_endpoint="http://localhost:8001/process_text",
+            llm_endpoint="http://localhost:8001/process_text_stream",
             file_type=chosen_file_type,
-            output_file="C:/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/Microphone_realtime_processing.md"
+            output_file="C:/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/Microphone_realtime_processing.md",
+            log_spans=CLIENT_LOG_SPANS
         )
         try:
             mic_proc.start()  # blocks until user Ctrl+C or smt
@@ -73,9 +83,10 @@ def main():
             stt_address=stt_address,
             chunk_sec=10,
             sample_rate=16000,
-            llm_endpoint="http://localhost:8001/process_text",
+            llm_endpoint="http://localhost:8001/process_text_stream",
             file_type=chosen_file_type,
-            output_file="C:/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/System_audio_realtime_processing.md"
+            output_file="C:/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/System_audio_realtime_processing.md",
+            log_spans=CLIENT_LOG_SPANS
         )
         try:
             sys_proc.start()  # blocks
@@ -0,0 +1,170 @@
+"""
+Non-interactive batch processing of recordings.
+
+Processes every recording in one or more directories (or listed in a manifest) through the
+STT and LLM services, several files at a time, and writes each summary next to its input.
+
+    python -m client.batch recordings/ --file-type meeting --concurrency 4
+    python -m client.batch manifest.jsonl
+
+A manifest is a JSON-lines file with one recording per line:
+    {"path": "2024-07-17 Council Meeting.mp3", "file_type": "meeting"}
+Relative paths are resolved against the manifest's directory; `file_type` defaults to --file-type.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from client.classes.FileProcessor import FileProcessor
+from client.classes.MediaDecoder import MediaDecoder
+
+MEDIA_EXTENSIONS = {
+    ".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg", ".opus", ".wma",
+    ".mp4", ".mkv", ".mov", ".avi", ".webm"
+}
+FILE_TYPES = ("meeting", "lecture", "call")
+# Set CLIENT_LOG_SPANS=1 to print every timing span with its session and chunk ids.
+CLIENT_LOG_SPANS = os.environ.get("CLIENT_LOG_SPANS", "0") == "1"
+
+
+def find_jobs(inputs, default_file_type, recursive=False):
+    """
+    Expand directories, manifests and single files into a list of (path, file_type) jobs.
+    A file listed more than once is processed once, with the file type of its last listing
+    (so a manifest can override the default type of a directory scan).
+    """
+    jobs = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS:
+                        jobs.append((os.path.join(root, name), default_file_type))
+                if not recursive:
+                    break
+        elif item.endswith(".jsonl"):
+            base_dir = os.path.dirname(os.path.abspath(item))
+            with open(item, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    path = os.path.join(base_dir, entry["path"])
+                    jobs.append((path, entry.get("file_type", default_file_type)))
+        else:
+            jobs.append((item, default_file_type))
+
+    unique = {}
+    for path, file_type in jobs:
+        if file_type not in FILE_TYPES:
+            raise ValueError(f"Unknown file type {file_type!r} for {path} (expected one of {', '.join(FILE_TYPES)})")
+        unique[os.path.abspath(path)] = file_type
+    return list(unique.items())
+
+
+def output_path(file_path, suffix):
+    return os.path.splitext(file_path)[0] + suffix
+
+
+def run_job(file_path, file_type, args):
+    """
+    Process one recording. Returns (status, seconds of audio or None, wall-clock seconds), where
+    the status is "ok", or "degraded" if the summary was written without some segments or
+    without the LLM (see FileProcessor.process_file).
+    """
+    processor = FileProcessor(
+        stt_address=args.stt_address,
+        llm_endpoint=args.llm_endpoint,
+        output_file=output_path(file_path, args.output_suffix),
+        max_in_flight=args.max_in_flight,
+        max_segment_sec=args.max_segment_sec,
+        segment_timeout_sec=args.segment_timeout_sec,
+        resume=not args.no_resume,
+        log_spans=CLIENT_LOG_SPANS
+    )
+    duration = MediaDecoder().duration_sec(file_path)
+    start_time = time.monotonic()
+    problems = processor.process_file(file_path, file_type)
+    return "degraded" if problems else "ok", duration, time.monotonic() - start_time
+
+
+def print_report(results, wall_sec):
+    """
+    Per-file results plus the overall throughput in audio hours per wall-clock hour.
+    """
+    print("\n--- Batch Report ---")
+    audio_sec = 0.0
+    unknown = 0
+    counts = {"ok": 0, "degraded": 0, "failed": 0}
+    for path, (status, duration, elapsed) in results.items():
+        counts[status] += 1
+        if duration:
+            audio_sec += duration
+            length = f"{duration / 60:.1f} min audio"
+        else:
+            unknown += 1
+            length = "unknown length"
+        print(f"  {status:8} {path} ({length}, {elapsed:.0f}s)")
+
+    print(f"Files: {counts['ok']} ok, {counts['degraded']} degraded, {counts['failed']} failed")
+    print(f"Audio: {audio_sec / 3600:.2f} h" + (f" (+{unknown} files of unknown length)" if unknown else ""))
+    print(f"Wall clock: {wall_sec / 3600:.2f} h")
+    if wall_sec > 0:
+        print(f"Throughput: {audio_sec / wall_sec:.1f} audio hours per wall-clock hour")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe and summarize a batch of recordings.")
+    parser.add_argument("inputs", nargs="+", help="Directories, .jsonl manifests or media files")
+    parser.add_argument("--file-type", default="meeting", choices=FILE_TYPES,
+                        help="File type for inputs without one in the manifest")
+    parser.add_argument("--recursive", action="store_true", help="Also look in subdirectories")
+    parser.add_argument("--concurrency", type=int, default=2, help="Files processed at the same time")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="STT requests in flight per file")
+    parser.add_argument("--max-segment-sec", type=float, default=30, help="Maximum segment length")
+    parser.add_argument("--segment-timeout-sec", type=float, default=300,
+                        help="Deadline of one STT call; calls that run over are retried")
+    parser.add_argument("--stt-address", default="localhost:50051",
+                        help="STT service address (comma-separated for several)")
+    parser.add_argument("--llm-endpoint", default="http://localhost:8001/summarize_transcript")
+    parser.add_argument("--output-suffix", default=".summary.md",
+                        help="Summary file name: input name without extension + this suffix")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore and overwrite existing job journals")
+    args = parser.parse_args(argv)
+
+    jobs = find_jobs(args.inputs, args.file_type, args.recursive)
+    if not jobs:
+        print("No recordings found.")
+        return 0
+    # Largest files first, so a long recording does not start last and stretch the whole batch.
+    jobs.sort(key=lambda job: os.path.getsize(job[0]) if os.path.exists(job[0]) else 0, reverse=True)
+    print(f"Processing {len(jobs)} recordings, {args.concurrency} at a time ...")
+
+    results = {}
+    start_time = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {pool.submit(run_job, path, file_type, args): path for path, file_type in jobs}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                status, duration, elapsed = future.result()
+                results[path] = (status, duration, elapsed)
+                if status == "ok":
+                    print(f"[batch] Done: {path} -> {output_path(path, args.output_suffix)}")
+                else:
+                    print(f"[batch] Degraded: {path} -> {output_path(path, args.output_suffix)} "
+                          "(incomplete; run again to retry)")
+            except Exception as e:
+                results[path] = ("failed", None, 0.0)
+                print(f"[batch] Failed: {path}: {e}")
+
+    print_report(results, time.monotonic() - start_time)
+    # Degraded files count as failures, so an unattended run with a service down does not exit 0.
+    return 1 if any(status != "ok" for status, _, _ in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
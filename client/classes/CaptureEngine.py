@@ -0,0 +1,241 @@
+import threading
+import time
+
+import numpy as np
+
+from .Segmenter import Segment, Segmenter
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+try:
+    import soundcard as sc
+except ImportError:
+    sc = None
+
+
+class MicrophoneSource:
+    """
+    Microphone input through PyAudio, read as 16-bit PCM.
+    """
+
+    def __init__(self, sample_rate=16000, channels=1, frames_per_buffer=1024):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self._pyaudio = None
+        self._stream = None
+
+    def open(self):
+        if pyaudio is None:
+            raise RuntimeError("Microphone capture needs the 'pyaudio' package")
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer
+        )
+        print("Capturing from microphone...")
+
+    def read(self):
+        """
+        Return the next block as an int16 array of shape (frames, channels).
+        """
+        data = self._stream.read(self.frames_per_buffer, exception_on_overflow=False)
+        return np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+
+    def close(self):
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pyaudio:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+
+
+class LoopbackSource:
+    """
+    System playback audio (WASAPI loopback) through soundcard, read as float32.
+    """
+
+    def __init__(self, sample_rate=16000, channels=1, frames_per_buffer=1024):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self._recorder = None
+
+    def open(self):
+        if sc is None:
+            raise RuntimeError("System audio capture needs the 'soundcard' package")
+        # Use the default loopback microphone for capturing system audio.
+        loopback_mic = sc.default_microphone()
+        print(f"Capturing system audio from: {loopback_mic.name}")
+        self._recorder = loopback_mic.recorder(samplerate=self.sample_rate,
+                                               channels=self.channels,
+                                               blocksize=self.frames_per_buffer)
+        self._recorder.__enter__()
+
+    def read(self):
+        """
+        Return the next block as a float32 array of shape (frames, channels).
+        """
+        return self._recorder.record(numframes=self.frames_per_buffer)
+
+    def close(self):
+        if self._recorder:
+            self._recorder.__exit__(None, None, None)
+            self._recorder = None
+
+
+class CaptureEngine:
+    """
+    Captures audio from a source into a preallocated int16 ring buffer and cuts it at
+    pauses into segments whose data are views into the ring (no copies, no per-read
+    allocations besides the source's own block).
+
+    The ring is followed by a mirror of its first `max_segment_sec` seconds, so any segment
+    is contiguous in memory even when it wraps around the end. A segment's view stays valid
+    until the consumer calls `release(segment)`; if the consumer falls so far behind that
+    the ring is full, new blocks are dropped (and counted) instead of overwriting audio
+    that is still in use.
+    """
+
+    def __init__(self, source, sample_rate=16000, channels=1, max_segment_sec=30, min_segment_sec=None,
+                 buffer_sec=300, metrics=None, session_id=None):
+        """
+        :param source: Audio source with open(), read() -> (frames, channels) array, and close().
+        :param sample_rate: Sample rate of the source (Hz).
+        :param channels: Number of channels of the source.
+        :param max_segment_sec: Longest segment handed out.
+        :param min_segment_sec: Segments are not cut at pauses before this point (default: half the maximum).
+        :param buffer_sec: Ring size: how much audio may be waiting to be consumed before blocks are dropped.
+        :param metrics: Optional Metrics receiving a "capture" span (segmentation time) per segment.
+        :param session_id: Session id for the span logs.
+        """
+        self.source = source
+        self.metrics = metrics
+        self.session_id = session_id
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.segmenter = Segmenter(sample_rate=sample_rate, channels=channels,
+                                   max_segment_sec=max_segment_sec, min_segment_sec=min_segment_sec)
+
+        self.max_frames = self.segmenter.max_frames
+        self.capacity = max(int(buffer_sec * sample_rate), 2 * self.max_frames)
+        self._buffer = np.zeros((self.capacity + self.max_frames, channels), dtype=np.int16)
+
+        # Absolute frame positions since the start of the capture.
+        self._written = 0           # frames written by the capture thread
+        self._segmented = 0         # start of the segment being collected
+        self._released = 0          # everything before this may be overwritten (set by the consumer)
+        self._next_index = 0
+        self.dropped_frames = 0
+
+        self._on_segment = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _store(self, start, block):
+        # Write `block` at ring index `start` (no wrap), keeping the mirror of the ring's head in sync.
+        end = start + len(block)
+        self._buffer[start:end] = block
+        if start < self.max_frames:
+            mirror_end = min(end, self.max_frames)
+            self._buffer[self.capacity + start:self.capacity + mirror_end] = block[:mirror_end - start]
+
+    def write(self, block):
+        """
+        Append a block of audio (int16, or float in [-1, 1]) to the ring and hand out the
+        segments it completes. Called from the capture thread.
+        """
+        block = block.reshape(len(block), self.channels)
+        if block.dtype != np.int16:
+            block = (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+
+        n = len(block)
+        if self._written + n - self._released > self.capacity:
+            # The consumer is too far behind; drop the block rather than overwrite unconsumed audio.
+            if self.dropped_frames == 0:
+                print("[CaptureEngine] Buffer full, dropping audio until the consumer catches up")
+            self.dropped_frames += n
+            return
+
+        position = self._written % self.capacity
+        first = min(n, self.capacity - position)
+        self._store(position, block[:first])
+        if first < n:
+            self._store(0, block[first:])
+        self._written += n
+
+        while True:
+            start = time.perf_counter()
+            window = self.view(self._segmented, min(self._written - self._segmented, self.max_frames))
+            cut = self.segmenter.next_cut(window)
+            if cut is None:
+                break
+            if self.metrics:
+                self.metrics.observe_stage("capture", time.perf_counter() - start, self.session_id, self._next_index)
+            self._emit(cut)
+
+    def view(self, start, n_frames):
+        """
+        Contiguous view of `n_frames` (at most max_segment_sec) starting at absolute frame `start`.
+        """
+        position = start % self.capacity
+        return self._buffer[position:position + n_frames]
+
+    def _emit(self, n_frames):
+        segment = Segment(
+            index=self._next_index,
+            offset_sec=self._segmented / self.sample_rate,
+            duration_sec=n_frames / self.sample_rate,
+            data=self.view(self._segmented, n_frames)
+        )
+        self._segmented += n_frames
+        self._next_index += 1
+        self._on_segment(segment)
+
+    def release(self, segment):
+        """
+        Mark `segment` (and everything before it) as consumed, so its part of the ring can be reused.
+        """
+        end = round((segment.offset_sec + segment.duration_sec) * self.sample_rate)
+        # A plain int store is atomic; only the consumer thread moves this forward.
+        self._released = max(self._released, end)
+
+    def start(self, on_segment):
+        """
+        Open the source and start capturing in a background thread.
+        :param on_segment: Called (from the capture thread) with every complete Segment.
+        """
+        self._on_segment = on_segment
+        self._stop_event.clear()
+        self.source.open()
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def _capture_loop(self):
+        while not self._stop_event.is_set():
+            self.write(self.source.read())
+        print("[CaptureEngine] Stopped capturing.")
+
+    def stop(self):
+        """
+        Stop capturing, hand out the remaining audio as a last segment and close the source.
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        remaining = self._written - self._segmented
+        self.segmenter.reset()
+        if remaining > 0:
+            self._emit(remaining)
+        self.source.close()
+        if self.dropped_frames:
+            print(f"[CaptureEngine] Dropped {self.dropped_frames / self.sample_rate:.1f}s of audio in total")
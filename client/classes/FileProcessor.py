@@ -1,8 +1,13 @@
 import os
-import numpy as np
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pydub import AudioSegment
-from pydub.utils import make_chunks
-from .stt_client import transcribe_chunk_via_grpc
+from .stt_client import get_stt_client
+from .MediaDecoder import MediaDecoder
+from .Segmenter import Segmenter
+from .JobJournal import JobJournal
+from common.metrics import Metrics
 import requests
 
 class FileProcessor:
@@ -10,75 +15,280 @@ class FileProcessor:
                  stt_address="localhost:50051",
                  chunk_sec=5,
                  sample_rate=16000,
-                 llm_endpoint="http://localhost:8001/process_text",
-                 output_file="/mnt/c/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/Realtime_processing.md"):
+                 max_segment_sec=30,
+                 llm_endpoint="http://localhost:8001/summarize_transcript",
+                 output_file="/mnt/c/Users/Windows11/Desktop/A/AquamarineML/NeuralMeet/Realtime_processing.md",
+                 max_in_flight=4,
+                 max_retries=3,
+                 retry_backoff_sec=1.0,
+                 segment_timeout_sec=300,
+                 resume=True,
+                 journal_dir=None,
+                 log_spans=False):
         """
-        :param stt_address: Host:port for the STT microservice.
-        :param chunk_sec: Duration of each chunk in seconds.
+        :param stt_address: Host:port for the STT microservice (comma-separated for several).
+        :param chunk_sec: Duration of each decoded block in seconds.
         :param sample_rate: Sample rate (in Hz) to convert the file to.
-        :param llm_endpoint: Endpoint URL for the LLM microservice.
+        :param max_segment_sec: Maximum length of a transcribed segment; segments are cut at pauses
+                                (Whisper's window is 30s, shorter segments are padded anyway).
+        :param llm_endpoint: Map-reduce summarization endpoint of the LLM microservice.
         :param output_file: Full path where the final summary will be written.
+        :param max_in_flight: Maximum number of chunks being transcribed at the same time.
+        :param max_retries: Attempts per chunk before giving up on it.
+        :param retry_backoff_sec: Delay before the first retry; doubled on every further attempt.
+        :param segment_timeout_sec: Deadline of one STT call; a call that runs over fails with
+                                    DEADLINE_EXCEEDED and is retried like any other error.
+        :param resume: Keep a journal of finished segments and skip them when the same file is processed again.
+        :param journal_dir: Directory for the journals (default: next to the input file).
+        :param log_spans: Print every timing span (otherwise only the p50/p99 summary at the end).
         """
         self.stt_address = stt_address
         self.chunk_sec = chunk_sec
         self.sample_rate = sample_rate
+        self.max_segment_sec = max_segment_sec
         self.llm_endpoint = llm_endpoint
         self.output_file = output_file
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.retry_backoff_sec = retry_backoff_sec
+        self.segment_timeout_sec = segment_timeout_sec
+        self.resume = resume
+        self.journal_dir = journal_dir
+
+        # Timing spans (STT round trip per segment, LLM call), logged with a per-file session id.
+        self.metrics = Metrics("client", log_spans=log_spans)
+        self.session_id = None
+
+    def _transcribe_with_retry(self, stt_client, index, chunk_data):
+        """
+        Transcribe one segment, retrying with exponential backoff (e.g. when the STT
+        service is busy and answers RESOURCE_EXHAUSTED, or a hung call hits its deadline).
+        Returns None if all attempts fail.
+        """
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                with self.metrics.span("stt", self.session_id, index):
+                    return stt_client.transcribe(chunk_data, timeout=self.segment_timeout_sec,
+                                                 session_id=self.session_id)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Error transcribing chunk #{index + 1} (giving up after {attempt} attempts): {e}")
+                    return None
+                delay = self.retry_backoff_sec * 2 ** (attempt - 1)
+                print(f"Error transcribing chunk #{index + 1} (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def _transcribe_chunks(self, segments, total_sec=None, journal=None):
+        """
+        Transcribe segments with up to `max_in_flight` requests running at once.
+
+        :param segments: Iterable of Segment objects (raw int16 bytes plus position), in order.
+        :param total_sec: Duration of the file in seconds, if known (used for the progress/ETA readout).
+        :param journal: JobJournal; segments it already has are skipped and new ones are recorded in it.
+        :return: (list of transcriptions in segment order, number of segments that failed).
+                 Failed segments are empty in the list.
+        """
+        # Pooled client: the channels to the STT service are reused for every chunk.
+        stt_client = get_stt_client(self.stt_address, encoding="int16", sample_rate=self.sample_rate)
+
+        results = {}
+        start_time = time.monotonic()
+        done_sec = 0.0
+        resumed_sec = 0.0
+        failed = 0
+
+        def report(segment):
+            # Segments have different lengths, so progress is measured in seconds of audio.
+            elapsed = time.monotonic() - start_time
+            progress = f"{done_sec:.0f}/{total_sec:.0f}s" if total_sec else f"{done_sec:.0f}s"
+            eta = ""
+            transcribed_sec = done_sec - resumed_sec
+            if total_sec and transcribed_sec:
+                remaining = elapsed / transcribed_sec * max(0.0, total_sec - done_sec)
+                eta = f", ETA {int(remaining // 60)}m{int(remaining % 60):02d}s"
+            print(f"Segment #{segment.index + 1} ({segment.offset_sec:.1f}s, {segment.duration_sec:.1f}s long) done "
+                  f"({progress}, {elapsed:.0f}s elapsed{eta}): {results[segment.index]}")
+
+        def collect(futures):
+            nonlocal done_sec, failed
+            for future in futures:
+                segment = in_flight.pop(future)
+                transcription = future.result()
+                failed += transcription is None
+                if transcription is not None and journal:
+                    journal.record_segment(segment, transcription)
+                results[segment.index] = transcription or ""
+                done_sec += segment.duration_sec
+
+                report(segment)
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            in_flight = {}
+            reused = []
+            for segment in segments:
+                if journal and segment.index in journal.segments:
+                    if journal.matches(segment):
+                        # Transcribed by an earlier run of this job.
+                        results[segment.index] = journal.segments[segment.index]
+                        reused.append(segment)
+                        done_sec += segment.duration_sec
+                        resumed_sec += segment.duration_sec
+                        continue
+                    # The audio is cut differently than in the earlier run: its texts belong to other
+                    # audio. Start the journal over, keeping the segments that did match.
+                    print(f"Segment #{segment.index + 1} no longer matches the journal; starting the journal over.")
+                    texts = {seg.index: results[seg.index] for seg in reused}
+                    journal.restart()
+                    for seg in reused:
+                        journal.record_segment(seg, texts[seg.index])
+                # Keep at most max_in_flight requests outstanding.
+                if len(in_flight) >= self.max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = pool.submit(self._transcribe_with_retry, stt_client, segment.index, segment.data)
+                in_flight[future] = segment
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        # Wall-clock transcription time per second of audio (with max_in_flight segments in parallel).
+        self.metrics.observe_rtf(time.monotonic() - start_time, done_sec - resumed_sec, kind="file")
+        if resumed_sec:
+            print(f"Reused {resumed_sec:.0f}s of audio transcribed by an earlier run.")
+        # Reassemble in the original order.
+        return [results[index] for index in range(len(results))], failed
+
+    @staticmethod
+    def _decoder_name():
+        return "ffmpeg" if MediaDecoder.available() else "pydub"
+
+    def _decode_chunks(self, file_path):
+        """
+        Return (iterator of raw int16 blocks of chunk_sec seconds, duration in seconds or None).
+
+        With ffmpeg installed the file is decoded as a stream, so memory stays flat and
+        transcription starts right away. Otherwise pydub loads the whole file first.
+        """
+        if self._decoder_name() == "ffmpeg":
+            decoder = MediaDecoder(sample_rate=self.sample_rate, block_sec=self.chunk_sec)
+            return decoder.blocks(file_path), decoder.duration_sec(file_path)
+
+        # Fallback: load the whole file using pydub and convert to mono 16-bit PCM at the target sample rate.
+        audio = AudioSegment.from_file(file_path)
+        audio = audio.set_frame_rate(self.sample_rate).set_channels(1).set_sample_width(2)
+        raw = audio.raw_data
+        block_bytes = int(self.sample_rate * self.chunk_sec) * 2
+        blocks = (raw[i:i + block_bytes] for i in range(0, len(raw), block_bytes))
+        return blocks, audio.duration_seconds
+
+    def _segments(self, file_path):
+        """
+        Return (iterator of Segments cut at pauses, duration in seconds or None).
+        """
+        blocks, duration = self._decode_chunks(file_path)
+        return self._segmenter().segments(blocks), duration
+
+    def _segmenter(self):
+        return Segmenter(sample_rate=self.sample_rate, max_segment_sec=self.max_segment_sec)
+
+    def _open_journal(self, file_path):
+        """
+        Open the job journal of `file_path` (or return None if resuming is off).
+        The settings tie it to this exact file, decoding and segmentation, so a change in any
+        of them starts over.
+        """
+        if not self.resume:
+            return None
+        st = os.stat(file_path)
+        settings = {
+            "file": os.path.abspath(file_path),
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            "sample_rate": self.sample_rate,
+            "chunk_sec": self.chunk_sec,
+            "decoder": self._decoder_name(),
+            "segmenter": self._segmenter().settings
+        }
+        return JobJournal(JobJournal.path_for(file_path, self.journal_dir), settings).open()
 
     def process_file(self, file_path: str, file_type: str):
+        """
+        Transcribe and summarize `file_path` and write the summary to `output_file`.
+
+        If segments could not be transcribed or the LLM call failed, whatever was produced
+        (at worst the raw transcript) is still written, and the problems are returned.
+        :return: List of problems; empty if the summary is complete.
+        """
         print(f"Processing file: {file_path} as {file_type} ...")
+        self.session_id = uuid.uuid4().hex[:8]
+        journal = self._open_journal(file_path)
+        problems = []
+        try:
+            final_summary = journal.summaries.get(file_type) if journal else None
+            if final_summary is None:
+                final_summary, problems = self._transcribe_and_summarize(file_path, file_type, journal)
+            else:
+                print("This file was already summarized; reusing the summary from the journal.")
+        finally:
+            if journal:
+                journal.close()
 
-        # 1. Load the audio file using pydub.
-        audio = AudioSegment.from_file(file_path)
-        # Convert to mono and target sample rate.
-        audio = audio.set_frame_rate(self.sample_rate).set_channels(1)
-
-        # 2. Break the audio into chunks (chunk_sec seconds per chunk; pydub works in ms).
-        chunk_length_ms = self.chunk_sec * 1000
-        chunks = make_chunks(audio, chunk_length_ms)
-
-        all_transcriptions = []
-
-        # 3. Process each chunk:
-        for i, chunk in enumerate(chunks):
-            print(f"Processing chunk #{i + 1}/{len(chunks)} ...")
-            # Get the raw samples (as int16), convert to float32 and normalize to [-1, 1]
-            samples = np.array(chunk.get_array_of_samples())
-            samples = samples.astype(np.float32) / 32768.0
-            # Convert the samples to bytes.
-            chunk_data = samples.tobytes()
-
-            # Call the STT microservice to transcribe this chunk.
-            transcription = transcribe_chunk_via_grpc(
-                audio_chunk=chunk_data,
-                stt_address=self.stt_address
-            )
-            print(f"Chunk #{i + 1} transcription: {transcription}")
-            all_transcriptions.append(transcription)
-
-        # 4. Combine all chunk transcriptions into a full transcript.
+        print(f"\n--- Final Summary ({file_type}) ---\n{final_summary}\n")
+
+        # 6. Write the final summary to the output file.
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            f.write(final_summary)
+        self.metrics.log_summary()
+        for problem in problems:
+            print(f"Warning: {problem}")
+        return problems
+
+    def _transcribe_and_summarize(self, file_path, file_type, journal):
+        """
+        Steps 1-5: return (final summary of `file_path`, list of problems). The summary is the
+        transcript if the LLM call fails; failed segments are missing from it.
+        """
+        # 1-2. Decode the file into mono 16-bit PCM and cut it at pauses into segments of up to max_segment_sec.
+        segments, duration = self._segments(file_path)
+
+        # 3. Transcribe the segments, several at a time, while the next ones are still being decoded.
+        # The raw int16 samples are sent as they are (half the size of float32);
+        # the STT service converts them to float32 itself.
+        length = f"{duration:.0f}s of audio" if duration else "the audio"
+        print(f"Transcribing {length} in segments of up to {self.max_segment_sec}s, "
+              f"up to {self.max_in_flight} at a time ...")
+        all_transcriptions, failed_segments = self._transcribe_chunks(segments, total_sec=duration, journal=journal)
+        problems = []
+        if failed_segments:
+            problems.append(f"{failed_segments} of {len(all_transcriptions)} segments could not be transcribed")
+
+        # 4. Combine all segment transcriptions into a full transcript.
         full_text = "\n".join(all_transcriptions)
         print(f"\n--- Full Transcript ({file_type}) ---\n{full_text}\n")
 
-        # 5. Now send the full transcript to the LLM microservice for final processing.
+        # 5. Now send the full transcript to the LLM microservice, which summarizes it in sections
+        # concurrently and combines the section summaries into the final report.
         payload = {
             "text": full_text,
             "user_options": {"file_type": file_type},
-            "rolling_context": file_type  # initial context is just the file type
+            "session_id": self.session_id
         }
         try:
-            resp = requests.post(self.llm_endpoint, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            final_summary = data.get("chunk_summary", full_text)
+            with self.metrics.span("llm", self.session_id, "summary"):
+                resp = requests.post(self.llm_endpoint, json=payload)
+                resp.raise_for_status()
+                data = resp.json()
+            final_summary = data.get("final_summary")
         except Exception as e:
             print(f"Error calling LLM service: {e}")
-            final_summary = full_text
-
-        print(f"\n--- Final Summary ({file_type}) ---\n{final_summary}\n")
-
-        # 6. Write the final summary to the output file.
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            f.write(final_summary)
-
+            final_summary = None
 
+        if not final_summary:
+            # Not journaled: the next run retries the LLM with the transcript from the journal.
+            problems.append("the LLM service did not return a summary; the output is the raw transcript")
+            return full_text, problems
+        # Only a summary of the complete transcript is journaled; with failed segments the next run retries them.
+        if journal and len(journal.segments) == len(all_transcriptions):
+            journal.record_summary(file_type, final_summary)
+        return final_summary, problems
@@ -0,0 +1,140 @@
+import json
+import math
+import os
+import threading
+
+
+class JobJournal:
+    """
+    Append-only JSON-lines journal of a file processing job, so an interrupted job can be resumed.
+
+    The first line is a header with the job settings (and the size/mtime of the input file);
+    every further line records one finished segment transcription or a final summary.
+    Each line is flushed and fsync'ed as it is written, so a crash loses at most the line
+    being written. If the settings of a new run differ from the header, or a segment of the
+    new run does not sit where the journaled one did, the old journal is discarded and the
+    job starts over.
+    """
+
+    def __init__(self, path, settings):
+        """
+        :param path: Journal file path.
+        :param settings: JSON-serializable dict of everything that changes the segments (file, sample rate, ...).
+        """
+        self.path = path
+        self.settings = settings
+        self.segments = {}      # segment index -> transcription
+        self.positions = {}     # segment index -> (offset_sec, duration_sec)
+        self.summaries = {}     # file type -> final summary
+        self._lock = threading.Lock()
+        self._file = None
+        self._partial_line = False
+
+    @staticmethod
+    def path_for(file_path, journal_dir=None):
+        """
+        Journal path for `file_path`: next to it, or in `journal_dir` if given.
+        """
+        name = os.path.basename(file_path) + ".journal.jsonl"
+        return os.path.join(journal_dir or os.path.dirname(os.path.abspath(file_path)), name)
+
+    def open(self):
+        """
+        Load the finished work of a previous run (if its settings match) and open the journal for appending.
+        :return: self
+        """
+        if os.path.exists(self.path) and self._load():
+            print(f"[JobJournal] Resuming from {self.path}: {len(self.segments)} segments already transcribed")
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._partial_line:
+                # Terminate the line a crash cut short, so the next entry starts on its own line.
+                self._file.write("\n")
+        else:
+            self._start()
+        return self
+
+    def _start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._write({"type": "header", "settings": self.settings})
+
+    def restart(self):
+        """
+        Discard everything journaled so far and start a new journal with the same settings.
+        """
+        self.close()
+        self.segments = {}
+        self.positions = {}
+        self.summaries = {}
+        self._start()
+
+    def matches(self, segment):
+        """
+        True if `segment` was journaled at the same position (offset and duration) it has now.
+        """
+        position = self.positions.get(segment.index)
+        return position is not None and all(math.isclose(a, b, abs_tol=1e-6) for a, b in
+                                            zip(position, (segment.offset_sec, segment.duration_sec)))
+
+    def _load(self):
+        """
+        Read an existing journal. Returns False if it belongs to other settings (or is unreadable).
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+        lines = content.splitlines()
+        self._partial_line = bool(content) and not content.endswith("\n")
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return False
+        if header.get("type") != "header" or header.get("settings") != self.settings:
+            print(f"[JobJournal] Settings changed, starting over: {self.path}")
+            return False
+
+        segments = {}
+        positions = {}
+        summaries = {}
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; everything before it is still valid.
+                continue
+            if entry.get("type") == "segment":
+                segments[entry["index"]] = entry["text"]
+                positions[entry["index"]] = (entry["offset_sec"], entry["duration_sec"])
+            elif entry.get("type") == "summary":
+                summaries[entry["file_type"]] = entry["text"]
+
+        self.segments = segments
+        self.positions = positions
+        self.summaries = summaries
+        return True
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_segment(self, segment, text):
+        """
+        Persist the transcription of a finished segment.
+        """
+        self.segments[segment.index] = text
+        self.positions[segment.index] = (segment.offset_sec, segment.duration_sec)
+        self._write({"type": "segment", "index": segment.index, "offset_sec": segment.offset_sec,
+                     "duration_sec": segment.duration_sec, "text": text})
+
+    def record_summary(self, file_type, text):
+        """
+        Persist the final summary (one per file type, the transcript is shared).
+        """
+        self.summaries[file_type] = text
+        self._write({"type": "summary", "file_type": file_type, "text": text})
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,73 @@
+import json
+import shutil
+import subprocess
+
+
+class MediaDecoder:
+    """
+    Decodes audio/video files through an ffmpeg pipe into mono 16-bit PCM,
+    handed out in fixed-size blocks as they are produced.
+
+    Only one block (plus the pipe buffer) is held in memory at a time, so memory stays
+    flat regardless of the file length, and the first blocks are ready long before the
+    whole file is decoded.
+    """
+
+    def __init__(self, sample_rate=16000, block_sec=5, ffmpeg_path="ffmpeg", ffprobe_path="ffprobe"):
+        """
+        :param sample_rate: Output sample rate (Hz).
+        :param block_sec: Duration of each block in seconds (the last block may be shorter).
+        :param ffmpeg_path: ffmpeg executable.
+        :param ffprobe_path: ffprobe executable (only used for the duration).
+        """
+        self.sample_rate = sample_rate
+        self.block_sec = block_sec
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+
+    @staticmethod
+    def available(ffmpeg_path="ffmpeg"):
+        return shutil.which(ffmpeg_path) is not None
+
+    def duration_sec(self, file_path):
+        """
+        Duration of the media file in seconds, or None if ffprobe cannot tell.
+        """
+        try:
+            result = subprocess.run(
+                [self.ffprobe_path, "-v", "error", "-show_entries", "format=duration", "-of", "json", file_path],
+                capture_output=True, check=True, text=True
+            )
+            return float(json.loads(result.stdout)["format"]["duration"])
+        except (OSError, subprocess.CalledProcessError, KeyError, ValueError):
+            return None
+
+    def blocks(self, file_path):
+        """
+        Yield the decoded audio as raw int16 bytes, `block_sec` seconds per block.
+        Raises RuntimeError if ffmpeg fails.
+        """
+        block_bytes = int(self.sample_rate * self.block_sec) * 2
+        process = subprocess.Popen(
+            [self.ffmpeg_path, "-nostdin", "-v", "error", "-i", file_path,
+             "-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(self.sample_rate), "-"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        try:
+            while True:
+                block = process.stdout.read(block_bytes)
+                if not block:
+                    break
+                yield block
+
+            process.wait()
+            if process.returncode != 0:
+                error = process.stderr.read().decode("utf-8", errors="replace").strip()
+                raise RuntimeError(f"ffmpeg failed to decode {file_path}: {error}")
+        finally:
+            # Stop ffmpeg if the consumer stopped early.
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
@@ -1,10 +1,12 @@
-import pyaudio
 import threading
 import time
-import requests
-from queue import Queue
+import uuid
+from queue import Empty, Queue
 
-from .stt_client import transcribe_chunk_via_grpc
+from .stt_client import get_stt_client
+from common.metrics import Metrics
+from .SummaryWorker import SummaryWorker
+from .CaptureEngine import CaptureEngine, MicrophoneSource
 
 class MicrophoneProcessor:
     def __init__(self,
@@ -12,11 +14,21 @@ class MicrophoneProcessor:
                  chunk_sec=5,
                  sample_rate=16000,
                  channels=1,
-                 llm_endpoint="http://localhost:8001/process_text",
+                 max_segment_sec=30,
+                 llm_endpoint="http://localhost:8001/process_text_stream",
                  file_type="meeting",
-                 output_file="realtime_summary.txt"):
+                 output_file="realtime_summary.txt",
+                 source=None,
+                 log_spans=False):
+        """
+        :param chunk_sec: Shortest segment sent to the STT service (segments are cut at pauses).
+        :param max_segment_sec: Longest segment sent to the STT service (Whisper's window is 30s).
+        :param source: Capture source with open(), read() and close() (default: the microphone).
+        :param log_spans: Print every timing span (otherwise only the p50/p99 summary at the end).
+        """
         self.stt_address = stt_address
         self.chunk_sec = chunk_sec
+        self.max_segment_sec = max_segment_sec
         self.sample_rate = sample_rate
         self.channels = channels
         self.llm_endpoint = llm_endpoint
@@ -24,131 +36,130 @@ class MicrophoneProcessor:
         self.output_file = output_file
 
         self.stop_event = threading.Event()
-        self.audio_queue = Queue()
-
-        # PyAudio settings
-        self.p = pyaudio.PyAudio()
-        self.chunk_size = 1024  # frames per buffer
-        self.stream = None
+        self.audio_queue = Queue()      # (segment, time queued)
+        self._stop_lock = threading.Lock()
+        self._stopped = False
+        self._loop_thread = None        # thread running _process_audio_chunks, while it runs
+
+        # Timing spans of every stage, logged with this session's id (also sent to the STT and LLM services).
+        self.session_id = uuid.uuid4().hex[:8]
+        self.metrics = Metrics("client", log_spans=log_spans)
+        # Records 16-bit PCM into a ring buffer and cuts it at pauses into segments of
+        # chunk_sec..max_segment_sec seconds (1024 frames per read).
+        source = source or MicrophoneSource(sample_rate, channels, frames_per_buffer=1024)
+        self.capture = CaptureEngine(source, sample_rate=sample_rate, channels=channels, max_segment_sec=max_segment_sec,
+                                     min_segment_sec=min(chunk_sec, max_segment_sec),
+                                     metrics=self.metrics, session_id=self.session_id)
+
+        # One long-lived STT stream for the whole recording session.
+        self.stt_session = get_stt_client(stt_address, encoding="int16", sample_rate=sample_rate,
+                                          channels=channels).session(session_id=self.session_id)
 
         # For accumulating transcriptions and summarization
         self.transcript_buffer = []         # collects transcribed text chunks
         self.time_accumulator = 0.0         # seconds of audio accumulated
         self.summarize_interval_sec = 60    # call LLM every 60 seconds of audio
-        self.context_summary = file_type    # initial context
         self.minute_count = 0
 
+        # Calls the LLM on its own thread and keeps the rolling context (starting from the file type).
+        self.summary_worker = SummaryWorker(llm_endpoint, file_type, output_file, initial_context=file_type,
+                                            metrics=self.metrics, session_id=self.session_id)
+
     def start(self):
         """
         Start capturing audio from the microphone in a background thread.
-        Then, in the main thread, process audio chunks and call the LLM every 60 seconds.
+        Then, in the main thread, process audio segments and call the LLM every 60 seconds.
         """
-        self.stream = self.p.open(
-            format=pyaudio.paFloat32,  # recording in float32
-            channels=self.channels,
-            rate=self.sample_rate,
-            input=True,
-            frames_per_buffer=self.chunk_size
-        )
-
-        record_thread = threading.Thread(target=self._record_loop, daemon=True)
-        record_thread.start()
+        self.capture.start(lambda segment: self.audio_queue.put((segment, time.perf_counter())))
 
         print("Recording from microphone... Press Ctrl+C to stop.\n")
+        self._loop_thread = threading.current_thread()
         try:
             self._process_audio_chunks()
         except KeyboardInterrupt:
             print("KeyboardInterrupt received. Stopping...")
+            self._loop_thread = None
             self.stop()
-        record_thread.join()
+        finally:
+            self._loop_thread = None
 
     def stop(self):
         """
-        Signal the recording to stop and clean up the PyAudio stream.
-        """
-        self.stop_event.set()
-        time.sleep(1)
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        self.p.terminate()
-
-    def _record_loop(self):
-        """
-        Continuously read from the microphone in small buffers.
-        Once enough data for `chunk_sec` seconds is collected, push that chunk into the queue.
+        Stop recording and finish the session: the last segment the capture hands out and
+        everything still queued is transcribed, the rest of the transcript goes to the LLM,
+        then the STT stream is closed. Calling it again does nothing.
         """
-        frames = []
+        with self._stop_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+
+        # Stopping the capture queues the audio after the last cut as a final segment.
+        self.capture.stop()
+        if self._loop_thread is not None and self._loop_thread is not threading.current_thread():
+            # The processing loop is still running on another thread; let it work off the queue.
+            self.audio_queue.join()
+        else:
+            self._drain()
+        self._submit_transcript()
 
-        # For paFloat32, each sample is 4 bytes.
-        total_bytes_needed = self.sample_rate * 4 * self.chunk_sec
-        print(f"Capturing ~{self.chunk_sec}s lumps from microphone...")
+        self.stop_event.set()
+        self.stt_session.close()
+        # Let the summaries still waiting for the LLM finish.
+        self.summary_worker.stop()
+        self.metrics.log_summary()
 
-        while not self.stop_event.is_set():
-            data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-            frames.append(data)
-            if sum(len(x) for x in frames) >= total_bytes_needed:
-                chunk_data = b''.join(frames)
-                frames = []
-                self.audio_queue.put(chunk_data)
-        print("[_record_loop] Stopped reading from microphone.")
+    def _drain(self):
+        while True:
+            try:
+                segment, queued_at = self.audio_queue.get_nowait()
+            except Empty:
+                return
+            self._process_segment(segment, queued_at)
 
     def _process_audio_chunks(self):
         """
-        Main processing loop: for each audio chunk received from the queue,
+        Main processing loop: for each audio segment received from the queue,
         send it to the STT microservice, accumulate the transcription,
         and once 60 seconds of text is reached, call the LLM microservice to process it.
         """
         while not self.stop_event.is_set():
             try:
-                chunk_data = self.audio_queue.get(timeout=1.0)
-            except:
+                segment, queued_at = self.audio_queue.get(timeout=1.0)
+            except Exception:
                 continue
 
-            # Transcribe the current chunk using the STT microservice.
-            transcription = transcribe_chunk_via_grpc(
-                audio_chunk=chunk_data,
-                stt_address=self.stt_address
-            )
-            print(f"[Microphone chunk] {transcription}")
-
-            # Accumulate transcription and elapsed time.
-            self.transcript_buffer.append(transcription)
-            self.time_accumulator += self.chunk_sec
-
-            # When enough audio has been accumulated, call the LLM microservice.
-            if self.time_accumulator >= self.summarize_interval_sec:
-                self.minute_count += 1
-                full_text = "\n".join(self.transcript_buffer)
-                payload = {
-                    "text": full_text,
-                    "user_options": {"file_type": self.file_type},
-                    "rolling_context": self.context_summary
-                }
-                try:
-                    resp = requests.post(self.llm_endpoint, json=payload)
-                    resp.raise_for_status()
-                    data = resp.json()
-                    # Expecting a JSON response with at least a "chunk_summary" field.
-                    chunk_summary = data.get("chunk_summary", full_text)
-                    updated_context = data.get("updated_context", self.context_summary)
-                except Exception as e:
-                    print(f"Error calling LLM service: {e}")
-                    chunk_summary = full_text
-                    updated_context = self.context_summary
-
-                print(f"\n--- Minute {self.minute_count} Summary ---")
-                print(chunk_summary)
-                print("--- End Summary ---\n")
-
-                # Append the summary to the output file.
-                with open(self.output_file, "a", encoding="utf-8") as f:
-                    f.write(f"\n## Minute {self.minute_count}\n")
-                    f.write(f"**New Summary**:\n{chunk_summary}\n\n")
-
-                # Reset the accumulation for the next interval.
-                self.context_summary = updated_context
-                self.transcript_buffer = []
-                self.time_accumulator = 0.0
-
-            self.audio_queue.task_done()
+            self._process_segment(segment, queued_at)
+
+    def _process_segment(self, segment, queued_at):
+        # Transcribe the current segment on the session's STT stream.
+        start = time.perf_counter()
+        self.metrics.observe_stage("queue_wait", start - queued_at, self.session_id, segment.index)
+        transcription = self.stt_session.transcribe(segment.data)
+        stt_sec = time.perf_counter() - start
+        self.metrics.observe_stage("stt", stt_sec, self.session_id, segment.index)
+        self.metrics.observe_rtf(stt_sec, segment.duration_sec, kind="stt")
+        # The segment's audio has been sent; its part of the ring buffer can be reused.
+        self.capture.release(segment)
+        print(f"[Microphone chunk] {transcription}")
+
+        # Accumulate transcription and elapsed time.
+        self.transcript_buffer.append(transcription)
+        self.time_accumulator += segment.duration_sec
+
+        # When enough audio has been accumulated, hand it to the summary worker and carry on:
+        # the LLM call runs on the worker's thread, so transcription never waits for it.
+        if self.time_accumulator >= self.summarize_interval_sec:
+            self._submit_transcript()
+
+        self.audio_queue.task_done()
+
+    def _submit_transcript(self):
+        if not self.transcript_buffer:
+            return
+        self.minute_count += 1
+        self.summary_worker.submit(self.minute_count, "\n".join(self.transcript_buffer))
+
+        # Reset the accumulation for the next interval.
+        self.transcript_buffer = []
+        self.time_accumulator = 0.0
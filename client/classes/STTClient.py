@@ -0,0 +1,339 @@
+import asyncio
+import itertools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import grpc
+from client.proto_repo import audio_pb2, audio_pb2_grpc
+
+# Encoding names accepted by the clients, mapped to the wire enum.
+ENCODINGS = {
+    "float32": audio_pb2.FLOAT32,
+    "int16": audio_pb2.PCM_S16LE,
+    "opus": audio_pb2.OPUS,
+    "flac": audio_pb2.FLAC,
+}
+
+# Keep channels alive across the pauses between chunks instead of reconnecting.
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+
+def parse_addresses(addresses):
+    """
+    Accept "host:port", "host1:port,host2:port" or a list of addresses.
+    """
+    if isinstance(addresses, str):
+        addresses = addresses.split(",")
+    addresses = [address.strip() for address in addresses if address.strip()]
+    if not addresses:
+        raise ValueError("At least one STT address is required")
+    return addresses
+
+
+# gRPC metadata key that tags the server's timing spans with the client's session id.
+SESSION_METADATA_KEY = "session-id"
+
+
+def _session_metadata(session_id):
+    return ((SESSION_METADATA_KEY, session_id),) if session_id else None
+
+
+class _AudioFormat:
+    """
+    Builds AudioChunkV2 messages for one audio format.
+    """
+
+    def __init__(self, model_size="", encoding="int16", sample_rate=16000, channels=1):
+        self.model_size = model_size
+        self.encoding = ENCODINGS[encoding]
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def chunk(self, audio_data, sequence, end_of_segment=False):
+        # audio_data may be any buffer (e.g. a numpy view into a capture ring); protobuf needs bytes.
+        if not isinstance(audio_data, bytes):
+            audio_data = bytes(memoryview(audio_data))
+        return audio_pb2.AudioChunkV2(
+            audio_data=audio_data,
+            encoding=self.encoding,
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+            sequence=sequence,
+            model_size=self.model_size,
+            end_of_segment=end_of_segment
+        )
+
+
+class STTClient:
+    """
+    Reusable client for the STT microservice.
+
+    Keeps one long-lived gRPC channel (with keepalive) per STT address and spreads
+    requests over them round-robin. Channels are thread-safe, so one client can be
+    shared by all threads of a process.
+    """
+
+    def __init__(self, addresses="localhost:50051", model_size="", encoding="int16", sample_rate=16000, channels=1):
+        """
+        :param addresses: One or more STT service addresses (list or comma-separated string).
+        :param model_size: Whisper model to use ("tiny", "base", "small", "medium"); empty = server default.
+        :param encoding: Format of the audio passed in: "float32", "int16" (PCM), "opus" or "flac".
+        :param sample_rate: Sample rate of the audio passed in.
+        :param channels: Number of interleaved channels in the audio passed in.
+        """
+        self.addresses = parse_addresses(addresses)
+        self.audio_format = _AudioFormat(model_size, encoding, sample_rate, channels)
+        self._channels = [grpc.insecure_channel(address, options=KEEPALIVE_OPTIONS) for address in self.addresses]
+        self._stubs = [audio_pb2_grpc.AudioStreamStub(channel) for channel in self._channels]
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+
+    def next_stub(self):
+        with self._lock:
+            index = next(self._round_robin) % len(self._stubs)
+        return self._stubs[index]
+
+    def transcribe(self, audio_chunk: bytes, timeout=None, session_id=None) -> str:
+        """
+        Transcribe a single chunk with its own short stream on a pooled channel.
+        Raises grpc.RpcError on failure.
+        :param session_id: Optional id the server logs with its timing spans.
+        """
+        def request_generator():
+            yield self.audio_format.chunk(audio_chunk, sequence=0)
+            # An empty chunk signals the end of the stream.
+            yield audio_pb2.AudioChunkV2(audio_data=b'', sequence=1)
+
+        transcription = ""
+        stream = self.next_stub().StreamAudioV2(request_generator(), timeout=timeout,
+                                                metadata=_session_metadata(session_id))
+        for response in stream:
+            transcription = response.transcription
+            if response.is_final:
+                break
+        return transcription
+
+    def session(self, on_partial=None, session_id=None):
+        """
+        Open a session: one bidirectional stream used for all chunks of a recording.
+        :param on_partial: Optional callable receiving partial transcriptions as they arrive.
+        :param session_id: Optional id the server logs with its timing spans.
+        """
+        return STTSession(self, on_partial=on_partial, session_id=session_id)
+
+    def close(self):
+        for channel in self._channels:
+            channel.close()
+
+
+class STTSession:
+    """
+    A long-lived StreamAudioV2 stream. Every submitted chunk is sent as one segment and
+    answered with its final transcription, in order, on the same stream.
+    If the stream breaks, pending chunks fail and the next submit opens a new stream
+    (on the next STT address).
+    """
+
+    def __init__(self, client, on_partial=None, session_id=None):
+        self.client = client
+        self.on_partial = on_partial
+        self.session_id = session_id
+        self._lock = threading.Lock()
+        self._requests = None
+        self._pending = deque()
+        self._sequence = 0
+
+    def _open(self):
+        requests = queue.Queue()
+
+        def request_generator():
+            while True:
+                request = requests.get()
+                if request is None:
+                    return
+                yield request
+
+        responses = self.client.next_stub().StreamAudioV2(request_generator(),
+                                                          metadata=_session_metadata(self.session_id))
+        # Futures waiting for this stream's responses, in the order the segments were sent.
+        pending = deque()
+        self._requests = requests
+        self._pending = pending
+        self._sequence = 0
+        threading.Thread(target=self._read_responses, args=(responses, requests, pending), daemon=True).start()
+
+    def _read_responses(self, responses, requests, pending):
+        try:
+            for response in responses:
+                if not response.is_final:
+                    if self.on_partial:
+                        self.on_partial(response.transcription)
+                    continue
+                with self._lock:
+                    future = pending.popleft() if pending else None
+                if future is not None:
+                    future.set_result(response.transcription)
+            error = RuntimeError("STT stream closed")
+        except grpc.RpcError as e:
+            error = e
+
+        # Fail whatever was still waiting on this stream, and end its request generator,
+        # which would otherwise block gRPC's request thread forever.
+        with self._lock:
+            if self._requests is requests:
+                self._requests = None
+            failed = list(pending)
+            pending.clear()
+        requests.put(None)
+        for future in failed:
+            future.set_exception(error)
+
+    def submit(self, audio_chunk: bytes) -> Future:
+        """
+        Send `audio_chunk` as one segment.
+        :return: a Future resolving to its transcription.
+        """
+        future = Future()
+        with self._lock:
+            if self._requests is None:
+                self._open()
+            self._pending.append(future)
+            self._requests.put(self.client.audio_format.chunk(audio_chunk, self._sequence, end_of_segment=True))
+            self._sequence += 1
+        return future
+
+    def transcribe(self, audio_chunk: bytes, timeout=None) -> str:
+        """
+        Blocking helper: transcribe `audio_chunk` on the session stream.
+        Returns an empty string on error.
+        """
+        try:
+            return self.submit(audio_chunk).result(timeout=timeout)
+        except Exception as e:
+            print(f"[STTSession] Error: {e}")
+            return ""
+
+    def close(self):
+        with self._lock:
+            if self._requests is not None:
+                self._requests.put(None)
+                self._requests = None
+
+
+class AsyncSTTClient:
+    """
+    asyncio variant of STTClient, built on grpc.aio channels.
+    """
+
+    def __init__(self, addresses="localhost:50051", model_size="", encoding="int16", sample_rate=16000, channels=1):
+        self.addresses = parse_addresses(addresses)
+        self.audio_format = _AudioFormat(model_size, encoding, sample_rate, channels)
+        self._channels = [grpc.aio.insecure_channel(address, options=KEEPALIVE_OPTIONS) for address in self.addresses]
+        self._stubs = [audio_pb2_grpc.AudioStreamStub(channel) for channel in self._channels]
+        self._round_robin = itertools.count()
+
+    def next_stub(self):
+        return self._stubs[next(self._round_robin) % len(self._stubs)]
+
+    async def transcribe(self, audio_chunk: bytes, timeout=None, session_id=None) -> str:
+        """
+        Transcribe a single chunk with its own short stream on a pooled channel.
+        Raises grpc.RpcError on failure.
+        :param session_id: Optional id the server logs with its timing spans.
+        """
+        call = self.next_stub().StreamAudioV2(timeout=timeout, metadata=_session_metadata(session_id))
+        await call.write(self.audio_format.chunk(audio_chunk, sequence=0))
+        await call.write(audio_pb2.AudioChunkV2(audio_data=b'', sequence=1))
+        await call.done_writing()
+
+        transcription = ""
+        async for response in call:
+            transcription = response.transcription
+            if response.is_final:
+                break
+        return transcription
+
+    def session(self, on_partial=None, session_id=None):
+        return AsyncSTTSession(self, on_partial=on_partial, session_id=session_id)
+
+    async def close(self):
+        for channel in self._channels:
+            await channel.close()
+
+
+class AsyncSTTSession:
+    """
+    asyncio variant of STTSession: one long-lived stream, one segment per chunk.
+    """
+
+    def __init__(self, client, on_partial=None, session_id=None):
+        self.client = client
+        self.on_partial = on_partial
+        self.session_id = session_id
+        self._call = None
+        self._reader = None
+        self._pending = deque()
+        self._sequence = 0
+        # Keeps a chunk's place in `_pending` and its sequence number in step with the order of writes.
+        self._write_lock = asyncio.Lock()
+
+    def _open(self):
+        self._call = self.client.next_stub().StreamAudioV2(metadata=_session_metadata(self.session_id))
+        self._pending = deque()
+        self._sequence = 0
+        self._reader = asyncio.ensure_future(self._read_responses(self._call, self._pending))
+
+    async def _read_responses(self, call, pending):
+        try:
+            async for response in call:
+                if not response.is_final:
+                    if self.on_partial:
+                        self.on_partial(response.transcription)
+                    continue
+                if pending:
+                    future = pending.popleft()
+                    if not future.done():
+                        future.set_result(response.transcription)
+            error = RuntimeError("STT stream closed")
+        except grpc.RpcError as e:
+            error = e
+
+        if self._call is call:
+            self._call = None
+        while pending:
+            future = pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    async def transcribe(self, audio_chunk: bytes) -> str:
+        """
+        Transcribe `audio_chunk` on the session stream. Raises on stream errors.
+        """
+        async with self._write_lock:
+            if self._call is None:
+                self._open()
+            future = asyncio.get_running_loop().create_future()
+            pending = self._pending
+            pending.append(future)
+            try:
+                await self._call.write(self.client.audio_format.chunk(audio_chunk, self._sequence, end_of_segment=True))
+            except BaseException:
+                if future in pending:
+                    pending.remove(future)
+                raise
+            self._sequence += 1
+        return await future
+
+    async def close(self):
+        if self._call is not None:
+            await self._call.done_writing()
+            self._call = None
+        if self._reader is not None:
+            await self._reader
@@ -0,0 +1,201 @@
+from collections import namedtuple
+
+import numpy as np
+
+# A piece of audio ready for transcription: raw int16 PCM bytes and where it sits in the recording.
+Segment = namedtuple("Segment", ["index", "offset_sec", "duration_sec", "data"])
+
+
+class Segmenter:
+    """
+    Cuts a stream of 16-bit PCM audio into variable-length segments at pauses in speech.
+
+    Fixed chunks split words. Instead, a segment ends at the first pause found after
+    `min_segment_sec`, as soon as that pause is there. Without one, audio is collected until
+    `max_segment_sec` (Whisper's window) and cut in the longest pause after `min_segment_sec`;
+    if there is no pause at all, it is cut at the maximum length.
+    """
+
+    def __init__(self, sample_rate=16000, channels=1, max_segment_sec=30.0, min_segment_sec=None,
+                 frame_ms=30, silence_threshold_db=-40.0, noise_margin_db=10.0, min_pause_ms=200):
+        """
+        :param sample_rate: Sample rate of the audio (Hz).
+        :param channels: Number of interleaved channels.
+        :param max_segment_sec: Maximum segment length (Whisper's window is 30s).
+        :param min_segment_sec: Pauses before this point are not used as cut points (default: half the maximum).
+        :param frame_ms: Frame length used to measure loudness.
+        :param silence_threshold_db: Frames quieter than this (dBFS) count as pause.
+        :param noise_margin_db: Frames within this margin of the quietest frames also count as pause,
+                                so pauses are found in noisy recordings too.
+        :param min_pause_ms: Shortest pause used as a cut point.
+        """
+        # Everything that changes where the audio is cut (e.g. for tying a job journal to it).
+        self.settings = {
+            "max_segment_sec": max_segment_sec, "min_segment_sec": min_segment_sec, "frame_ms": frame_ms,
+            "silence_threshold_db": silence_threshold_db, "noise_margin_db": noise_margin_db,
+            "min_pause_ms": min_pause_ms
+        }
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.max_frames = int(max_segment_sec * sample_rate)
+        self.min_frames = int((min_segment_sec if min_segment_sec is not None else max_segment_sec / 2) * sample_rate)
+        self.analysis_frame = max(1, int(sample_rate * frame_ms / 1000))
+        self.silence_threshold_db = silence_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.min_pause_frames = max(1, int(min_pause_ms / frame_ms))
+        if self.max_frames < 1:
+            raise ValueError(f"max_segment_sec must be positive, got {max_segment_sec}")
+        # Distance between two looks for a pause, the next one (frames into the current segment),
+        # and the loudness of the segment's analysis windows measured so far.
+        self._scan_step = self.min_pause_frames * self.analysis_frame
+        self._next_check = self.min_frames + self._scan_step
+        self._energy = np.empty(0)
+
+        self._pending = bytearray()
+        self._offset_frames = 0
+        self._next_index = 0
+
+    @property
+    def _bytes_per_frame(self):
+        return 2 * self.channels
+
+    def _window_energy(self, samples):
+        """
+        Loudness (dBFS) of every complete analysis window of `samples` (int16, shape (frames,) or (frames, channels)).
+        """
+        samples = samples.reshape(len(samples), -1)
+        n_windows = len(samples) // self.analysis_frame
+        windows = samples[:n_windows * self.analysis_frame].astype(np.float32) / 32768.0
+        windows = windows.reshape(n_windows, -1)
+        return 10 * np.log10(np.maximum(np.mean(windows * windows, axis=1), 1e-10))
+
+    def _pauses(self, energy_db):
+        """
+        Return the usable pauses among the analysis windows `energy_db` as (start, end) window
+        indices: runs of quiet windows at least min_pause_ms long, clipped to start at
+        min_segment_sec (and after the first window, so a cut never falls at 0), in order.
+        """
+        if len(energy_db) == 0:
+            return []
+
+        # Relative threshold: near the quietest frames, but clearly below the typical (speech) level.
+        relative = min(np.percentile(energy_db, 10) + self.noise_margin_db, np.median(energy_db) - self.noise_margin_db)
+        quiet = energy_db < max(self.silence_threshold_db, relative)
+
+        # Find runs of quiet windows and keep the ones that end after min_frames.
+        edges = np.diff(np.concatenate(([0], quiet.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        min_window = max(1, self.min_frames // self.analysis_frame)
+        return [(max(start, min_window), end) for start, end in zip(starts, ends)
+                if end - start >= self.min_pause_frames and end > min_window]
+
+    def _middle(self, pause):
+        # Cut in the middle of the pause.
+        return int((pause[0] + pause[1]) // 2) * self.analysis_frame
+
+    def _longest_cut(self, energy_db, n_frames):
+        best = None
+        for start, end in self._pauses(energy_db):
+            # Prefer longer pauses; among equal ones, the later one.
+            if best is None or end - start >= best[1] - best[0]:
+                best = (start, end)
+        return n_frames if best is None else self._middle(best)
+
+    def find_cut(self, samples):
+        """
+        Return where to cut `samples` (int16, shape (frames,) or (frames, channels)), in frames:
+        in the longest pause after min_segment_sec, or at the end if there is none.
+        """
+        return self._longest_cut(self._window_energy(samples), len(samples))
+
+    def next_cut(self, samples):
+        """
+        Return where to cut the audio collected so far (`samples`, starting at the current
+        segment), in frames, or None to wait for more. The cut is always > 0.
+
+        The segment is checked for a pause at fixed points, every min_pause_ms after
+        min_segment_sec, each time over the audio up to that point only. So cuts depend on
+        the audio alone, not on the size of the blocks it arrives in. The first usable pause
+        ends the segment; at max_segment_sec it is cut in the longest pause (or at the maximum
+        length). The loudness of every analysis window is computed once.
+        """
+        n_frames = min(len(samples), self.max_frames)
+        n_windows = n_frames // self.analysis_frame
+        if n_windows > len(self._energy):
+            known = len(self._energy) * self.analysis_frame
+            new = self._window_energy(samples[known:n_windows * self.analysis_frame])
+            self._energy = np.concatenate([self._energy, new])
+
+        while self._next_check <= n_frames and self._next_check < self.max_frames:
+            pauses = self._pauses(self._energy[:self._next_check // self.analysis_frame])
+            self._next_check += self._scan_step
+            if pauses:
+                return self._cut(self._middle(pauses[0]))
+
+        if len(samples) >= self.max_frames:
+            return self._cut(self._longest_cut(self._energy[:self.max_frames // self.analysis_frame], self.max_frames))
+        return None
+
+    def reset(self):
+        """
+        Forget the analysis of the current segment (its audio was handed out some other way).
+        """
+        self._energy = np.empty(0)
+        self._next_check = self.min_frames + self._scan_step
+
+    def _cut(self, cut):
+        # The next segment starts at `cut`: keep the loudness of its windows if they line up.
+        energy = self._energy[cut // self.analysis_frame:] if cut % self.analysis_frame == 0 else np.empty(0)
+        self.reset()
+        self._energy = energy
+        return cut
+
+    def _emit(self, n_frames):
+        n_bytes = n_frames * self._bytes_per_frame
+        segment = Segment(
+            index=self._next_index,
+            offset_sec=self._offset_frames / self.sample_rate,
+            duration_sec=n_frames / self.sample_rate,
+            data=bytes(self._pending[:n_bytes])
+        )
+        del self._pending[:n_bytes]
+        self._offset_frames += n_frames
+        self._next_index += 1
+        return segment
+
+    def push(self, pcm_bytes):
+        """
+        Add audio and return the segments that are complete.
+        """
+        self._pending.extend(pcm_bytes)
+
+        segments = []
+        while True:
+            n_frames = min(len(self._pending) // self._bytes_per_frame, self.max_frames)
+            window = np.frombuffer(self._pending, dtype="<i2", count=n_frames * self.channels).reshape(-1, self.channels)
+            cut = self.next_cut(window)
+            del window  # release the export of self._pending before resizing it
+            if cut is None:
+                return segments
+            segments.append(self._emit(cut))
+
+    def flush(self):
+        """
+        Return the remaining audio as a final segment (or None if there is none).
+        """
+        n_frames = len(self._pending) // self._bytes_per_frame
+        self.reset()
+        if n_frames == 0:
+            return None
+        return self._emit(n_frames)
+
+    def segments(self, blocks):
+        """
+        Segment an iterable of PCM blocks, yielding segments as soon as they are complete.
+        """
+        for block in blocks:
+            yield from self.push(block)
+        last = self.flush()
+        if last is not None:
+            yield last
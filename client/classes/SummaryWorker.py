@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+from collections import deque
+
+import requests
+
+
+def sse_events(response):
+    """
+    Yield (event, data) pairs of a Server-Sent Events response as they arrive.
+    """
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            field, _, value = line.partition(":")
+            if field == "event":
+                event = value.strip()
+            elif field == "data":
+                data.append(value[1:] if value.startswith(" ") else value)
+            continue
+        if data:
+            yield event, "\n".join(data)
+        event, data = "message", []
+
+
+class SummaryWorker:
+    """
+    Summarizes transcript intervals with the LLM microservice on its own thread, so the
+    real-time transcription loop never waits for the LLM. With the streaming endpoint
+    (/process_text_stream) the summary is printed as the LLM writes it.
+
+    Intervals wait in a bounded queue. When it is full, a new interval is merged into the
+    last waiting one instead of blocking the caller, so a slow LLM gets fewer but larger
+    requests and nothing is lost. The rolling context is owned by the worker thread: each
+    request uses the context returned by the previous one.
+    """
+
+    def __init__(self, llm_endpoint, file_type, output_file, initial_context="", max_pending=2, timeout=300,
+                 metrics=None, session_id=None):
+        """
+        :param llm_endpoint: Endpoint URL for the LLM microservice (/process_text_stream or /process_text).
+        :param file_type: 'meeting', 'lecture', or 'call'.
+        :param output_file: File the summaries are appended to.
+        :param initial_context: Rolling context to start from.
+        :param max_pending: Intervals that may wait for the LLM before new ones are merged into the last.
+        :param timeout: Timeout of one LLM request in seconds.
+        :param metrics: Optional Metrics receiving "summary_queue_wait", "llm_first_token" and "llm" spans.
+        :param session_id: Session id sent to the LLM service and used in the span logs.
+        """
+        self.llm_endpoint = llm_endpoint
+        self.file_type = file_type
+        self.output_file = output_file
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self.metrics = metrics
+        self.session_id = session_id
+
+        self._context_summary = initial_context
+        self._pending = deque()        # [first minute, last minute, text, time queued]
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def context_summary(self):
+        with self._condition:
+            return self._context_summary
+
+    def submit(self, minute, text):
+        """
+        Queue the transcript of interval `minute` for summarization. Never blocks.
+        """
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                # The LLM is behind: fold this interval into the last waiting one.
+                last = self._pending[-1]
+                last[1] = minute
+                last[2] = f"{last[2]}\n{text}"
+                print(f"[SummaryWorker] LLM is behind, merged minutes {last[0]}-{last[1]} into one request")
+            else:
+                self._pending.append([minute, minute, text, time.perf_counter()])
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                first, last, text, queued_at = self._pending.popleft()
+                context_summary = self._context_summary
+
+            chunk_id = str(first) if first == last else f"{first}-{last}"
+            label = f"Minute {first}" if first == last else f"Minutes {first}-{last}"
+            start = time.perf_counter()
+            if self.metrics:
+                self.metrics.observe_stage("summary_queue_wait", start - queued_at, self.session_id, chunk_id)
+            chunk_summary, updated_context, shown = self._summarize(text, context_summary, chunk_id, label)
+            if self.metrics:
+                self.metrics.observe_stage("llm", time.perf_counter() - start, self.session_id, chunk_id)
+
+            with self._condition:
+                self._context_summary = updated_context
+            self._write(label, chunk_summary, shown)
+
+    def _summarize(self, text, context_summary, chunk_id, label):
+        """
+        Return (chunk summary, updated context, whether the summary was already printed while streaming).
+        """
+        payload = {
+            "text": text,
+            "user_options": {"file_type": self.file_type},
+            "rolling_context": context_summary,
+            "session_id": self.session_id or "",
+            "chunk_id": chunk_id
+        }
+        start = time.perf_counter()
+        try:
+            with requests.post(self.llm_endpoint, json=payload, timeout=self.timeout, stream=True) as resp:
+                resp.raise_for_status()
+                if resp.headers.get("Content-Type", "").startswith("text/event-stream"):
+                    return self._read_stream(resp, text, context_summary, chunk_id, label, start)
+                data = resp.json()
+                # Expecting a JSON response with "chunk_summary" and optionally "updated_context".
+                return data.get("chunk_summary", text), data.get("updated_context", context_summary), False
+        except Exception as e:
+            print(f"Error calling LLM service: {e}")
+            return text, context_summary, False
+
+    def _read_stream(self, resp, text, context_summary, chunk_id, label, start):
+        # Print the summary as it arrives; the "done" event carries the final summary and context.
+        streamed = []
+        for event, data in sse_events(resp):
+            data = json.loads(data)
+            if event == "chunk_part":
+                if not streamed:
+                    if self.metrics:
+                        self.metrics.observe_stage("llm_first_token", time.perf_counter() - start,
+                                                   self.session_id, chunk_id)
+                    print(f"\n--- {label} Summary ---")
+                streamed.append(data["text"])
+                print(data["text"], end="", flush=True)
+            elif event == "done":
+                return data["chunk_summary"], data["updated_context"], bool(streamed)
+
+        # The stream broke off: keep what arrived (or the transcript) and the old context.
+        print("\n[SummaryWorker] LLM stream ended early")
+        return "".join(streamed) or text, context_summary, bool(streamed)
+
+    def _write(self, label, chunk_summary, shown=False):
+        if shown:
+            print("\n--- End Summary ---\n")
+        else:
+            print(f"\n--- {label} Summary ---")
+            print(chunk_summary)
+            print("--- End Summary ---\n")
+
+        # Append the summary to the output file.
+        with open(self.output_file, "a", encoding="utf-8") as f:
+            f.write(f"\n## {label}\n")
+            f.write(f"**New Summary**:\n{chunk_summary}\n\n")
+
+    def stop(self, timeout=None):
+        """
+        Summarize the intervals still waiting, then stop the worker.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(timeout)
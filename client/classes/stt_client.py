@@ -1,31 +1,45 @@
-import grpc
-from client.proto_repo import audio_pb2, audio_pb2_grpc
+import threading
+
+from .STTClient import STTClient
+
+# Pooled clients shared by all callers, one per address and audio format.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_stt_client(stt_address: str = "localhost:50051", model_size: str = "", encoding: str = "float32",
+                   sample_rate: int = 16000, channels: int = 1) -> STTClient:
+    """
+    Return the shared STTClient for these settings, creating it on first use.
+    Its channels stay open, so later calls skip the connection setup.
+    """
+    key = (stt_address, model_size, encoding, sample_rate, channels)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = STTClient(stt_address, model_size=model_size, encoding=encoding,
+                                      sample_rate=sample_rate, channels=channels)
+        return _clients[key]
 
 
 def transcribe_chunk_via_grpc(audio_chunk: bytes,
-                              stt_address: str = "localhost:50051") -> str:
+                              stt_address: str = "localhost:50051",
+                              model_size: str = "",
+                              encoding: str = "float32",
+                              sample_rate: int = 16000,
+                              channels: int = 1) -> str:
     """
     Sends a single chunk of audio to the STT microservice via gRPC.
     Returns the transcription text, or an empty string on error.
+
+    :param stt_address: STT address, or several comma-separated addresses used round-robin.
+    :param model_size: Whisper model to use ("tiny", "base", "small", "medium"); empty = server default.
+    :param encoding: Format of `audio_chunk`: "float32", "int16" (PCM), "opus" or "flac".
+    :param sample_rate: Sample rate of `audio_chunk`; the server resamples it if needed.
+    :param channels: Number of interleaved channels in `audio_chunk`.
     """
     try:
-        # Create the channel and stub
-        with grpc.insecure_channel(stt_address) as channel:
-            stub = audio_pb2_grpc.AudioStreamStub(channel)
-
-            def request_generator():
-                # 1) yield the actual audio chunk
-                yield audio_pb2.AudioChunk(audio_data=audio_chunk)
-                # 2) yield an empty chunk to signal end of stream
-                yield audio_pb2.AudioChunk(audio_data=b'')
-
-            # The STT service returns a stream of STTResponse.
-            # Typically we'll get just one STTResponse with the final transcription.
-            response_iterator = stub.StreamAudio(request_generator())
-
-            for response in response_iterator:
-                return response.transcription
-
+        client = get_stt_client(stt_address, model_size, encoding, sample_rate, channels)
+        return client.transcribe(audio_chunk)
     except Exception as e:
         print(f"[transcribe_chunk_via_grpc] Error: {e}")
 
@@ -24,17 +24,21 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61udio.proto\" \n\nAudioChunk\x12\x12\n\naudio_data\x18\x01 \x01(\x0c\"$\n\x0bSTTResponse\x12\x15\n\rtranscription\x18\x01 \x01(\t2;\n\x0b\x41udioStream\x12,\n\x0bStreamAudio\x12\x0b.AudioChunk\x1a\x0c.STTResponse(\x01\x30\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61udio.proto\"4\n\nAudioChunk\x12\x12\n\naudio_data\x18\x01 \x01(\x0c\x12\x12\n\nmodel_size\x18\x02 \x01(\t\"\xa9\x01\n\x0c\x41udioChunkV2\x12\x12\n\naudio_data\x18\x01 \x01(\x0c\x12 \n\x08\x65ncoding\x18\x02 \x01(\x0e\x32\x0e.AudioEncoding\x12\x13\n\x0bsample_rate\x18\x03 \x01(\r\x12\x10\n\x08\x63hannels\x18\x04 \x01(\r\x12\x10\n\x08sequence\x18\x05 \x01(\x04\x12\x12\n\nmodel_size\x18\x06 \x01(\t\x12\x16\n\x0e\x65nd_of_segment\x18\x07 \x01(\x08\"G\n\x0bSTTResponse\x12\x15\n\rtranscription\x18\x01 \x01(\t\x12\x10\n\x08is_final\x18\x02 \x01(\x08\x12\x0f\n\x07segment\x18\x03 \x01(\x04*?\n\rAudioEncoding\x12\x0b\n\x07\x46LOAT32\x10\x00\x12\r\n\tPCM_S16LE\x10\x01\x12\x08\n\x04OPUS\x10\x02\x12\x08\n\x04\x46LAC\x10\x03\x32m\n\x0b\x41udioStream\x12,\n\x0bStreamAudio\x12\x0b.AudioChunk\x1a\x0c.STTResponse(\x01\x30\x01\x12\x30\n\rStreamAudioV2\x12\r.AudioChunkV2\x1a\x0c.STTResponse(\x01\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'audio_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_AUDIOENCODING']._serialized_start=314
+  _globals['_AUDIOENCODING']._serialized_end=377
   _globals['_AUDIOCHUNK']._serialized_start=15
-  _globals['_AUDIOCHUNK']._serialized_end=47
-  _globals['_STTRESPONSE']._serialized_start=49
-  _globals['_STTRESPONSE']._serialized_end=85
-  _globals['_AUDIOSTREAM']._serialized_start=87
-  _globals['_AUDIOSTREAM']._serialized_end=146
+  _globals['_AUDIOCHUNK']._serialized_end=67
+  _globals['_AUDIOCHUNKV2']._serialized_start=70
+  _globals['_AUDIOCHUNKV2']._serialized_end=239
+  _globals['_STTRESPONSE']._serialized_start=241
+  _globals['_STTRESPONSE']._serialized_end=312
+  _globals['_AUDIOSTREAM']._serialized_start=379
+  _globals['_AUDIOSTREAM']._serialized_end=488
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,3 @@
+"""
+Code shared by the STT service, the LLM service and the clients.
+"""
@@ -0,0 +1,167 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Latency buckets in seconds (Prometheus "le" bounds).
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Real-time factor buckets (processing time / audio duration).
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+# Tokens per LLM call (prompt evaluation / generation).
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram, one series per label set. The most recent
+    `window` observations of every series are also kept for exact p50/p99 readouts.
+    """
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS, window=2048):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self._series = {}           # label tuple -> [bucket counts, sum, count, recent values]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0, deque(maxlen=self.window)]
+                self._series[key] = series
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+            series[3].append(value)
+
+    def summary(self):
+        """
+        {label tuple: {"count", "p50", "p99", "mean"}} over the recent window of every series.
+        """
+        with self._lock:
+            series = {key: (list(values[3]), values[1], values[2]) for key, values in self._series.items()}
+        result = {}
+        for key, (recent, total, count) in series.items():
+            recent.sort()
+            result[key] = {
+                "count": count,
+                "mean": total / count if count else 0.0,
+                "p50": recent[int(0.50 * (len(recent) - 1))] if recent else 0.0,
+                "p99": recent[int(0.99 * (len(recent) - 1))] if recent else 0.0
+            }
+        return result
+
+    def render(self):
+        """
+        Lines in the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values[0]), values[1], values[2]) for key, values in self._series.items())
+        for key, counts, total, count in series:
+            labels = ",".join(f'{name}="{value}"' for name, value in key)
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Metrics:
+    """
+    Per-stage timing spans and real-time factor of one service.
+
+    Every span is observed in the `<prefix>_stage_seconds{stage=...}` histogram. Session and
+    chunk ids are not labels (that would create a series per chunk); they only appear in the
+    span log lines, so one chunk can be followed through client, STT and LLM logs.
+    """
+
+    def __init__(self, prefix, log_spans=False):
+        """
+        :param prefix: Metric name prefix, e.g. "stt".
+        :param log_spans: Print every span with its session and chunk ids.
+        """
+        self.prefix = prefix
+        self.log_spans = log_spans
+        self.stages = Histogram(f"{prefix}_stage_seconds", "Time spent per processing stage in seconds.")
+        self.rtf = Histogram(f"{prefix}_real_time_factor", "Processing time divided by audio duration.",
+                             buckets=RTF_BUCKETS)
+        self.tokens = Histogram(f"{prefix}_tokens", "Tokens per LLM call: prompt tokens evaluated (prefill) "
+                                "and tokens generated.", buckets=TOKEN_BUCKETS)
+
+    def observe_stage(self, stage, seconds, session=None, chunk=None):
+        self.stages.observe(seconds, stage=stage)
+        if self.log_spans:
+            print(f"[span] {self.prefix} session={session} chunk={chunk} stage={stage} {seconds * 1000:.1f}ms")
+
+    @contextmanager
+    def span(self, stage, session=None, chunk=None):
+        """
+        Time the body of the `with` block as one `stage` span.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start, session, chunk)
+
+    def observe_rtf(self, processing_sec, audio_sec, kind="total"):
+        if audio_sec > 0:
+            self.rtf.observe(processing_sec / audio_sec, kind=kind)
+
+    def observe_tokens(self, count, kind="prompt_eval"):
+        """
+        Tokens of one LLM call; `kind` is 'prompt_eval' (prefill, what the backend did not have
+        cached) or 'eval' (generated).
+        """
+        if count is not None:
+            self.tokens.observe(count, kind=kind)
+
+    def summary(self):
+        """
+        p50/p99 (in ms) per stage and of the real-time factor, and tokens per LLM call, over recent observations.
+        """
+        stages = {dict(key)["stage"]: {"count": values["count"],
+                                       "p50_ms": round(values["p50"] * 1000, 1),
+                                       "p99_ms": round(values["p99"] * 1000, 1)}
+                  for key, values in self.stages.summary().items()}
+        rtf = {dict(key)["kind"]: {"count": values["count"],
+                                   "p50": round(values["p50"], 3),
+                                   "p99": round(values["p99"], 3)}
+               for key, values in self.rtf.summary().items()}
+        tokens = {dict(key)["kind"]: {"count": values["count"],
+                                      "mean": round(values["mean"], 1),
+                                      "p50": round(values["p50"]),
+                                      "p99": round(values["p99"])}
+                  for key, values in self.tokens.summary().items()}
+        return {"stages": stages, "real_time_factor": rtf, "tokens": tokens}
+
+    def log_summary(self):
+        """
+        Print p50/p99 per stage and of the real-time factor.
+        """
+        summary = self.summary()
+        print(f"--- {self.prefix} latency (recent p50 / p99) ---")
+        for stage, values in sorted(summary["stages"].items()):
+            print(f"  {stage:24} {values['p50_ms']:10.1f}ms {values['p99_ms']:10.1f}ms  (n={values['count']})")
+        for kind, values in sorted(summary["real_time_factor"].items()):
+            print(f"  RTF {kind:20} {values['p50']:10.3f}   {values['p99']:10.3f}    (n={values['count']})")
+        for kind, values in sorted(summary["tokens"].items()):
+            print(f"  tokens {kind:17} {values['p50']:10d}   {values['p99']:10d}    (n={values['count']})")
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        return "\n".join(self.stages.render() + self.rtf.render() + self.tokens.render()) + "\n"
@@ -1,7 +1,11 @@
+import json
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
-from llm.llm_processing import process_text
+from llm.llm_processing import (llm_client, metrics, process_text, process_text_stream, summarize_transcript,
+                                token_counter)
 
 app = FastAPI()
 
@@ -9,11 +13,53 @@ class LLMRequest(BaseModel):
     text: str
     user_options: dict  # {"file_type": "meeting"}, or "lecture", or "call"
     rolling_context: str = ""
+    session_id: str = ""  # optional caller ids, only used to tag the timing spans
+    chunk_id: str = ""
+
+class TranscriptRequest(BaseModel):
+    text: str
+    user_options: dict  # {"file_type": "meeting"}, or "lecture", or "call"
+    session_id: str = ""
 
 @app.post("/process_text")
 async def process_text_endpoint(req: LLMRequest):
-    chunk_summary, updated_context = process_text(req.text, req.user_options, req.rolling_context)
+    chunk_summary, updated_context = await process_text(req.text, req.user_options, req.rolling_context,
+                                                  req.session_id or None, req.chunk_id or None)
     return {"chunk_summary": chunk_summary, "updated_context": updated_context}
 
+# Same request as /process_text, answered as Server-Sent Events while the LLM is still writing:
+#   event: chunk_part  data: {"text": "..."}   (the chunk summary, piece by piece)
+#   event: done        data: {"chunk_summary": "...", "updated_context": "..."}
+@app.post("/process_text_stream")
+async def process_text_stream_endpoint(req: LLMRequest):
+    async def events():
+        async for event in process_text_stream(req.text, req.user_options, req.rolling_context,
+                                         req.session_id or None, req.chunk_id or None):
+            event_type = event.pop("type")
+            yield f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# The LLM calls are awaited, so the long map-reduce does not block other requests.
+@app.post("/summarize_transcript")
+async def summarize_transcript_endpoint(req: TranscriptRequest):
+    final_summary, section_summaries = await summarize_transcript(req.text, req.user_options, req.session_id or None)
+    return {"final_summary": final_summary, "section_summaries": section_summaries}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    # Stage latency histograms (prompt build, LLM call, parse, ...) in the Prometheus text format.
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def stats():
+    # p50/p99 per stage since startup, the load and failures of every Ollama server, and the tokenizer in use.
+    return {"latency": metrics.summary(), "llm_backends": llm_client.stats(), "tokenizer": token_counter.stats()}
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await llm_client.aclose()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)
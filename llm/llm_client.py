@@ -0,0 +1,252 @@
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+
+class LLMError(Exception):
+    """
+    Raised when an LLM call failed on every attempt or ran out of time.
+    """
+
+
+class _RetryableError(Exception):
+    """
+    A failed attempt worth repeating (connection problems, timeouts, 429 and 5xx answers).
+    """
+
+
+def generate_url(endpoint):
+    """
+    "http://host:11434" -> "http://host:11434/api/generate"; full URLs are kept as they are.
+    """
+    endpoint = endpoint.strip().rstrip("/")
+    return endpoint if endpoint.endswith("/api/generate") else f"{endpoint}/api/generate"
+
+
+class _Endpoint:
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+
+class LLMClient:
+    """
+    asyncio client for one or more Ollama servers (`/api/generate`).
+
+    - One pooled httpx.AsyncClient: connections are kept alive and reused between calls.
+    - Least-outstanding routing: every call goes to the endpoint with the fewest calls in
+      flight; an endpoint that just failed is avoided for `cooldown_sec` while others are up.
+    - Concurrency limit: at most `max_concurrency` calls in flight per endpoint (match
+      OLLAMA_NUM_PARALLEL); further calls wait for a free slot instead of queueing in Ollama.
+    - Deadlines and retries: a call (including its waits and retries) never takes longer than
+      `timeout` seconds. Connection errors, timeouts, 429 and 5xx answers are retried up to
+      `max_retries` times with full-jitter exponential backoff, preferably on another endpoint.
+      A stream is only retried before its first token.
+
+    The pool and limiter belong to the event loop that uses them; if the client is used from
+    another loop later, they are recreated there.
+    """
+
+    def __init__(self, endpoints=("http://localhost:11434",), timeout=300.0, connect_timeout=5.0, max_retries=2,
+                 backoff_sec=0.5, max_backoff_sec=8.0, max_concurrency=4, cooldown_sec=5.0):
+        """
+        :param endpoints: Ollama base URLs or /api/generate URLs (list or comma-separated string).
+        :param timeout: Deadline of one call in seconds, over all of its attempts.
+        :param connect_timeout: Time allowed to open a connection.
+        :param max_retries: Extra attempts after the first one fails.
+        :param backoff_sec: Backoff base; attempt n waits a random time up to backoff_sec * 2**n.
+        :param max_backoff_sec: Cap of the backoff.
+        :param max_concurrency: Calls in flight per endpoint.
+        :param cooldown_sec: How long an endpoint that failed is avoided.
+        """
+        if isinstance(endpoints, str):
+            endpoints = endpoints.split(",")
+        self.endpoints = [_Endpoint(generate_url(url)) for url in endpoints if url.strip()]
+        if not self.endpoints:
+            raise ValueError("At least one LLM endpoint is required")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.max_concurrency = max_concurrency
+        self.cooldown_sec = cooldown_sec
+
+        self._loop = None
+        self._client = None
+        self._slots = None
+        self._next = 0
+
+    async def _bind(self):
+        # Create the pool and the limiter on the running loop (again, if the loop changed).
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._client is not None:
+                try:
+                    await self._client.aclose()
+                except Exception as e:
+                    # Connections of a loop that is already closed cannot always be shut down cleanly.
+                    print(f"[LLMClient] Could not close the previous connection pool: {e!r}")
+            self._loop = loop
+            limit = self.max_concurrency * len(self.endpoints)
+            self._client = httpx.AsyncClient(limits=httpx.Limits(max_connections=limit,
+                                                                 max_keepalive_connections=limit))
+            self._slots = asyncio.Condition()
+        return self._client
+
+    def stats(self):
+        """
+        Per endpoint: calls in flight, calls made, failed attempts and whether it is cooling down.
+        """
+        now = time.monotonic()
+        return {endpoint.url: {"outstanding": endpoint.outstanding, "requests": endpoint.requests,
+                               "failures": endpoint.failures, "cooling_down": endpoint.cooldown_until > now}
+                for endpoint in self.endpoints}
+
+    def _pick(self, avoid):
+        now = time.monotonic()
+        free = [endpoint for endpoint in self.endpoints if endpoint.outstanding < self.max_concurrency]
+        if not free:
+            return None
+        # Prefer endpoints that did not just fail, then the least loaded; rotate among equals.
+        self._next += 1
+        return min(free, key=lambda endpoint: (endpoint is avoid and len(free) > 1,
+                                               endpoint.cooldown_until > now,
+                                               endpoint.outstanding,
+                                               (self.endpoints.index(endpoint) - self._next) % len(self.endpoints)))
+
+    async def _acquire(self, deadline, avoid=None):
+        async with self._slots:
+            while True:
+                endpoint = self._pick(avoid)
+                if endpoint is not None:
+                    endpoint.outstanding += 1
+                    endpoint.requests += 1
+                    return endpoint
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMError("Timed out waiting for a free LLM slot")
+                try:
+                    await asyncio.wait_for(self._slots.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, endpoint, failed=False):
+        async with self._slots:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.cooldown_until = time.monotonic() + self.cooldown_sec
+            self._slots.notify()
+
+    def _timeout(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMError(f"LLM call exceeded its {self.timeout:.0f}s deadline")
+        return httpx.Timeout(remaining, connect=min(self.connect_timeout, remaining))
+
+    @staticmethod
+    def _check(response):
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableError(f"HTTP {response.status_code} from {response.url}")
+        if response.status_code >= 400:
+            raise LLMError(f"HTTP {response.status_code} from {response.url}: {response.text[:200]}")
+
+    async def _backoff(self, attempt, deadline):
+        delay = random.uniform(0, min(self.max_backoff_sec, self.backoff_sec * 2 ** attempt))
+        if time.monotonic() + delay >= deadline:
+            raise LLMError(f"LLM call exceeded its {self.timeout:.0f}s deadline")
+        await asyncio.sleep(delay)
+
+    async def generate(self, payload):
+        """
+        POST `payload` (with "stream": false) and return Ollama's JSON answer.
+        Raises LLMError when every attempt failed or the deadline passed.
+        """
+        client = await self._bind()
+        deadline = time.monotonic() + self.timeout
+        payload = dict(payload, stream=False)
+        endpoint = None
+        for attempt in range(self.max_retries + 1):
+            # A passed deadline fails the call before an endpoint is taken.
+            self._timeout(deadline)
+            endpoint = await self._acquire(deadline, avoid=endpoint)
+            # Only connection problems, timeouts, 429 and 5xx count against the endpoint; a
+            # deadline, 4xx or Ollama error is the request's problem, not the server's.
+            failed = False
+            try:
+                response = await client.post(endpoint.url, json=payload, timeout=self._timeout(deadline))
+                self._check(response)
+                data = response.json()
+                if "error" in data:
+                    raise LLMError(f"Ollama error from {endpoint.url}: {data['error']}")
+                return data
+            except (httpx.TransportError, _RetryableError) as e:
+                failed = True
+                print(f"[LLMClient] Attempt {attempt + 1} on {endpoint.url} failed: {e!r}")
+                error = e
+            finally:
+                await self._release(endpoint, failed)
+            if attempt < self.max_retries:
+                await self._backoff(attempt, deadline)
+        raise LLMError(f"LLM call failed after {self.max_retries + 1} attempts: {error!r}")
+
+    async def stream(self, payload):
+        """
+        POST `payload` with "stream": true and yield Ollama's NDJSON objects as they arrive
+        (the last one has "done": true). Raises LLMError like `generate`.
+        """
+        client = await self._bind()
+        deadline = time.monotonic() + self.timeout
+        payload = dict(payload, stream=True)
+        endpoint = None
+        for attempt in range(self.max_retries + 1):
+            self._timeout(deadline)
+            endpoint = await self._acquire(deadline, avoid=endpoint)
+            # As in `generate`, only transport errors, 429 and 5xx mark the endpoint as failed
+            # (a caller that stops reading, a deadline or an Ollama error do not).
+            failed = False
+            started = False
+            try:
+                async with client.stream("POST", endpoint.url, json=payload,
+                                         timeout=self._timeout(deadline)) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                    self._check(response)
+                    async for line in response.aiter_lines():
+                        if time.monotonic() > deadline:
+                            raise LLMError(f"LLM call exceeded its {self.timeout:.0f}s deadline")
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        if "error" in data:
+                            raise LLMError(f"Ollama error from {endpoint.url}: {data['error']}")
+                        started = True
+                        yield data
+                        if data.get("done"):
+                            break
+                return
+            except (httpx.TransportError, _RetryableError) as e:
+                failed = True
+                if started:
+                    # Part of the answer is already out; repeating it would duplicate text.
+                    raise LLMError(f"LLM stream from {endpoint.url} broke off: {e!r}") from e
+                print(f"[LLMClient] Attempt {attempt + 1} on {endpoint.url} failed: {e!r}")
+                error = e
+            finally:
+                await self._release(endpoint, failed)
+            if attempt < self.max_retries:
+                await self._backoff(attempt, deadline)
+        raise LLMError(f"LLM call failed after {self.max_retries + 1} attempts: {error!r}")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
@@ -1,8 +1,41 @@
+import os
+
+from llm.llm_client import LLMClient
+from common.metrics import Metrics
 from llm.summarizer import Summarizer
+from llm.token_budget import TokenCounter
+
+# Ollama servers (comma-separated base URLs); calls go to the one with the fewest calls in flight.
+OLLAMA_URLS = os.environ.get("OLLAMA_URLS", "http://localhost:11434")
+# Deadline of one LLM call in seconds (all retries included), and how often a failed call is retried.
+LLM_TIMEOUT_SEC = float(os.environ.get("LLM_TIMEOUT_SEC", "300"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+# Calls in flight per Ollama server (match its OLLAMA_NUM_PARALLEL).
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+# Ollama model, and how its tokens are counted for the prompt budgets: 'auto' (its tokenizer file if
+# one is found in LLM_TOKENIZER_PATH or llm/tokenizers/, else an estimate), 'exact' or 'approx'.
+LLM_MODEL = os.environ.get("LLM_MODEL", "llama3.1:latest")
+LLM_TOKENIZER = os.environ.get("LLM_TOKENIZER", "auto")
+LLM_TOKENIZER_PATH = os.environ.get("LLM_TOKENIZER_PATH") or None
+LLM_TOKEN_CACHE_ENTRIES = int(os.environ.get("LLM_TOKEN_CACHE_ENTRIES", "4096"))
+# How long Ollama keeps the model and its cache loaded between calls, its context window (num_ctx,
+# sent with every call; 0 = the server's default), and the token budget of the Ollama context a live
+# session carries from chunk to chunk (0 = always send the full prompt; capped at num_ctx).
+LLM_KEEP_ALIVE = os.environ.get("LLM_KEEP_ALIVE", "30m")
+LLM_NUM_CTX = int(os.environ.get("LLM_NUM_CTX", "8192"))
+LLM_SESSION_CONTEXT_TOKENS = int(os.environ.get("LLM_SESSION_CONTEXT_TOKENS", "4096"))
 
-summarizer = Summarizer()
+# Timing spans of every stage; set LLM_LOG_SPANS=1 to also print each span with its session and chunk ids.
+metrics = Metrics("llm", log_spans=os.environ.get("LLM_LOG_SPANS", "0") == "1")
+llm_client = LLMClient(OLLAMA_URLS, timeout=LLM_TIMEOUT_SEC, max_retries=LLM_MAX_RETRIES,
+                       max_concurrency=LLM_MAX_CONCURRENCY)
+token_counter = TokenCounter(LLM_MODEL, mode=LLM_TOKENIZER, tokenizer_path=LLM_TOKENIZER_PATH,
+                             cache_entries=LLM_TOKEN_CACHE_ENTRIES)
+summarizer = Summarizer(LLM_MODEL, metrics=metrics, llm_client=llm_client, token_counter=token_counter,
+                        keep_alive=LLM_KEEP_ALIVE or None, num_ctx=LLM_NUM_CTX or None,
+                        session_context_tokens=LLM_SESSION_CONTEXT_TOKENS)
 
-def process_text(text: str, user_options: dict, rolling_context: str):
+async def process_text(text: str, user_options: dict, rolling_context: str, session_id=None, chunk_id=None):
     """
     Process a transcript chunk using the Summarizer.
 
@@ -10,6 +43,7 @@ def process_text(text: str, user_options: dict, rolling_context: str):
       - text: the transcribed text for this chunk.
       - user_options: dict containing options, e.g. {"file_type": "meeting"}.
       - rolling_context: the current rolling context summary.
+      - session_id, chunk_id: optional ids of the caller, used to tag the timing spans.
 
     Returns:
       - chunk_summary: the processed (summarized) text from this chunk.
@@ -19,5 +53,37 @@ def process_text(text: str, user_options: dict, rolling_context: str):
     file_type = user_options.get("file_type", "meeting")
 
     # Process the chunk using the Summarizer
-    chunk_summary, updated_context = summarizer.process_chunk(text, rolling_context, file_type)
+    with metrics.span("request", session_id, chunk_id):
+        chunk_summary, updated_context = await summarizer.process_chunk(text, rolling_context, file_type,
+                                                                        session_id, chunk_id)
     return chunk_summary, updated_context
+
+
+async def process_text_stream(text: str, user_options: dict, rolling_context: str, session_id=None, chunk_id=None):
+    """
+    Streaming version of `process_text`: yields the Summarizer's events as the LLM writes,
+    i.e. {"type": "chunk_part", "text": ...} pieces of the chunk summary, then one
+    {"type": "done", "chunk_summary": ..., "updated_context": ...}.
+    """
+    file_type = user_options.get("file_type", "meeting")
+    with metrics.span("request", session_id, chunk_id):
+        async for event in summarizer.process_chunk_stream(text, rolling_context, file_type, session_id, chunk_id):
+            yield event
+
+
+async def summarize_transcript(text: str, user_options: dict, session_id=None):
+    """
+    Summarize a whole transcript (e.g. of a recorded file) with map-reduce.
+
+    Parameters:
+      - text: the full transcript.
+      - user_options: dict containing options, e.g. {"file_type": "meeting"}.
+      - session_id: optional id of the caller, used to tag the timing spans.
+
+    Returns:
+      - final_summary: the final report.
+      - section_summaries: the summary of every section, in order.
+    """
+    file_type = user_options.get("file_type", "meeting")
+    with metrics.span("summarize_transcript", session_id):
+        return await summarizer.map_reduce_summary(text, file_type, session_id)
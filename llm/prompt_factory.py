@@ -9,9 +9,7 @@ class PromptFactory:
         self.chunk_prompt_templates = {
             "meeting": (
                 "System: You are a precise assistant that captures important details and presents them in a structured format.\n\n"
-                "Meeting Transcript Chunk:\n{chunk_text}\n\n"
-                "Current Context Summary:\n{context_summary}\n\n"
-                "Instructions:\n"
+                "Instructions for the transcript chunk at the end:\n"
                 "1. Write exactly `CHUNK_PART`\n"
                 "2. Provide a clear overview of what was discussed\n"
                 "3. Focus on:\n"
@@ -28,13 +26,13 @@ class PromptFactory:
                 "You can use up to 500 tokens to write a detailed structured overview with markdowns.\n"
                 "6. Write a delimiter line with exactly this text: `---`\n"
                 "7. Write exactly `UPDATED_CONTEXT`\n"
-                "8. Write an updated context of the conversation.\n"
+                "8. Write an updated context of the conversation.\n\n"
+                "Current Context Summary:\n{context_summary}\n\n"
+                "Meeting Transcript Chunk:\n{chunk_text}\n"
             ),
             "lecture": (
                 "System: You are a precise assistant that captures important details and presents them in a structured format.\n\n"
-                "Lecture Transcript Chunk:\n{chunk_text}\n\n"
-                "Current Context Summary:\n{context_summary}\n\n"
-                "Instructions:\n"
+                "Instructions for the transcript chunk at the end:\n"
                 "1. Write exactly `CHUNK_PART`\n"
                 "2. Provide a clear overview of what was taught\n"
                 "3. Focus on:\n"
@@ -51,13 +49,13 @@ class PromptFactory:
                 "You can use up to 500 tokens to write a detailed structured overview with markdowns.\n"
                 "6. Write a delimiter line with exactly this text: `---`\n"
                 "7. Write exactly `UPDATED_CONTEXT`\n"
-                "8. Write an updated context of the conversation.\n"
+                "8. Write an updated context of the conversation.\n\n"
+                "Current Context Summary:\n{context_summary}\n\n"
+                "Lecture Transcript Chunk:\n{chunk_text}\n"
             ),
             "call": (
                 "System: You are a precise assistant that captures important details and presents them in a structured format.\n\n"
-                "Phone Call Transcript Chunk:\n{chunk_text}\n\n"
-                "Current Context Summary:\n{context_summary}\n\n"
-                "Instructions:\n"
+                "Instructions for the transcript chunk at the end:\n"
                 "1. Write exactly `CHUNK_PART`\n"
                 "2. Provide a clear overview of the conversation\n"
                 "3. Focus on:\n"
@@ -74,8 +72,21 @@ class PromptFactory:
                 "You can use up to 500 tokens to write a detailed structured overview with markdowns.\n"
                 "6. Write a delimiter line with exactly this text: `---`\n"
                 "7. Write exactly `UPDATED_CONTEXT`\n"
-                "8. Write an updated context of the conversation.\n"
+                "8. Write an updated context of the conversation.\n\n"
+                "Current Context Summary:\n{context_summary}\n\n"
+                "Phone Call Transcript Chunk:\n{chunk_text}\n"
+            )
+        }
+
+        # Follow-up chunk prompts: sent with the Ollama context of the previous chunk of the same
+        # session, which already holds the instructions above and the last UPDATED_CONTEXT
+        self.chunk_followup_templates = {
+            file_type: (
+                f"Next {label} Transcript Chunk:\n{{chunk_text}}\n\n"
+                "Same instructions and format as before (`CHUNK_PART`, `---`, `UPDATED_CONTEXT`); "
+                "your last UPDATED_CONTEXT is the current context summary.\n"
             )
+            for file_type, label in (("meeting", "Meeting"), ("lecture", "Lecture"), ("call", "Phone Call"))
         }
 
         # Final summary prompts: these instruct the LLM to combine chunk parts into a final organized report
@@ -135,5 +146,8 @@ class PromptFactory:
     def get_chunk_prompt(self, file_type: str) -> str:
         return self.chunk_prompt_templates.get(file_type, self.chunk_prompt_templates["meeting"])
 
+    def get_chunk_followup_prompt(self, file_type: str) -> str:
+        return self.chunk_followup_templates.get(file_type, self.chunk_followup_templates["meeting"])
+
     def get_final_prompt(self, file_type: str) -> str:
         return self.final_prompt_templates.get(file_type, self.final_prompt_templates["meeting"])
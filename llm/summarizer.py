@@ -1,7 +1,105 @@
+import asyncio
 import re
-import requests
-import tiktoken
-from prompt_factory import PromptFactory
+import time
+from collections import OrderedDict
+
+from llm.prompt_factory import PromptFactory
+from common.metrics import Metrics
+from llm.llm_client import LLMClient
+from llm.token_budget import TokenCounter
+
+
+# CHUNK_PART ... --- UPDATED_CONTEXT ... (markdown decorations around the markers are tolerated).
+CHUNK_PATTERN = re.compile(
+    r"[\*#\s]*CHUNK_PART[\*#\s]*\s*(.*?)\s*---\s*[\*#\s]*UPDATED_CONTEXT[\*#\s]*\s*(.*)$",
+    re.DOTALL
+)
+CHUNK_MARKER = "CHUNK_PART"
+CONTEXT_MARKER = "UPDATED_CONTEXT"
+DECORATION = "*# \t\r\n"
+
+
+class ChunkStreamParser:
+    """
+    Incremental version of the CHUNK_PART / --- / UPDATED_CONTEXT parsing in `process_chunk`,
+    for answers that arrive a few tokens at a time.
+
+    `feed(text)` returns the part of the chunk summary that became certain with this text:
+    nothing before the CHUNK_PART marker, and nothing that might still turn out to be the
+    `---` delimiter or trailing whitespace. The final result is taken from the whole answer
+    with the same pattern as the non-streaming path, so both paths always agree.
+    """
+
+    def __init__(self):
+        self.raw = ""
+        self._chunk_start = None    # index in raw where the chunk summary starts
+        self._emitted = 0           # chars of the chunk summary handed out so far
+        self._done = False          # the delimiter was found; everything after it is context
+
+    @staticmethod
+    def _may_be_delimiter(tail):
+        """
+        True if `tail` (starting with '-') is, or could grow into, `---` + decorations + UPDATED_CONTEXT.
+        """
+        if len(tail) < 3:
+            return tail == "-" * len(tail)
+        if not tail.startswith("---"):
+            return False
+        rest = tail[3:].lstrip(DECORATION)
+        return CONTEXT_MARKER.startswith(rest) or rest.startswith(CONTEXT_MARKER)
+
+    def feed(self, text):
+        self.raw += text
+        if self._done:
+            return ""
+
+        if self._chunk_start is None:
+            marker = self.raw.find(CHUNK_MARKER)
+            if marker < 0:
+                return ""
+            self._chunk_start = marker + len(CHUNK_MARKER)
+
+        body = self.raw[self._chunk_start:]
+        stripped = body.lstrip(DECORATION)
+        if not stripped:
+            return ""
+        # Decorations after the marker are never part of the summary (like in CHUNK_PATTERN).
+        self._chunk_start += len(body) - len(stripped)
+        body = stripped
+
+        # Hold back from the first '-' that may start the delimiter.
+        safe = len(body)
+        position = body.find("-", self._emitted)
+        while position >= 0:
+            if self._may_be_delimiter(body[position:]):
+                if body[position:].lstrip("-").lstrip(DECORATION).startswith(CONTEXT_MARKER):
+                    self._done = True
+                safe = position
+                break
+            position = body.find("-", position + 1)
+        # Whitespace is only certain once something follows it.
+        safe = len(body[:safe].rstrip())
+
+        delta = body[self._emitted:safe] if safe > self._emitted else ""
+        self._emitted = max(self._emitted, safe)
+        return delta
+
+    def result(self, context_summary):
+        """
+        (chunk_part, updated_context) of the whole answer, exactly as `process_chunk` parses it.
+        """
+        return parse_chunk_response(self.raw.strip(), context_summary)
+
+
+def parse_chunk_response(raw_text, context_summary):
+    """
+    Split an answer into (chunk_part, updated_context); without the delimiter the whole
+    answer is the chunk part and the context stays as it was.
+    """
+    match = CHUNK_PATTERN.search(raw_text)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return raw_text, context_summary
 
 
 class Summarizer:
@@ -19,52 +117,170 @@ class Summarizer:
     CONTEXT_SUMMARY_TOKENS = 300    # Expected token length for the rolling context summary
     FINAL_SUMMARY_THRESHOLD = 4000  # Maximum tokens allowed for final summary input
     REDUCTION_CHUNK_SIZE = 2000     # Maximum tokens for each group during history reduction
+    SECTION_TOKENS = 3000           # Maximum transcript tokens per section in map-reduce summarization
+    MAP_CONCURRENCY = 4             # Sections summarized at the same time (match the LLM server's parallelism)
+    MAX_REDUCTION_ROUNDS = 4        # Hard cap on history reduction rounds (levels of the reduction tree)
+    SESSION_CONTEXT_TOKENS = 4096   # Budget of a reused Ollama context per live session (within num_ctx; 0 = no reuse)
+    MAX_SESSIONS = 256              # Live sessions whose Ollama context is kept
 
-    def __init__(self, model_name="llama3.1:latest"):
-        # LLM that we will be using
+    def __init__(self, model_name="llama3.1:latest", metrics=None, llm_client=None, token_counter=None,
+                 keep_alive=None, num_ctx=None, session_context_tokens=None):
+        # LLM that we will be using, and how long Ollama keeps it (and its cache) loaded between calls
         self.model_name = model_name
+        self.keep_alive = keep_alive
 
-        # Attempt to use tiktoken for more accurate token counting
-        try:
-            self.tokenizer = tiktoken.encoding_for_model("gpt-3.5-turbo")
-        except Exception:
-            self.tokenizer = None
+        # Context window requested from Ollama on every call (None = the server's default); the
+        # same value every time, since Ollama reloads the model when it changes
+        self.num_ctx = num_ctx
+
+        # Token budget of the Ollama context a live session carries from chunk to chunk (None =
+        # SESSION_CONTEXT_TOKENS, 0 = always send the full prompt)
+        self.session_context_tokens = (self.SESSION_CONTEXT_TOKENS if session_context_tokens is None
+                                       else session_context_tokens)
+
+        # Pooled connections, deadlines, retries and routing over one or more Ollama servers
+        self.llm_client = llm_client or LLMClient([self.API_URL])
+
+        # Timing spans of prompt building, LLM calls and parsing
+        self.metrics = metrics or Metrics("llm")
+
+        # Token counts for the budgets, with the model's own tokenizer (loaded lazily from local files)
+        self.token_counter = token_counter or TokenCounter(model_name)
 
         # We use a PromptFactory where all prompt templates are stored
         self.prompt_factory = PromptFactory()
 
+        # Per live session: Ollama's context after its last chunk, and the file type and rolling
+        # context of that chunk, so the next chunk can continue from it (LRU, MAX_SESSIONS)
+        self._sessions = OrderedDict()
+
     def _count_tokens(self, text: str) -> int:
         """
-        Count the approximate number of tokens in the text.
-        If tiktoken is available, use it; otherwise, fallback to simple word count.
+        Count the number of tokens in the text with the model's tokenizer
+        (an estimate if no tokenizer file is available, see TokenCounter).
         """
-        if self.tokenizer:
-            return len(self.tokenizer.encode(text))
-        return len(text.split())
+        return self.token_counter.count(text)
+
+    def _payload(self, prompt, context=None):
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt
+        }
+        if context:
+            payload["context"] = context
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        if self.num_ctx:
+            payload["options"] = {"num_ctx": self.num_ctx}
+        return payload
 
-    def _call_llm(self, prompt: str) -> str:
+    def _observe_tokens(self, data):
+        # Prefill is what the backend had to evaluate, i.e. the prompt minus what it had cached.
+        self.metrics.observe_tokens(data.get("prompt_eval_count"), "prompt_eval")
+        self.metrics.observe_tokens(data.get("eval_count"), "eval")
+
+    async def _call_llm(self, prompt: str, session=None, chunk=None, context=None, final=None) -> str:
         """
         A generic method for sending a prompt to the LLM endpoint (local or remote)
-        and retrieving the response.
+        and retrieving the response. The LLM client bounds the call with its deadline and
+        retries; if it still fails, the error is printed and an empty string returned, so
+        callers can fall back to their input.
 
         :param prompt: The complete text/prompt to be sent to the model.
+        :param session: Session id for the timing span log (optional).
+        :param chunk: Chunk id for the timing span log (optional).
+        :param context: Ollama context (token ids) of a previous call to continue from (optional).
+        :param final: Dict that receives Ollama's whole answer, e.g. its new `context` (optional).
         :return: The model's response as a string.
         """
-        payload = {
-            "model": self.model_name,
-            "prompt": prompt,
-            "stream": False
-        }
+        payload = self._payload(prompt, context)
         try:
-            resp = requests.post(self.API_URL, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
+            with self.metrics.span("llm_call", session, chunk):
+                data = await self.llm_client.generate(payload)
+            self._observe_tokens(data)
+            if final is not None:
+                final.update(data)
             return data.get("response", "").strip()
         except Exception as e:
-            print(f"Error while calling LLM: {e}")
+            print(f"Error while calling LLM (session={session}, chunk={chunk}): {e}")
             return ""
 
-    def process_chunk(self, chunk_text: str, context_summary: str, file_type: str) -> (str, str):
+    async def _stream_llm(self, prompt: str, session=None, chunk=None, context=None, final=None):
+        """
+        Like `_call_llm`, but with Ollama's streaming API: yields the answer piece by piece as
+        the model generates it. Errors are printed and end the stream early.
+
+        :param prompt: The complete text/prompt to be sent to the model.
+        :param session: Session id for the timing span logs (optional).
+        :param chunk: Chunk id for the timing span logs (optional).
+        :param context: Ollama context (token ids) of a previous call to continue from (optional).
+        :param final: Dict that receives Ollama's last ("done") message, e.g. its new `context` (optional).
+        """
+        payload = self._payload(prompt, context)
+        start = time.perf_counter()
+        first_token = True
+        try:
+            async for data in self.llm_client.stream(payload):
+                if data.get("response"):
+                    if first_token:
+                        # Time to first token: what a user watching the summary waits for.
+                        self.metrics.observe_stage("llm_first_token", time.perf_counter() - start, session, chunk)
+                        first_token = False
+                    yield data["response"]
+                if data.get("done"):
+                    self._observe_tokens(data)
+                    if final is not None:
+                        final.update(data)
+        except Exception as e:
+            print(f"Error while streaming from LLM (session={session}, chunk={chunk}): {e}")
+        finally:
+            self.metrics.observe_stage("llm_call", time.perf_counter() - start, session, chunk)
+
+    def _chunk_prompt(self, chunk_text, context_summary, file_type, session, reuse_context):
+        """
+        (prompt, Ollama context) for a chunk. If the previous chunk of the same live session
+        returned exactly this rolling context, the chunk continues from that chunk's Ollama
+        context with a short follow-up prompt: the instructions and the rolling context are
+        already in the backend's cache, so only the new transcript is prefilled. Otherwise
+        (first chunk, another caller's context, budget used up) the full prompt is sent; it
+        starts with the static instructions, so the backend's prefix cache can still hit.
+        """
+        state = self._sessions.get(session) if reuse_context and session is not None else None
+        if state and state["file_type"] == file_type and state["updated_context"] == context_summary:
+            prompt = self.prompt_factory.get_chunk_followup_prompt(file_type).format(chunk_text=chunk_text)
+            needed = (len(state["context"]) + self._count_tokens(prompt)
+                      + self.CHUNK_SUMMARY_TOKENS + self.CONTEXT_SUMMARY_TOKENS)
+            # The carried context has to fit the window Ollama was asked for, or it would be truncated.
+            budget = min(self.session_context_tokens, self.num_ctx) if self.num_ctx else self.session_context_tokens
+            if needed <= budget:
+                return prompt, state["context"]
+
+        prompt = self.prompt_factory.get_chunk_prompt(file_type).format(
+            chunk_text=chunk_text,
+            context_summary=context_summary
+        )
+        return prompt, None
+
+    def _remember_session(self, session, file_type, raw_text, updated_context, final):
+        """
+        Keep the Ollama context of a parsed answer for the session's next chunk; forget it otherwise.
+        """
+        self._sessions.pop(session, None)
+        if not final.get("context") or CONTEXT_MARKER not in raw_text:
+            return
+        self._sessions[session] = {"context": final["context"], "file_type": file_type,
+                                   "updated_context": updated_context}
+        while len(self._sessions) > self.MAX_SESSIONS:
+            self._sessions.popitem(last=False)
+
+    def end_session(self, session):
+        """
+        Drop the Ollama context kept for `session`.
+        """
+        self._sessions.pop(session, None)
+
+    async def process_chunk(self, chunk_text: str, context_summary: str, file_type: str,
+                            session=None, chunk=None, reuse_context=True) -> (str, str):
         """
         Process a transcript chunk, returning two parts:
           1) CHUNK_PART: summarized content from this chunk.
@@ -79,40 +295,66 @@ class Summarizer:
         :param chunk_text: The actual transcript text for this chunk.
         :param context_summary: The rolling context summary so far.
         :param file_type: 'meeting', 'lecture', or 'phone call'.
+        :param session: Session id for the timing span logs and the reused Ollama context (optional).
+        :param chunk: Chunk id for the timing span logs (optional).
+        :param reuse_context: Continue from the Ollama context of the session's previous chunk
+            when possible (see `_chunk_prompt`); off for chunks that are not consecutive.
         """
 
-        # Get the prompt template for chunk processing
-        prompt_template = self.prompt_factory.get_chunk_prompt(file_type)
+        with self.metrics.span("prompt_build", session, chunk):
+            # Full prompt (instructions first), or a follow-up to the session's previous chunk
+            prompt_filled, ollama_context = self._chunk_prompt(chunk_text, context_summary, file_type,
+                                                               session, reuse_context)
 
-        # Fill the template with the actual chunk and context
-        prompt_filled = prompt_template.format(
-            chunk_text=chunk_text,
-            context_summary=context_summary
-        )
-
-        raw_text = self._call_llm(prompt_filled)
+        final = {}
+        raw_text = await self._call_llm(prompt_filled, session, chunk, ollama_context, final)
         if not raw_text:
+            self.end_session(session)
             return "", context_summary
 
-        with open("raw_text.txt", "w", encoding="utf-8") as f:
-            f.write(raw_text)
+        # Parsing the two sections using a delimiter approach with '---' (raw text if it is missing)
+        with self.metrics.span("parse", session, chunk):
+            chunk_part, updated_context = parse_chunk_response(raw_text, context_summary)
+        if reuse_context and session is not None:
+            self._remember_session(session, file_type, raw_text, updated_context, final)
+        return chunk_part, updated_context
 
-        # Parsing the two sections using a delimiter approach with '---'
-        pattern = re.compile(
-            r"[\*#\s]*CHUNK_PART[\*#\s]*\s*(.*?)\s*---\s*[\*#\s]*UPDATED_CONTEXT[\*#\s]*\s*(.*)$",
-            re.DOTALL
-        )
+    async def process_chunk_stream(self, chunk_text: str, context_summary: str, file_type: str,
+                                   session=None, chunk=None, reuse_context=True):
+        """
+        Streaming version of `process_chunk`: the chunk summary is handed out while the LLM
+        is still writing it.
 
-        match = pattern.search(raw_text)
-        if match:
-            chunk_part = match.group(1).strip()
-            updated_context = match.group(2).strip()
-            return chunk_part, updated_context
+        Yields events:
+          {"type": "chunk_part", "text": ...}  new text of the chunk summary (in order),
+          {"type": "done", "chunk_summary": ..., "updated_context": ...}  once, at the end,
+        where the final values are parsed from the whole answer exactly like `process_chunk`
+        does (so they can differ from the streamed text if the answer had no delimiter).
+        """
+        with self.metrics.span("prompt_build", session, chunk):
+            prompt_filled, ollama_context = self._chunk_prompt(chunk_text, context_summary, file_type,
+                                                               session, reuse_context)
+
+        parser = ChunkStreamParser()
+        final = {}
+        async for piece in self._stream_llm(prompt_filled, session, chunk, ollama_context, final):
+            delta = parser.feed(piece)
+            if delta:
+                yield {"type": "chunk_part", "text": delta}
+
+        if not parser.raw.strip():
+            self.end_session(session)
+            yield {"type": "done", "chunk_summary": "", "updated_context": context_summary}
+            return
 
-        # If delimiter not found, fallback
-        return raw_text, context_summary
+        with self.metrics.span("parse", session, chunk):
+            chunk_part, updated_context = parser.result(context_summary)
+        if reuse_context and session is not None:
+            # Only a complete answer ("done" with a context) can be continued from.
+            self._remember_session(session, file_type, parser.raw, updated_context, final)
+        yield {"type": "done", "chunk_summary": chunk_part, "updated_context": updated_context}
 
-    def _summarize_text(self, text: str, target_length: int) -> str:
+    async def _summarize_text(self, text: str, target_length: int, session=None, chunk=None) -> str:
         """
         Summarize the given text into approximately `target_length` tokens.
         We keep it simple: a direct prompt to the LLM asking for a concise summary.
@@ -121,61 +363,195 @@ class Summarizer:
             f"Summarize the following text in around {target_length} tokens:\n\n{text}\n\n"
             "Provide only the summary text."
         )
-        return self._call_llm(prompt)
+        return await self._call_llm(prompt, session, chunk)
+
+    @staticmethod
+    def _pack_groups(token_counts, max_tokens):
+        """
+        Cut consecutive pieces into groups of at most `max_tokens` tokens (a piece that is
+        larger on its own gets its own group), so that the order of the history is kept.
+
+        Filling groups one after the other already gives the fewest groups, but leaves the
+        last one nearly empty; as the groups of a round run in parallel, the round takes as
+        long as its largest group. So the limit is lowered (binary search) to the smallest
+        one that still needs no more groups, which evens the groups out.
 
-    def reduce_history(self, history_list):
+        :param token_counts: Token count of every piece, in order.
+        :param max_tokens: Token limit per group.
+        :return: List of (start, end) index ranges.
+        """
+        def cut(limit):
+            groups, start, tokens = [], 0, 0
+            for index, count in enumerate(token_counts):
+                if index > start and tokens + count > limit:
+                    groups.append((start, index))
+                    start, tokens = index, 0
+                tokens += count
+            if token_counts:
+                groups.append((start, len(token_counts)))
+            return groups
+
+        groups = cut(max_tokens)
+        low = max(1, -(-sum(token_counts) // len(groups))) if groups else 1
+        high = max_tokens
+        while low < high:
+            middle = (low + high) // 2
+            if len(cut(middle)) <= len(groups):
+                high = middle
+            else:
+                low = middle + 1
+        return cut(high)
+
+    async def reduce_history(self, history_list, session=None):
         """
         This extra functions will used be only if the user wants a SHORT FINAL REPORT.
 
-        Iteratively reduces the length of the chunk summaries by summarizing them in groups
-        until the total token count is below FINAL_SUMMARY_THRESHOLD.
+        Reduces the length of the chunk summaries by summarizing them in groups until the total
+        token count is below FINAL_SUMMARY_THRESHOLD. Every round packs the summaries into
+        groups of at most REDUCTION_CHUNK_SIZE tokens and summarizes all groups of the round
+        concurrently, so the number of sequential LLM calls is the depth of the tree rather
+        than the number of groups. At most MAX_REDUCTION_ROUNDS rounds are made.
         For example:
             - Final summary has 7000 tokens.
             - Bring the summary down to 4000 tokens.
 
         :param history_list: A list of chunk-based summaries (strings).
+        :param session: Session id for the timing span logs (optional).
         :return: A reduced version of history_list that fits under the token threshold.
         """
-        combined_history = " ".join(history_list)
-        while self._count_tokens(combined_history) > self.FINAL_SUMMARY_THRESHOLD:
-            new_history_list = []
-            current_group = []
-            current_tokens = 0
-
-            for summary in history_list:
-                summary_tokens = self._count_tokens(summary)
-                if current_tokens + summary_tokens > self.REDUCTION_CHUNK_SIZE:
-                    group_text = " ".join(current_group)
-                    # Summarize this group down to CONTEXT_SUMMARY_TOKENS
-                    reduced_summary = self._summarize_text(group_text, self.CONTEXT_SUMMARY_TOKENS)
-                    new_history_list.append(reduced_summary)
-                    current_group = [summary]
-                    current_tokens = summary_tokens
-                else:
-                    current_group.append(summary)
-                    current_tokens += summary_tokens
-
-            if current_group:
-                group_text = " ".join(current_group)
-                reduced_summary = self._summarize_text(group_text, self.CONTEXT_SUMMARY_TOKENS)
-                new_history_list.append(reduced_summary)
-
-            history_list = new_history_list
-            combined_history = " ".join(history_list)
-
-        return history_list
-
-    def final_summary(self, history_list, file_type: str) -> str:
+        # Every piece is tokenized once; its count travels with it to the next round.
+        pieces = list(zip(history_list, self.token_counter.count_batch(history_list)))
+        limit = asyncio.Semaphore(self.MAP_CONCURRENCY)
+
+        async def reduce_group(round_index, group_index, group):
+            if len(group) == 1 and group[0][1] <= self.CONTEXT_SUMMARY_TOKENS:
+                # Already as short as a summary of it would be.
+                return group[0]
+            group_text = " ".join(text for text, _ in group)
+            async with limit:
+                # Summarize this group down to CONTEXT_SUMMARY_TOKENS
+                reduced_summary = await self._summarize_text(group_text, self.CONTEXT_SUMMARY_TOKENS, session,
+                                                             f"reduce-{round_index}-{group_index}")
+            if not reduced_summary:
+                # The LLM failed: keep the group as it was, so nothing is lost in the final report.
+                return group_text, sum(tokens for _, tokens in group)
+            return reduced_summary, self._count_tokens(reduced_summary)
+
+        total_tokens = sum(tokens for _, tokens in pieces)
+        for round_index in range(self.MAX_REDUCTION_ROUNDS):
+            if total_tokens <= self.FINAL_SUMMARY_THRESHOLD:
+                break
+            with self.metrics.span("reduce_round", session, round_index):
+                groups = self._pack_groups([tokens for _, tokens in pieces], self.REDUCTION_CHUNK_SIZE)
+                pieces = list(await asyncio.gather(*(reduce_group(round_index, group_index, pieces[start:end])
+                                                     for group_index, (start, end) in enumerate(groups))))
+            reduced_tokens = sum(tokens for _, tokens in pieces)
+            if reduced_tokens >= total_tokens:
+                print("History reduction made no progress; stopping.")
+                total_tokens = reduced_tokens
+                break
+            total_tokens = reduced_tokens
+        if total_tokens > self.FINAL_SUMMARY_THRESHOLD:
+            print(f"History still has ~{total_tokens} tokens after reduction "
+                  f"(threshold {self.FINAL_SUMMARY_THRESHOLD}).")
+
+        return [text for text, _ in pieces]
+
+    def split_sections(self, text: str, max_tokens: int = None):
+        """
+        Split a transcript into consecutive sections of at most `max_tokens` tokens.
+        Sections are cut between lines (one line per transcribed segment); a line that is
+        longer than the limit on its own is cut between words.
+
+        :param text: The full transcript.
+        :param max_tokens: Token limit per section (default: SECTION_TOKENS).
+        :return: List of section texts, in order.
+        """
+        max_tokens = max_tokens or self.SECTION_TOKENS
+
+        # (text, tokens) pieces; all lines are counted in one batch.
+        lines = [line for line in text.splitlines() if line.strip()]
+        pieces = []
+        for line, line_tokens in zip(lines, self.token_counter.count_batch(lines)):
+            if line_tokens <= max_tokens:
+                pieces.append((line, line_tokens))
+                continue
+            # Very long line: cut it between words.
+            current, current_tokens = [], 0
+            for word in line.split():
+                word_tokens = self._count_tokens(" " + word)
+                if current and current_tokens + word_tokens > max_tokens:
+                    pieces.append((" ".join(current), current_tokens))
+                    current, current_tokens = [], 0
+                current.append(word)
+                current_tokens += word_tokens
+            if current:
+                pieces.append((" ".join(current), current_tokens))
+
+        sections = []
+        current_section = []
+        current_tokens = 0
+        for piece, piece_tokens in pieces:
+            if current_section and current_tokens + piece_tokens > max_tokens:
+                sections.append("\n".join(current_section))
+                current_section = []
+                current_tokens = 0
+            current_section.append(piece)
+            current_tokens += piece_tokens
+        if current_section:
+            sections.append("\n".join(current_section))
+        return sections
+
+    async def map_reduce_summary(self, text: str, file_type: str, session=None) -> (str, list):
+        """
+        Summarize a whole transcript with map-reduce:
+          1) Map: split it into token-bounded sections and summarize them concurrently.
+          2) Reduce: shrink the section summaries with `reduce_history` if needed, then
+             combine them into one report with `final_summary`.
+
+        Sections are independent, so the wall-clock time is set by the slowest section
+        (times MAP_CONCURRENCY batches) plus the final call, not by the transcript length.
+
+        :param text: The full transcript.
+        :param file_type: 'meeting', 'lecture', or 'call'.
+        :param session: Session id for the timing span logs (optional); sections are logged as chunks.
+        :return: (final report, list of section summaries).
+        """
+        sections = self.split_sections(text)
+        if not sections:
+            return "", []
+
+        # The LLM client also limits calls per Ollama server; this keeps one transcript from taking all slots.
+        limit = asyncio.Semaphore(self.MAP_CONCURRENCY)
+
+        async def summarize(index, section):
+            # Sections are summarized independently, so the context only says where the section sits.
+            context = f"{file_type}, section {index + 1} of {len(sections)}"
+            async with limit:
+                chunk_part, _ = await self.process_chunk(section, context, file_type, session, index,
+                                                         reuse_context=False)
+            # If the LLM failed, keep the raw section so nothing is lost in the final report.
+            return chunk_part or section
+
+        print(f"Summarizing {len(sections)} sections, up to {self.MAP_CONCURRENCY} at a time ...")
+        section_summaries = list(await asyncio.gather(*(summarize(index, section)
+                                                        for index, section in enumerate(sections))))
+
+        history_list = await self.reduce_history(section_summaries, session)
+        return await self.final_summary(history_list, file_type, session), section_summaries
+
+    async def final_summary(self, history_list, file_type: str, session=None) -> str:
         """
         If the user wants, he can create a final, comprehensive report from the combined chunk summaries in `history_list`/
 
         :param history_list: List of all chunk_part texts.
         :param file_type: 'meeting', 'lecture', or 'call'.
+        :param session: Session id for the timing span log (optional).
         :return: The final, big organized report as a string.
         """
         combined_history = " ".join(history_list)
         final_prompt_template = self.prompt_factory.get_final_prompt(file_type)
         prompt = final_prompt_template.format(combined_history=combined_history)
 
-        final_text = self._call_llm(prompt)
+        final_text = await self._call_llm(prompt, session, "final")
         return final_text if final_text else combined_history
@@ -0,0 +1,211 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+try:
+    import tiktoken
+    from tiktoken.load import load_tiktoken_bpe
+except ImportError:
+    tiktoken = None
+
+# Bundled tokenizer files: tokenizers/<model>/tokenizer.json (Hugging Face format) or
+# tokenizers/<model>.tiktoken (tiktoken BPE ranks, e.g. Llama 3's tokenizer.model).
+TOKENIZER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tokenizers")
+
+# Pre-tokenization pattern of Llama 3 (used for tiktoken-format files).
+LLAMA3_PATTERN = (r"(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n]*"
+                  r"|\s*[\r\n]+|\s+(?!\S)|\s+")
+
+MODES = ("auto", "exact", "approx")
+
+
+def approximate_tokens(text):
+    """
+    Token estimate without a tokenizer: about 4 characters or 0.75 words per token for
+    English text with BPE vocabularies; the larger of both, so budgets err on the safe side.
+    """
+    if not text:
+        return 0
+    return int(max(len(text) / 4, len(text.split()) * 1.3) + 0.5)
+
+
+def model_candidates(model_name):
+    """
+    Names to look for, most specific first:
+    "llama3.1:latest" -> ["llama3.1", "llama3"], "library/qwen2.5-coder:7b" -> ["qwen2.5-coder", "qwen2.5", "qwen2"].
+    """
+    name = model_name.split("/")[-1].split(":")[0].lower()
+    candidates = []
+    while name and name not in candidates:
+        candidates.append(name)
+        shorter = re.sub(r"[.\-_][^.\-_]*$", "", name)
+        if shorter == name:
+            break
+        name = shorter
+    return candidates
+
+
+class TokenCounter:
+    """
+    Token counting for prompt budgets, with the tokenizer of the model that is actually used.
+
+    The tokenizer is loaded lazily on the first count, from local files only (never from the
+    network): `tokenizer_path` (a file, or a directory to search) or the bundled `tokenizers/`
+    directory, looking for a file matching `model_name`. Hugging Face `tokenizer.json` files
+    need the optional `tokenizers` package, `.tiktoken` files need `tiktoken`.
+
+    Modes:
+      - 'exact': count with the tokenizer; fail if none can be loaded.
+      - 'approx': estimate from characters and words (`approximate_tokens`), no tokenizer.
+      - 'auto': exact if a tokenizer is found, otherwise approximate (with a warning).
+
+    Counts are memoized in an LRU keyed by the text, since the same summaries and lines are
+    counted again and again while prompts are assembled.
+    """
+
+    def __init__(self, model_name="llama3.1:latest", mode="auto", tokenizer_path=None, cache_entries=4096):
+        """
+        :param model_name: Model whose tokenizer is wanted (Ollama name; the tag is ignored).
+        :param mode: 'auto', 'exact' or 'approx'.
+        :param tokenizer_path: Tokenizer file, or directory with tokenizer files (default: bundled directory).
+        :param cache_entries: Counts kept in the LRU (0 disables it).
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown token counting mode '{mode}', expected one of {', '.join(MODES)}")
+        self.model_name = model_name
+        self.mode = mode
+        self.tokenizer_path = tokenizer_path
+        self.cache_entries = cache_entries
+
+        self._encode = None         # text -> token count, once loaded
+        self._encode_batch = None   # list of texts -> list of token counts
+        self._source = None         # file the tokenizer was loaded from
+        self._loaded = mode == "approx"
+        self._load_lock = threading.Lock()
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _find_file(self):
+        """
+        Path of the tokenizer file to use, or None.
+        """
+        path = self.tokenizer_path or TOKENIZER_DIR
+        if os.path.isfile(path):
+            return path
+        if not os.path.isdir(path):
+            return None
+        names = []
+        for candidate in model_candidates(self.model_name):
+            names += [os.path.join(candidate, "tokenizer.json"), os.path.join(candidate, "tokenizer.model"),
+                      f"{candidate}.json", f"{candidate}.tiktoken"]
+        # A directory holding a single model's files.
+        names += ["tokenizer.json", "tokenizer.model"]
+        for name in names:
+            if os.path.isfile(os.path.join(path, name)):
+                return os.path.join(path, name)
+        return None
+
+    def _load_file(self, path):
+        if path.endswith(".json"):
+            if Tokenizer is None:
+                raise ImportError(f"Tokenizer {path} needs the tokenizers package (pip install tokenizers)")
+            tokenizer = Tokenizer.from_file(path)
+            self._encode = lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+            self._encode_batch = lambda texts: [len(encoding.ids) for encoding in
+                                                tokenizer.encode_batch(texts, add_special_tokens=False)]
+        else:
+            if tiktoken is None:
+                raise ImportError(f"Tokenizer {path} needs the tiktoken package (pip install tiktoken)")
+            encoding = tiktoken.Encoding(name=os.path.basename(path), pat_str=LLAMA3_PATTERN,
+                                         mergeable_ranks=load_tiktoken_bpe(path), special_tokens={})
+            self._encode = lambda text: len(encoding.encode_ordinary(text))
+            self._encode_batch = lambda texts: [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+        self._source = path
+
+    def _load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            path = self._find_file()
+            try:
+                if path is None:
+                    raise FileNotFoundError(f"No tokenizer file for '{self.model_name}' in "
+                                            f"{self.tokenizer_path or TOKENIZER_DIR}")
+                self._load_file(path)
+                print(f"[TokenCounter] Loaded tokenizer for '{self.model_name}' from {path}")
+            except Exception as e:
+                if self.mode == "exact":
+                    raise
+                print(f"[TokenCounter] {e}; token counts are approximate.")
+            self._loaded = True
+
+    def _remember(self, text, count):
+        if self.cache_entries <= 0:
+            return
+        with self._lock:
+            self._cache[text] = count
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def _cached(self, text):
+        with self._lock:
+            count = self._cache.get(text)
+            if count is None:
+                self._stats["misses"] += 1
+            else:
+                self._cache.move_to_end(text)
+                self._stats["hits"] += 1
+            return count
+
+    def count(self, text):
+        """
+        Number of tokens in `text`.
+        """
+        if not text:
+            return 0
+        count = self._cached(text)
+        if count is None:
+            if not self._loaded:
+                self._load()
+            count = self._encode(text) if self._encode else approximate_tokens(text)
+            self._remember(text, count)
+        return count
+
+    def count_batch(self, texts):
+        """
+        Token counts of several texts, in order; the uncached ones are encoded in one batch call.
+        """
+        counts = [self._cached(text) if text else 0 for text in texts]
+        missing = [index for index, count in enumerate(counts) if count is None]
+        if missing:
+            if not self._loaded:
+                self._load()
+            # Repeated texts are encoded once.
+            unique = list(dict.fromkeys(texts[index] for index in missing))
+            if self._encode_batch:
+                new_counts = dict(zip(unique, self._encode_batch(unique)))
+            else:
+                new_counts = {text: approximate_tokens(text) for text in unique}
+            for text, count in new_counts.items():
+                self._remember(text, count)
+            for index in missing:
+                counts[index] = new_counts[texts[index]]
+        return counts
+
+    def stats(self):
+        """
+        Where counts come from, and cache hits and misses.
+        """
+        with self._lock:
+            return {"model": self.model_name, "mode": self.mode,
+                    "tokenizer": self._source or ("approximate" if self._loaded else "not loaded"),
+                    "cache_entries": len(self._cache), **self._stats}
@@ -1,38 +1,135 @@
 # stt/app.py
-import asyncio
-from concurrent import futures
+import os
 import grpc
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from stt.classes.STT import STT
 from stt.classes.AudioStreamServicer import AudioStreamServicer
+from stt.classes.InferenceExecutor import InferenceExecutor
+from common.metrics import Metrics
 from stt.proto_repo import audio_pb2_grpc
 
+# Speech-to-text engine: "whisper" (openai-whisper, fp32) or "faster-whisper" (CTranslate2, int8 on CPU);
+# "simulated" loads no model (load tests and benchmarks).
+STT_BACKEND = os.environ.get("STT_BACKEND", "whisper")
+# Default Whisper model and memory budget (MB) for all loaded models.
+STT_DEFAULT_MODEL = os.environ.get("STT_DEFAULT_MODEL", "medium")
+STT_MAX_RSS_MB = int(os.environ["STT_MAX_RSS_MB"]) if os.environ.get("STT_MAX_RSS_MB") else None
+# Voice activity detection before inference: "energy", "webrtc" or "off".
+STT_VAD = os.environ.get("STT_VAD", "energy")
+# Inference threads, and how many more inference calls may wait before new work is rejected.
+STT_INFERENCE_WORKERS = int(os.environ.get("STT_INFERENCE_WORKERS", "8"))
+STT_INFERENCE_QUEUE = int(os.environ.get("STT_INFERENCE_QUEUE", "32"))
+# Longest wait for one transcription; a stream whose segment takes longer fails with DEADLINE_EXCEEDED.
+STT_INFERENCE_TIMEOUT_SEC = float(os.environ.get("STT_INFERENCE_TIMEOUT_SEC", "600"))
+# Transcription cache: in-memory entries (0 disables it), optional disk directory and its size cap (MB).
+STT_CACHE_ENTRIES = int(os.environ.get("STT_CACHE_ENTRIES", "10000"))
+STT_CACHE_DIR = os.environ.get("STT_CACHE_DIR") or None
+STT_CACHE_DISK_MB = int(os.environ.get("STT_CACHE_DISK_MB", "1024"))
+# Worker processes for inference, each with its own model and pinned cores (0 = in-process).
+STT_WORKERS = int(os.environ.get("STT_WORKERS", "0"))
+STT_CORES_PER_WORKER = int(os.environ["STT_CORES_PER_WORKER"]) if os.environ.get("STT_CORES_PER_WORKER") else None
+# Print every timing span (with session and chunk ids), not only export them on /metrics.
+STT_LOG_SPANS = os.environ.get("STT_LOG_SPANS", "0") == "1"
+
 app = FastAPI()
+stt_instance = None
+grpc_server = None
+inference_executor = None
+metrics = Metrics("stt", log_spans=STT_LOG_SPANS)
 
 @app.get("/")
 async def root():
     return {"message": "STT Service is running."}
 
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the event loop is responsive and the inference workers are not crash-looping.
+    if stt_instance is not None and not stt_instance.is_healthy():
+        return JSONResponse(status_code=503, content={"status": "workers failing"})
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    # Readiness: the gRPC server is up and the inference queue can take more work.
+    if grpc_server is None or inference_executor is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+
+    status = {
+        "outstanding": inference_executor.outstanding(),
+        "capacity": inference_executor.capacity,
+    }
+    if inference_executor.is_saturated():
+        return JSONResponse(status_code=503, content={"status": "saturated", **status})
+    return {"status": "ready", **status}
+
+@app.get("/stats")
+async def stats():
+    # How much audio the VAD skipped, how often the cache hit, and p50/p99 per stage since startup.
+    if stt_instance is None:
+        return {"vad": None, "cache": None, "latency": metrics.summary()}
+    return {
+        "vad": stt_instance.vad_stats(),
+        "cache": stt_instance.cache.stats() if stt_instance.cache else None,
+        "latency": metrics.summary()
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    # Stage latency and real-time factor histograms in the Prometheus text format.
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 def create_grpc_server():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    stt_instance = STT()
+    global stt_instance, inference_executor
+    server = grpc.aio.server(
+        options=[
+            # Let clients keep idle, long-lived channels open with keepalive pings.
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.min_ping_interval_without_data_ms", 10000),
+        ]
+    )
+    stt_instance = STT(
+        backend=STT_BACKEND,
+        model_size=STT_DEFAULT_MODEL,
+        max_rss_mb=STT_MAX_RSS_MB,
+        # Every inference thread waits on one segment, so a batch never holds more than that.
+        max_batch_size=STT_INFERENCE_WORKERS,
+        vad_mode=None if STT_VAD == "off" else STT_VAD,
+        workers=STT_WORKERS,
+        cores_per_worker=STT_CORES_PER_WORKER,
+        cache_entries=STT_CACHE_ENTRIES,
+        cache_dir=STT_CACHE_DIR,
+        cache_disk_mb=STT_CACHE_DISK_MB,
+        metrics=metrics,
+        inference_timeout_sec=STT_INFERENCE_TIMEOUT_SEC
+    )
+    inference_executor = InferenceExecutor(max_workers=STT_INFERENCE_WORKERS, max_queue=STT_INFERENCE_QUEUE)
     audio_pb2_grpc.add_AudioStreamServicer_to_server(
-        AudioStreamServicer(stt_function=stt_instance.transcribe), server)
+        AudioStreamServicer(stt_function=stt_instance.transcribe, executor=inference_executor, metrics=metrics),
+        server)
 
     server.add_insecure_port('[::]:50051')
     return server
 
-async def start_grpc_server():
-    grpc_server = create_grpc_server()
-    grpc_server.start()
-    print("gRPC STT server started on port 50051")
-    grpc_server.wait_for_termination()
-
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(start_grpc_server())
+    # The gRPC server runs on the same event loop as FastAPI; inference runs on the executor threads.
+    global grpc_server
+    server = create_grpc_server()
+    await server.start()
+    grpc_server = server
+    print("gRPC STT server started on port 50051")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if grpc_server is not None:
+        await grpc_server.stop(grace=5)
+    if inference_executor is not None:
+        inference_executor.shutdown()
+    if stt_instance is not None:
+        stt_instance.scheduler.stop()
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
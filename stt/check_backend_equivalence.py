@@ -0,0 +1,88 @@
+# stt/check_backend_equivalence.py
+"""
+Equivalence check between the STT backends.
+
+Transcribes the same audio files with the openai-whisper backend and the faster-whisper
+(CTranslate2 int8) backend and compares the transcripts by word error rate.
+Exits with a non-zero status when any file differs by more than --max-wer.
+The same comparison runs as a test in stt/tests/test_backend_equivalence.py.
+
+Usage:
+    python -m stt.check_backend_equivalence resources/phone_call_example.mp3 --model-size small
+"""
+import argparse
+import re
+import sys
+import time
+
+from stt.classes.STTBackend import create_backend
+
+
+def normalize(text):
+    """
+    Lowercase and strip punctuation so only wording differences count.
+    """
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Word-level Levenshtein distance divided by the reference length.
+    """
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcripts of the whisper and faster-whisper backends.")
+    parser.add_argument("audio_files", nargs="+", help="Audio/video files to transcribe.")
+    parser.add_argument("--model-size", default="small", help="Model size used by both backends.")
+    parser.add_argument("--max-wer", type=float, default=0.1, help="Maximum allowed word error rate between backends.")
+    args = parser.parse_args()
+
+    import whisper
+
+    backends = {
+        "whisper": create_backend("whisper", model_size=args.model_size),
+        "faster-whisper": create_backend("faster-whisper", model_size=args.model_size),
+    }
+
+    failed = False
+    for path in args.audio_files:
+        # Decode once (16 kHz mono float32) so both backends see exactly the same samples.
+        audio = whisper.load_audio(path)
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+
+        transcripts = {}
+        for name, backend in backends.items():
+            start = time.perf_counter()
+            transcripts[name] = backend.transcribe(audio)
+            elapsed = time.perf_counter() - start
+            print(f"[{name}] {path}: {elapsed:.1f}s for {duration:.1f}s of audio (RTF {elapsed / duration:.2f})")
+
+        wer = word_error_rate(transcripts["whisper"], transcripts["faster-whisper"])
+        status = "OK" if wer <= args.max_wer else "MISMATCH"
+        print(f"{status} {path}: WER between backends = {wer:.3f}\n")
+        if wer > args.max_wer:
+            failed = True
+            for name, text in transcripts.items():
+                print(f"--- {name} ---\n{text.strip()}\n")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
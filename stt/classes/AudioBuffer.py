@@ -0,0 +1,67 @@
+import numpy as np
+
+
+class AudioBuffer:
+    """
+    A preallocated, growable buffer of audio samples.
+
+    Appending doubles the capacity whenever it runs out, so receiving a stream of n samples
+    costs amortized O(n) copying instead of re-copying the whole stream on every chunk.
+    """
+
+    def __init__(self, initial_capacity=16000 * 30, dtype=np.float32):
+        """
+        :param initial_capacity: Number of samples to preallocate (default: 30s at 16 kHz).
+        :param dtype: Sample type stored in the buffer.
+        """
+        self._data = np.empty(max(1, int(initial_capacity)), dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, capacity):
+        """
+        Make sure the buffer can hold at least `capacity` samples.
+        """
+        if capacity <= len(self._data):
+            return
+        new_capacity = max(capacity, 2 * len(self._data))
+        new_data = np.empty(new_capacity, dtype=self._data.dtype)
+        new_data[:self._size] = self._data[:self._size]
+        self._data = new_data
+
+    def append(self, samples):
+        """
+        Copy `samples` to the end of the buffer.
+        :param samples: 1-D NumPy array (converted to the buffer dtype on copy).
+        """
+        n = len(samples)
+        self._reserve(self._size + n)
+        self._data[self._size:self._size + n] = samples
+        self._size += n
+
+    def extend(self, n):
+        """
+        Grow the buffer by `n` samples and return them as a writable view,
+        so decoders can write straight into the buffer without a temporary array.
+        """
+        self._reserve(self._size + n)
+        tail = self._data[self._size:self._size + n]
+        self._size += n
+        return tail
+
+    def view(self, start=0, end=None):
+        """
+        Return the samples in [start, end) as a view into the buffer (no copy).
+        The view stays valid until the buffer grows or is cleared.
+        """
+        if end is None or end > self._size:
+            end = self._size
+        return self._data[start:end]
+
+    def clear(self):
+        """
+        Drop all samples but keep the allocated memory for reuse.
+        """
+        self._size = 0
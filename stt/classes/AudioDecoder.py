@@ -0,0 +1,104 @@
+import io
+import numpy as np
+
+from stt.proto_repo import audio_pb2
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+
+class StreamResampler:
+    """
+    Linear-interpolation resampler that keeps its position between chunks,
+    so a stream resampled chunk by chunk has no seams at chunk boundaries.
+    """
+
+    def __init__(self, source_rate, target_rate):
+        self.step = source_rate / target_rate
+        self._position = 0.0      # position of the next output sample, relative to the pending samples
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def process(self, samples):
+        """
+        Resample `samples` (float32, mono) and return the output produced so far.
+        """
+        samples = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        # Output samples need a neighbour on both sides, so stop before the last input sample.
+        n_out = max(0, int(np.ceil((len(samples) - 1 - self._position) / self.step)))
+        positions = self._position + self.step * np.arange(n_out)
+        output = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+        next_position = self._position + self.step * n_out
+        keep_from = min(int(next_position), len(samples))
+        self._pending = samples[keep_from:].copy()
+        self._position = next_position - keep_from
+        return output
+
+
+class AudioDecoder:
+    """
+    Decodes incoming audio chunks (float32, int16 PCM, Opus, FLAC; any sample rate
+    and channel count) into the server's mono float32 working buffer.
+
+    Uncompressed mono audio at the working sample rate is converted straight into the
+    buffer's memory. Opus and FLAC need the optional `soundfile` package; every chunk must
+    then be a complete encoded stream (e.g. one Ogg Opus or FLAC file per chunk).
+    """
+
+    def __init__(self, sample_rate=16000):
+        """
+        :param sample_rate: The server's working sample rate (Hz).
+        """
+        self.sample_rate = sample_rate
+        self._resampler = None
+        self._resampler_rate = None
+
+    def decode_into(self, buffer, data, encoding=audio_pb2.FLOAT32, sample_rate=0, channels=0):
+        """
+        Decode `data` and append the result to `buffer` (an AudioBuffer).
+        :param encoding: An AudioEncoding value.
+        :param sample_rate: Sample rate of `data` (0 = working sample rate).
+        :param channels: Number of interleaved channels in `data` (0 = mono).
+        """
+        sample_rate = sample_rate or self.sample_rate
+        channels = channels or 1
+
+        if encoding == audio_pb2.FLOAT32:
+            samples, scale = np.frombuffer(data, dtype=np.float32), 1.0
+        elif encoding == audio_pb2.PCM_S16LE:
+            samples, scale = np.frombuffer(data, dtype="<i2"), 1.0 / 32768.0
+        elif encoding in (audio_pb2.OPUS, audio_pb2.FLAC):
+            if soundfile is None:
+                raise ValueError("Compressed audio needs the soundfile package on the STT server")
+            decoded, sample_rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+            channels = decoded.shape[1]
+            samples, scale = decoded.reshape(-1), 1.0
+        else:
+            raise ValueError(f"Unsupported audio encoding {encoding}")
+
+        if len(samples) % channels:
+            raise ValueError(f"Audio chunk has {len(samples)} samples, not a multiple of {channels} channels")
+        n_frames = len(samples) // channels
+
+        if sample_rate == self.sample_rate:
+            # Write (and downmix) directly into the buffer, no intermediate arrays.
+            out = buffer.extend(n_frames)
+            if channels == 1:
+                np.multiply(samples, scale, out=out, casting="unsafe")
+            else:
+                np.add.reduce(samples.reshape(n_frames, channels), axis=1, dtype=np.float32, out=out)
+                out *= scale / channels
+            return
+
+        # Different sample rate: downmix, then resample to the working rate.
+        if channels == 1:
+            mono = samples.astype(np.float32) * scale
+        else:
+            mono = np.add.reduce(samples.reshape(n_frames, channels), axis=1, dtype=np.float32) * (scale / channels)
+
+        if self._resampler is None or self._resampler_rate != sample_rate:
+            self._resampler = StreamResampler(sample_rate, self.sample_rate)
+            self._resampler_rate = sample_rate
+        buffer.append(self._resampler.process(mono))
@@ -1,37 +1,153 @@
+import itertools
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import grpc
 from stt.proto_repo import audio_pb2, audio_pb2_grpc
-import numpy as np
+from stt.classes.AudioBuffer import AudioBuffer
+from stt.classes.AudioDecoder import AudioDecoder
+from stt.classes.InferenceExecutor import InferenceExecutor, QueueFullError
+from common.metrics import Metrics
 
 class AudioStreamServicer(audio_pb2_grpc.AudioStreamServicer):
-    def __init__(self, stt_function):
+    # gRPC metadata key a client can use instead of the chunk's model_size.
+    MODEL_SIZE_METADATA_KEY = "model-size"
+    # gRPC metadata key a client can use to tag the stream's timing spans with its own session id.
+    SESSION_METADATA_KEY = "session-id"
+
+    def __init__(self, stt_function, executor=None, sample_rate=16000, partial_hop_sec=2.0, partial_window_sec=30.0,
+                 metrics=None):
         """
-        :param stt_function: a callable that receives a NumPy array and returns a transcription string.
+        Async (grpc.aio) servicer; the blocking `stt_function` runs on the inference executor.
+
+        :param stt_function: a callable that receives a NumPy array (and `model_size`, `session` and
+                             `chunk` keywords) and returns a transcription string.
+        :param executor: InferenceExecutor used for `stt_function` (a default one is created if None).
+        :param sample_rate: Working sample rate (Hz); incoming audio is resampled to it.
+        :param partial_hop_sec: Yield a partial transcription every time this many seconds of new audio
+                                have arrived. Set to 0 to only return the final transcription.
+        :param partial_window_sec: Partial transcriptions cover at most the last this-many seconds of audio.
+        :param metrics: Metrics that receive the decode/queue/inference timing spans (a private one if None).
         """
         self.stt_function = stt_function
+        self.executor = executor or InferenceExecutor()
+        self.sample_rate = sample_rate
+        self.partial_hop_samples = int(partial_hop_sec * sample_rate)
+        self.partial_window_samples = int(partial_window_sec * sample_rate)
+        self.metrics = metrics or Metrics("stt")
+        self._session_ids = itertools.count(1)
+
+    def _metadata(self, context):
+        if context is None:
+            return {}
+        return dict(context.invocation_metadata() or ())
+
+    async def StreamAudio(self, request_iterator, context):
+        # Version 1 chunks are always mono float32 at the working sample rate.
+        async for response in self._handle_errors(request_iterator, context, v2=False):
+            yield response
+
+    async def StreamAudioV2(self, request_iterator, context):
+        async for response in self._handle_errors(request_iterator, context, v2=True):
+            yield response
+
+    async def _handle_errors(self, request_iterator, context, v2):
+        try:
+            async for response in self._stream_audio(request_iterator, context, v2):
+                yield response
+        except QueueFullError as e:
+            # Backpressure: tell the client to retry later instead of queueing unbounded work.
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        except ValueError as e:
+            # e.g. an unknown model size or an undecodable chunk
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except (TimeoutError, FutureTimeoutError):
+            # Inference did not finish in time (e.g. a worker process hung).
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Transcription timed out")
+
+    async def _transcribe(self, audio_data, model_size, session, chunk, kind):
+        submitted = time.perf_counter()
 
-    def StreamAudio(self, request_iterator, context):
-        full_audio = None
+        def timed_stt():
+            # Time spent waiting for a free inference thread.
+            self.metrics.observe_stage("queue_wait", time.perf_counter() - submitted, session, chunk)
+            return self.stt_function(audio_data, model_size=model_size, session=session, chunk=chunk)
+
+        transcription = await self.executor.run(timed_stt)
+        elapsed = time.perf_counter() - submitted
+        self.metrics.observe_stage(f"inference_{kind}", elapsed, session, chunk)
+        self.metrics.observe_rtf(elapsed, len(audio_data) / self.sample_rate, kind=kind)
+        return transcription
+
+    async def _stream_audio(self, request_iterator, context, v2):
+        audio = AudioBuffer(initial_capacity=self.partial_window_samples or self.sample_rate * 30)
+        decoder = AudioDecoder(sample_rate=self.sample_rate)
+        metadata = self._metadata(context)
+        model_size = metadata.get(self.MODEL_SIZE_METADATA_KEY, "")
+        session = metadata.get(self.SESSION_METADATA_KEY) or f"stream-{next(self._session_ids)}"
+        expected_sequence = None
+        segment = 0
+
+        # The last partial transcription of the current segment: (window start, window end, text).
+        last_partial = None
+        last_partial_end = 0
 
         # Loop through the received chunks.
-        for audio_chunk in request_iterator:
+        async for audio_chunk in request_iterator:
+            # A model size set on the chunk overrides the metadata.
+            if audio_chunk.model_size:
+                model_size = audio_chunk.model_size
+
             data = audio_chunk.audio_data
+            end_of_segment = v2 and audio_chunk.end_of_segment
 
             # An empty audio chunk indicates the end of the stream.
-            if len(data) == 0:
+            if len(data) == 0 and not end_of_segment:
                 break
 
-            # Convert the received bytes into a numpy array of float32.
-            # (Assumes the client sends data as float32)
-            audio_np = np.frombuffer(data, dtype=np.float32)
-            # audio_np = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-
-            if full_audio is None:
-                full_audio = audio_np
+            # Decode the received bytes and append them to the buffer as mono float32.
+            decode_start = time.perf_counter()
+            if v2:
+                if expected_sequence is not None and audio_chunk.sequence != expected_sequence:
+                    print(f"[AudioStreamServicer] Expected chunk #{expected_sequence}, got #{audio_chunk.sequence}")
+                expected_sequence = audio_chunk.sequence + 1
+                if data:
+                    decoder.decode_into(audio, data, audio_chunk.encoding, audio_chunk.sample_rate,
+                                        audio_chunk.channels)
             else:
-                full_audio = np.concatenate((full_audio, audio_np))
+                decoder.decode_into(audio, data)
+            self.metrics.observe_stage("decode", time.perf_counter() - decode_start, session, segment)
+
+            # The client finished a segment: send its final transcription and start the next one.
+            if end_of_segment:
+                yield await self._final_response(audio, last_partial, model_size, session, segment)
+                audio.clear()
+                last_partial = None
+                last_partial_end = 0
+                segment += 1
+                continue
+
+            # Once enough new audio has arrived, transcribe the sliding window and send a partial result.
+            if self.partial_hop_samples and len(audio) - last_partial_end >= self.partial_hop_samples:
+                window_start = max(0, len(audio) - self.partial_window_samples)
+                window_end = len(audio)
+                transcription = await self._transcribe(audio.view(window_start, window_end), model_size,
+                                                       session, segment, kind="partial")
+                last_partial = (window_start, window_end, transcription)
+                last_partial_end = window_end
+                yield audio_pb2.STTResponse(transcription=transcription, is_final=False, segment=segment)
+
+        # Finish the last segment (a single-segment stream always gets a final response).
+        if len(audio) > 0 or segment == 0:
+            yield await self._final_response(audio, last_partial, model_size, session, segment)
 
+    async def _final_response(self, audio, last_partial, model_size, session, segment):
         # If no audio was received, return an empty transcription.
-        if full_audio is None:
+        if len(audio) == 0:
             transcription = ""
+        # If the last partial already covered the whole segment, it is the final transcription.
+        elif last_partial is not None and last_partial[0] == 0 and last_partial[1] == len(audio):
+            transcription = last_partial[2]
         else:
-            transcription = self.stt_function(full_audio)
-        yield audio_pb2.STTResponse(transcription=transcription)
+            transcription = await self._transcribe(audio.view(), model_size, session, segment, kind="final")
+        return audio_pb2.STTResponse(transcription=transcription, is_final=True, segment=segment)
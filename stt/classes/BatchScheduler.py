@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    """
+    Collects transcription requests coming from many gRPC threads and runs them
+    through the model together.
+
+    The worker thread waits for the first pending request, then keeps collecting more
+    for at most `max_wait_ms` (or until `max_batch_size` is reached) and hands the batch
+    to `batch_function`, one call per distinct key (e.g. model size). Every caller gets
+    its own result back through a Future.
+    """
+
+    def __init__(self, batch_function, max_batch_size=8, max_wait_ms=20, on_batch=None):
+        """
+        :param batch_function: a callable that receives a list of NumPy arrays and a key,
+                               and returns a list of transcription strings in the same order.
+        :param max_batch_size: Maximum number of requests run together.
+        :param max_wait_ms: How long to wait for more requests once the first one arrived.
+        :param on_batch: Optional callable(seconds, samples, batch_size) called after every batch
+                         with the time spent in `batch_function` and the number of samples decoded.
+        """
+        self.batch_function = batch_function
+        self.on_batch = on_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_sec = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, audio_data, key=None) -> Future:
+        """
+        Queue `audio_data` for the next batch.
+        :param key: Only requests with the same key are batched together.
+        :return: a Future resolving to the transcription string.
+        """
+        future = Future()
+        self._queue.put((audio_data, key, future))
+        return future
+
+    def transcribe(self, audio_data, key=None, timeout=None) -> str:
+        """
+        Blocking helper: submit `audio_data` and wait for its transcription.
+        :param timeout: Seconds to wait before giving up with TimeoutError (None = no limit).
+        """
+        return self.submit(audio_data, key).result(timeout)
+
+    def stop(self):
+        self._stop_event.set()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_sec
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop sentinel: put it back so the main loop sees it after this batch.
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            first = self._queue.get()
+            if first is None:
+                continue
+
+            groups = {}
+            for audio, key, future in self._collect_batch(first):
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(key, []).append((audio, future))
+
+            for key, batch in groups.items():
+                self._run_batch(batch, key)
+
+    def _run_batch(self, batch, key):
+        try:
+            start = time.perf_counter()
+            results = list(self.batch_function([audio for audio, _ in batch], key))
+            if len(results) != len(batch):
+                # Results cannot be matched to requests; fail them all rather than leave some waiting.
+                raise RuntimeError(f"Backend returned {len(results)} results for a batch of {len(batch)}")
+            if self.on_batch is not None:
+                self.on_batch(time.perf_counter() - start, sum(len(audio) for audio, _ in batch), len(batch))
+        except Exception as e:
+            print(f"[BatchScheduler] Batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,52 @@
+import numpy as np
+from faster_whisper import WhisperModel
+
+from stt.classes.STTBackend import STTBackend
+from stt.classes.ModelRegistry import ModelRegistry
+
+class FasterWhisper(STTBackend):
+    """
+    Whisper running on CTranslate2 (faster-whisper), quantized to int8 for CPU-only nodes.
+    """
+
+    # Approximate resident size of each model with int8 weights.
+    APPROX_MODEL_MB = {"tiny": 80, "base": 150, "small": 400, "medium": 1000}
+
+    def __init__(self, model_size="medium", max_rss_mb=None, compute_type="int8", cpu_threads=0, beam_size=1):
+        """
+        :param model_size: Default model size: 'tiny', 'base', 'small' or 'medium'.
+        :param max_rss_mb: Memory budget in MB; least recently used models are evicted above it.
+        :param compute_type: CTranslate2 compute type, e.g. 'int8', 'int8_float32', 'float32'.
+        :param cpu_threads: Threads per model (0 = CTranslate2 default).
+        :param beam_size: Beam size for decoding (1 = greedy, same as the default Whisper backend).
+        """
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+        self.registry = ModelRegistry(
+            loader=self._load_model,
+            default_size=model_size,
+            max_rss_mb=max_rss_mb,
+            approx_model_mb=self.APPROX_MODEL_MB
+        )
+
+    def _load_model(self, model_size):
+        return WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads
+        )
+
+    def transcribe(self, audio_data, model_size=None):
+        """
+        Transcribe a float32 NumPy array (16 kHz) and return the full text.
+        :param model_size: Model size to use (None = default).
+        """
+        model = self.registry.get(model_size)
+        segments, _ = model.transcribe(
+            np.ascontiguousarray(audio_data, dtype=np.float32),
+            beam_size=self.beam_size
+        )
+        # Segments are produced lazily; joining them runs the decoder.
+        return "".join(segment.text for segment in segments)
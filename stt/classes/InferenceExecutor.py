@@ -0,0 +1,72 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """
+    Raised when the inference queue cannot take more work.
+    """
+
+
+class InferenceExecutor:
+    """
+    Runs blocking inference calls off the event loop on a fixed-size thread pool.
+
+    At most `max_workers` calls run at once and at most `max_queue` more may wait;
+    anything beyond that is rejected with QueueFullError instead of piling up.
+    """
+
+    def __init__(self, max_workers=8, max_queue=32):
+        """
+        :param max_workers: Number of inference threads. Keep it at least as large as the batch size,
+                            otherwise batches can never fill up.
+        :param max_queue: Number of calls allowed to wait for a free thread.
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return self.max_workers + self.max_queue
+
+    def outstanding(self):
+        """
+        Number of calls currently running or waiting.
+        """
+        with self._lock:
+            return self._outstanding
+
+    def is_saturated(self):
+        return self.outstanding() >= self.capacity
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Run `function(*args, **kwargs)` on the inference pool and await its result.
+        Raises QueueFullError right away if the pool and its queue are full.
+        """
+        with self._lock:
+            if self._outstanding >= self.capacity:
+                raise QueueFullError(f"Inference queue is full ({self._outstanding} calls outstanding)")
+            self._outstanding += 1
+
+        try:
+            future = self._executor.submit(functools.partial(function, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Released when the call itself is done (or cancelled before it started), not when the
+        # awaiting request goes away: a cancelled request leaves its call running on the pool.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self._outstanding -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,121 @@
+import gc
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def current_rss_mb():
+    """
+    Resident memory of this process in MB, or None if it cannot be measured.
+    Uses psutil when installed, otherwise /proc (Linux).
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Keeps several model sizes available in one process.
+
+    Models are loaded lazily the first time they are requested and kept in LRU order.
+    When the process RSS goes over `max_rss_mb`, the least recently used models are dropped
+    (the model being requested is never evicted).
+    """
+
+    MODEL_SIZES = ("tiny", "base", "small", "medium")
+
+    # Rough resident size of each model in fp32, used to make room before loading.
+    APPROX_MODEL_MB = {"tiny": 150, "base": 300, "small": 1000, "medium": 3000}
+
+    def __init__(self, loader, default_size="medium", max_rss_mb=None, approx_model_mb=None):
+        """
+        :param loader: a callable that receives a model size and returns the loaded model.
+        :param default_size: Model size used when a request does not pick one.
+        :param max_rss_mb: Memory budget for the whole process in MB (None = unlimited).
+        :param approx_model_mb: Per-size memory estimates overriding APPROX_MODEL_MB (e.g. for quantized models).
+        """
+        if default_size not in self.MODEL_SIZES:
+            raise ValueError(f"Unknown default model size '{default_size}', expected one of {', '.join(self.MODEL_SIZES)}")
+        self.loader = loader
+        self.default_size = default_size
+        self.max_rss_mb = max_rss_mb
+        self.approx_model_mb = approx_model_mb or self.APPROX_MODEL_MB
+
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {size: threading.Lock() for size in self.MODEL_SIZES}
+
+    def validate(self, model_size):
+        """
+        Return the model size to use for `model_size` (the default if empty).
+        Raises ValueError for unknown sizes.
+        """
+        if not model_size:
+            return self.default_size
+        if model_size not in self.MODEL_SIZES:
+            raise ValueError(f"Unknown model size '{model_size}', expected one of {', '.join(self.MODEL_SIZES)}")
+        return model_size
+
+    def loaded_sizes(self):
+        with self._lock:
+            return list(self._models.keys())
+
+    def get(self, model_size=None):
+        """
+        Return the model for `model_size`, loading it if needed.
+        """
+        model_size = self.validate(model_size)
+
+        with self._lock:
+            if model_size in self._models:
+                self._models.move_to_end(model_size)
+                return self._models[model_size]
+
+        # Only one thread loads a given size; the others wait for it.
+        with self._load_locks[model_size]:
+            with self._lock:
+                if model_size in self._models:
+                    self._models.move_to_end(model_size)
+                    return self._models[model_size]
+                self._evict(keep=model_size, incoming_mb=self.approx_model_mb.get(model_size, 0))
+
+            print(f"[ModelRegistry] Loading '{model_size}' model...")
+            model = self.loader(model_size)
+
+            with self._lock:
+                self._models[model_size] = model
+                self._evict(keep=model_size)
+            return model
+
+    def _evict(self, keep, incoming_mb=0):
+        """
+        Drop least recently used models until the RSS (plus `incoming_mb`) fits the budget.
+        Must be called with self._lock held.
+        """
+        if self.max_rss_mb is None:
+            return
+
+        while True:
+            rss = current_rss_mb()
+            if rss is None or rss + incoming_mb <= self.max_rss_mb:
+                return
+
+            candidates = [size for size in self._models if size != keep]
+            if not candidates:
+                return
+
+            evicted = candidates[0]
+            del self._models[evicted]
+            gc.collect()
+            print(f"[ModelRegistry] Evicted '{evicted}' model (RSS {rss:.0f} MB > {self.max_rss_mb} MB budget)")
@@ -1,12 +1,143 @@
-from stt.classes.Whisper import Whisper
+import threading
+import time
+
+from stt.classes.STTBackend import create_backend
+from stt.classes.BatchScheduler import BatchScheduler
+from common.metrics import Metrics
+from stt.classes.ModelRegistry import ModelRegistry
+from stt.classes.TranscriptionCache import TranscriptionCache
+from stt.classes.VAD import VAD
+from stt.classes.WorkerPool import WorkerPool
 
 class STT:
-    def __init__(self):
-        self.whisper = Whisper()
+    def __init__(self, backend="whisper", model_size="medium", max_rss_mb=None, max_batch_size=8, max_wait_ms=20,
+                 backend_options=None, vad_mode="energy", sample_rate=16000, workers=0, cores_per_worker=None,
+                 cache_entries=10000, cache_dir=None, cache_disk_mb=1024, metrics=None, inference_timeout_sec=600):
+        """
+        :param backend: Speech-to-text engine: 'whisper' (openai-whisper) or 'faster-whisper' (CTranslate2 int8),
+                        or 'simulated' (no model, for benchmarks).
+        :param model_size: Default model size for requests that do not pick one.
+        :param max_rss_mb: Memory budget for loaded models (None = unlimited), per process.
+        :param max_batch_size: Maximum number of segments (from all active streams) run as one batch.
+        :param max_wait_ms: How long the scheduler waits for more segments before running a batch.
+        :param backend_options: Extra keyword arguments for the backend (e.g. {"compute_type": "int8"}).
+        :param vad_mode: Voice activity detection in front of inference: 'energy', 'webrtc' or None to disable.
+        :param sample_rate: Sample rate of the audio passed to transcribe (Hz).
+        :param workers: Number of worker processes running inference (0 = run it in this process).
+        :param cores_per_worker: CPU cores pinned to each worker process (default: split evenly).
+        :param cache_entries: Transcriptions kept in the in-memory cache (0 disables caching).
+        :param cache_dir: Directory for the on-disk cache tier (None = memory only).
+        :param cache_disk_mb: Size cap of the on-disk cache tier in MB.
+        :param metrics: Metrics that receive the cache/VAD/model timing spans (a private one if None).
+        :param inference_timeout_sec: Longest wait for one transcription before TimeoutError (None = no limit).
+        """
+        backend_kwargs = dict(model_size=model_size, max_rss_mb=max_rss_mb, **(backend_options or {}))
+        self.sample_rate = sample_rate
+        self.metrics = metrics or Metrics("stt")
+
+        if workers:
+            # Models live in the worker processes; the registry here only validates model sizes.
+            self.scheduler = WorkerPool(
+                num_workers=workers,
+                backend=backend,
+                backend_kwargs=backend_kwargs,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                cores_per_worker=cores_per_worker,
+                on_batch=self._observe_batch
+            )
+            self.registry = ModelRegistry(loader=None, default_size=model_size)
+        else:
+            self.backend = create_backend(backend, **backend_kwargs)
+            self.scheduler = BatchScheduler(
+                batch_function=self.backend.transcribe_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                on_batch=self._observe_batch
+            )
+            self.registry = self.backend.registry
+
+        self.inference_timeout_sec = inference_timeout_sec
+        self.vad = VAD(mode=vad_mode, sample_rate=sample_rate) if vad_mode else None
+
+        # Everything besides the audio and model size that changes a transcription is part of the cache key.
+        self.cache = None
+        if cache_entries:
+            settings = f"{backend}|{sorted((backend_options or {}).items())}|vad={vad_mode}|sr={sample_rate}"
+            self.cache = TranscriptionCache(settings, max_entries=cache_entries, cache_dir=cache_dir,
+                                            max_disk_mb=cache_disk_mb)
+
+        # How much audio the VAD kept away from the model.
+        self._vad_lock = threading.Lock()
+        self._vad_stats = {"chunks": 0, "silent_chunks": 0, "audio_sec": 0.0, "skipped_sec": 0.0}
+
+    def vad_stats(self):
+        """
+        Totals since startup: chunks seen, chunks that were entirely silent,
+        seconds of audio received and seconds skipped by the VAD.
+        """
+        with self._vad_lock:
+            stats = dict(self._vad_stats)
+        stats["skipped_ratio"] = stats["skipped_sec"] / stats["audio_sec"] if stats["audio_sec"] else 0.0
+        return stats
+
+    def is_healthy(self):
+        """
+        False while the inference worker processes keep dying (see WorkerPool.is_healthy).
+        """
+        return self.scheduler.is_healthy() if isinstance(self.scheduler, WorkerPool) else True
+
+    def _observe_batch(self, seconds, samples, batch_size):
+        # Time inside the model for one batch; its RTF is relative to all audio in the batch.
+        self.metrics.observe_stage("model", seconds)
+        self.metrics.observe_rtf(seconds, samples / self.sample_rate, kind="model")
+
+    def _record_vad(self, total_samples, skipped_samples):
+        with self._vad_lock:
+            self._vad_stats["chunks"] += 1
+            self._vad_stats["silent_chunks"] += int(total_samples > 0 and skipped_samples == total_samples)
+            self._vad_stats["audio_sec"] += total_samples / self.sample_rate
+            self._vad_stats["skipped_sec"] += skipped_samples / self.sample_rate
+
+    def transcribe(self, audio_data, model_size=None, session=None, chunk=None):
+        # audio_data is a numpy array of audio samples; session and chunk only tag the timing spans.
+        model_size = self.registry.validate(model_size)
+
+        # Audio we have already transcribed with the same settings comes straight from the cache.
+        cache_key = None
+        if self.cache is not None:
+            with self.metrics.span("cache_lookup", session, chunk):
+                cache_key = self.cache.key(audio_data, model_size)
+                cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"Transcription ({model_size}, cached):", cached)
+                return cached
+
+        transcription = self._transcribe(audio_data, model_size, session, chunk)
+        if cache_key is not None:
+            self.cache.put(cache_key, transcription)
+        return transcription
+
+    def _transcribe(self, audio_data, model_size, session=None, chunk=None):
+        # Drop non-speech audio; all-silent chunks never reach the model.
+        if self.vad is not None:
+            with self.metrics.span("vad", session, chunk):
+                audio_data, skipped = self.vad.trim(audio_data)
+            self._record_vad(len(audio_data) + skipped, skipped)
+            if len(audio_data) == 0:
+                print(f"Transcription ({model_size}): <silence, skipped {skipped / self.sample_rate:.1f}s>")
+                return ""
+            if skipped:
+                print(f"VAD skipped {skipped / self.sample_rate:.1f}s of non-speech audio")
 
-    def transcribe(self, audio_data):
-        # audio_data is a numpy array of audio samples.
-        transcription = self.whisper.transcribe(audio_data)
+        # The speech is queued together with segments from other streams (using the same model)
+        # and decoded as one batch, in this process or in a worker process.
+        start = time.perf_counter()
+        transcription = self.scheduler.transcribe(audio_data, key=model_size, timeout=self.inference_timeout_sec)
+        elapsed = time.perf_counter() - start
+        # Includes the wait for the batch to fill; the time inside the model is the "model" stage (per batch).
+        self.metrics.observe_stage("batch_and_model", elapsed, session, chunk)
+        self.metrics.observe_rtf(elapsed, len(audio_data) / self.sample_rate, kind="batch_and_model")
 
-        print("Transcription:", transcription)
+        print(f"Transcription ({model_size}):", transcription)
         return transcription
@@ -0,0 +1,38 @@
+class STTBackend:
+    """
+    Interface every speech-to-text engine used by STT implements.
+
+    A backend owns a ModelRegistry (`self.registry`) for its models and transcribes
+    float32 NumPy arrays sampled at 16 kHz.
+    """
+
+    def transcribe(self, audio_data, model_size=None):
+        """
+        Transcribe a single audio array and return the text.
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(self, audio_list, model_size=None):
+        """
+        Transcribe several audio arrays and return the texts in the same order.
+        Backends without real batching can fall back to one call per array.
+        """
+        return [self.transcribe(audio_data, model_size) for audio_data in audio_list]
+
+
+def create_backend(name, **kwargs):
+    """
+    Build the backend called `name` ('whisper', 'faster-whisper' or 'simulated', a model-free
+    stand-in for benchmarks and load tests).
+    Backends are imported lazily so only the selected engine has to be installed.
+    """
+    if name == "whisper":
+        from stt.classes.Whisper import Whisper
+        return Whisper(**kwargs)
+    if name == "faster-whisper":
+        from stt.classes.FasterWhisper import FasterWhisper
+        return FasterWhisper(**kwargs)
+    if name == "simulated":
+        from stt.classes.SimulatedBackend import SimulatedBackend
+        return SimulatedBackend(**kwargs)
+    raise ValueError(f"Unknown STT backend '{name}', expected 'whisper', 'faster-whisper' or 'simulated'")
@@ -0,0 +1,57 @@
+import hashlib
+import time
+
+from stt.classes.ModelRegistry import ModelRegistry
+from stt.classes.STTBackend import STTBackend
+
+# Filler vocabulary for the generated transcripts.
+WORDS = (
+    "the", "budget", "meeting", "we", "should", "review", "project", "timeline", "next", "week", "agree",
+    "proposal", "council", "students", "example", "question", "customer", "order", "update", "team",
+    "decision", "action", "item", "deadline", "report", "change", "plan", "support", "issue", "result"
+)
+
+
+class SimulatedBackend(STTBackend):
+    """
+    Stand-in for a Whisper model in benchmarks and load tests: no model is loaded, a batch
+    takes `overhead_sec` plus `rtf` times its longest audio (batched decoding is bounded by
+    the longest item), and the transcript is filler text whose length follows the audio
+    duration and whose words follow its content (same audio, same text).
+    """
+
+    def __init__(self, model_size="medium", max_rss_mb=None, rtf=0.1, overhead_sec=0.005, words_per_sec=2.5,
+                 load_sec=0.0, sample_rate=16000):
+        """
+        :param model_size: Default model size (only validated, all sizes behave the same).
+        :param max_rss_mb: Memory budget, passed to the registry.
+        :param rtf: Simulated real-time factor of the model.
+        :param overhead_sec: Fixed time per batch.
+        :param words_per_sec: Words generated per second of audio.
+        :param load_sec: Simulated model load time (once per model size).
+        :param sample_rate: Sample rate of the audio passed in (Hz).
+        """
+        self.rtf = rtf
+        self.overhead_sec = overhead_sec
+        self.words_per_sec = words_per_sec
+        self.load_sec = load_sec
+        self.sample_rate = sample_rate
+        self.registry = ModelRegistry(loader=self._load, default_size=model_size, max_rss_mb=max_rss_mb)
+
+    def _load(self, model_size):
+        time.sleep(self.load_sec)
+        return model_size
+
+    def _text(self, audio_data):
+        n_words = int(len(audio_data) / self.sample_rate * self.words_per_sec)
+        digest = hashlib.blake2b(audio_data.tobytes(), digest_size=32).digest()
+        return " ".join(WORDS[digest[i % len(digest)] % len(WORDS)] for i in range(n_words))
+
+    def transcribe(self, audio_data, model_size=None):
+        return self.transcribe_batch([audio_data], model_size)[0]
+
+    def transcribe_batch(self, audio_list, model_size=None):
+        self.registry.get(model_size)
+        longest_sec = max((len(audio_data) for audio_data in audio_list), default=0) / self.sample_rate
+        time.sleep(self.overhead_sec + self.rtf * longest_sec)
+        return [self._text(audio_data) for audio_data in audio_list]
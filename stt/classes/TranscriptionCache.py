@@ -0,0 +1,160 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache of transcriptions.
+
+    Keys are a hash of the audio samples plus everything that changes the output
+    (backend, model, decoding and VAD settings). Lookups go to an in-memory LRU first,
+    then to an optional on-disk tier (one small text file per entry) whose total size is
+    capped; the least recently used files are deleted above the cap.
+    """
+
+    def __init__(self, settings="", max_entries=10000, cache_dir=None, max_disk_mb=1024):
+        """
+        :param settings: Description of the settings that affect transcriptions; part of every key.
+        :param max_entries: Entries kept in memory.
+        :param cache_dir: Directory for the on-disk tier (None = memory only).
+        :param max_disk_mb: Size cap of the on-disk tier in MB.
+        """
+        self.settings = settings
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self._disk_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    def key(self, audio_data, model_size):
+        """
+        Hash of the audio samples, the model size and the cache settings.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{self.settings}|{model_size}|".encode("utf-8"))
+        digest.update(np.ascontiguousarray(audio_data, dtype=np.float32).data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def _disk_entries(self):
+        """
+        Yield (path, size, last access time) of every file in the disk tier.
+        """
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def get(self, key):
+        """
+        Return the cached transcription for `key`, or None.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    transcription = f.read()
+                # Touch the file so disk eviction sees it as recently used.
+                os.utime(path)
+            except OSError:
+                pass
+            else:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._put_memory(key, transcription)
+                return transcription
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key, transcription):
+        """
+        Cache `transcription` under `key`. Disk errors are logged and otherwise ignored:
+        the entry then only lives in memory.
+        """
+        with self._lock:
+            self._put_memory(key, transcription)
+
+        if self.cache_dir:
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(transcription)
+                with self._lock:
+                    # Replacing an entry that is already on disk only adds the difference in size.
+                    old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                    os.replace(tmp_path, path)
+                    self._disk_bytes += os.path.getsize(path) - old_size
+                    over_cap = self._disk_bytes > self.max_disk_bytes
+            except OSError as e:
+                print(f"[TranscriptionCache] Could not write {path}: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+            if over_cap:
+                self._evict_disk()
+
+    def _put_memory(self, key, transcription):
+        # Must be called with self._lock held.
+        self._memory[key] = transcription
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """
+        Delete the least recently used files until the disk tier is at 90% of its cap.
+        """
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self):
+        """
+        Hit/miss counters since startup.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
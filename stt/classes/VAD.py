@@ -0,0 +1,102 @@
+import numpy as np
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+
+class VAD:
+    """
+    Voice activity detection in front of the STT model.
+
+    Audio is split into short frames that are classified as speech or not, either by
+    their energy ('energy' mode) or by WebRTC's VAD model ('webrtc' mode, needs the
+    optional `webrtcvad` package). Speech frames are padded on both sides and merged into
+    regions; everything outside those regions is dropped before inference.
+    """
+
+    def __init__(self, mode="energy", sample_rate=16000, frame_ms=30, energy_threshold_db=-45.0,
+                 aggressiveness=2, padding_ms=300, min_speech_ms=150):
+        """
+        :param mode: 'energy' or 'webrtc'.
+        :param sample_rate: Sample rate of the audio (Hz).
+        :param frame_ms: Frame length used for classification (10, 20 or 30 for webrtc).
+        :param energy_threshold_db: Frames louder than this RMS level (dBFS) count as speech in 'energy' mode.
+        :param aggressiveness: WebRTC VAD aggressiveness, 0 (least) to 3 (most).
+        :param padding_ms: Audio kept before and after every speech frame, so words are not clipped.
+        :param min_speech_ms: Speech regions shorter than this are treated as noise.
+        """
+        if mode == "webrtc" and webrtcvad is None:
+            raise ImportError("VAD mode 'webrtc' needs the webrtcvad package (pip install webrtcvad)")
+        if mode not in ("energy", "webrtc"):
+            raise ValueError(f"Unknown VAD mode '{mode}', expected 'energy' or 'webrtc'")
+
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.energy_threshold_db = energy_threshold_db
+        self.padding_frames = int(padding_ms / frame_ms)
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self._webrtc = webrtcvad.Vad(aggressiveness) if mode == "webrtc" else None
+
+    def _speech_frames(self, audio):
+        """
+        Return a boolean array with one entry per full frame of `audio`.
+        """
+        n_frames = len(audio) // self.frame_samples
+        frames = np.asarray(audio[:n_frames * self.frame_samples], dtype=np.float32).reshape(n_frames, self.frame_samples)
+
+        if self._webrtc is not None:
+            pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype(np.int16)
+            return np.array([self._webrtc.is_speech(frame.tobytes(), self.sample_rate) for frame in pcm], dtype=bool)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+        return energy_db > self.energy_threshold_db
+
+    @staticmethod
+    def _runs(mask):
+        """
+        Return the (start, end) frame indices of the runs of True in `mask`.
+        """
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        return zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+
+    def speech_regions(self, audio):
+        """
+        Find the speech regions in `audio`.
+        :return: List of (start, end) sample indices.
+        """
+        speech = self._speech_frames(audio)
+
+        # Drop speech runs too short to be words, before padding makes every run long enough.
+        for start, end in self._runs(speech):
+            if end - start < self.min_speech_frames:
+                speech[start:end] = False
+        if not speech.any():
+            return []
+
+        # Keep `padding_frames` around every speech frame (a dilation of the speech mask).
+        if self.padding_frames:
+            kernel = np.ones(2 * self.padding_frames + 1, dtype=int)
+            speech = np.convolve(speech.astype(int), kernel, mode="same") > 0
+
+        regions = []
+        for start, end in self._runs(speech):
+            end_sample = len(audio) if end == len(speech) else end * self.frame_samples
+            regions.append((start * self.frame_samples, end_sample))
+        return regions
+
+    def trim(self, audio):
+        """
+        Remove the non-speech parts of `audio`.
+        :return: (speech audio, number of skipped samples). Speech audio is empty for all-silent input.
+        """
+        regions = self.speech_regions(audio)
+        kept = sum(end - start for start, end in regions)
+        if kept == len(audio):
+            return audio, 0
+        if not regions:
+            return audio[:0], len(audio)
+        return np.concatenate([audio[start:end] for start, end in regions]), len(audio) - kept
@@ -1,17 +1,66 @@
+import numpy as np
+import torch
 import whisper
 
-class Whisper:
-    def __init__(self, model_size="medium"):
+from stt.classes.STTBackend import STTBackend
+from stt.classes.ModelRegistry import ModelRegistry
+
+class Whisper(STTBackend):
+    def __init__(self, model_size="medium", max_rss_mb=None):
         """
-        Initialize the Whisper model.
-        :param model_size: e.g., 'small', 'medium', 'large', etc.
+        Initialize the Whisper model registry. Models are loaded on first use.
+        :param model_size: Default model size: 'tiny', 'base', 'small' or 'medium'.
+        :param max_rss_mb: Memory budget in MB; least recently used models are evicted above it.
         """
-        self.model = whisper.load_model(model_size)
+        self.registry = ModelRegistry(
+            loader=whisper.load_model,
+            default_size=model_size,
+            max_rss_mb=max_rss_mb
+        )
 
-    def transcribe(self, file_path):
+    def transcribe(self, file_path, model_size=None):
         """
         Transcribe a given audio (or video) file and return the full text.
         :param file_path: Path to the audio file.
+        :param model_size: Model size to use (None = default).
+        """
+        model = self.registry.get(model_size)
+        result = model.transcribe(file_path, fp16=False)
+        return result["text"]
+
+    def transcribe_batch(self, audio_list, model_size=None):
         """
-        result = self.model.transcribe(file_path, fp16=False)
-        return result["text"]
\ No newline at end of file
+        Transcribe several audio arrays with one padded encoder/decoder pass.
+
+        Whisper pads every input to a 30s window anyway, so segments up to 30s are stacked
+        into a single mel batch and decoded together. Longer inputs need Whisper's sliding
+        window and are transcribed one by one.
+
+        :param audio_list: List of float32 NumPy arrays sampled at 16 kHz.
+        :param model_size: Model size to use for the whole batch (None = default).
+        :return: List of transcription strings in the same order.
+        """
+        model = self.registry.get(model_size)
+        results = [None] * len(audio_list)
+
+        short_indices = []
+        for i, audio in enumerate(audio_list):
+            if len(audio) <= whisper.audio.N_SAMPLES:
+                short_indices.append(i)
+            else:
+                results[i] = model.transcribe(audio, fp16=False)["text"]
+
+        if short_indices:
+            mels = [
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(np.ascontiguousarray(audio_list[i], dtype=np.float32)),
+                    n_mels=model.dims.n_mels
+                )
+                for i in short_indices
+            ]
+            mel_batch = torch.stack(mels).to(model.device)
+            decoded = whisper.decode(model, mel_batch, whisper.DecodingOptions(fp16=False))
+            for i, result in zip(short_indices, decoded):
+                results[i] = result.text
+
+        return results
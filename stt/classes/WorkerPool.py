@@ -0,0 +1,253 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def _worker_main(worker_index, cores, backend_name, backend_kwargs, max_batch_size, max_wait_ms,
+                 task_queue, result_queue):
+    """
+    Entry point of a worker process: loads its own model and transcribes the audio
+    it finds in shared memory, batching the tasks it receives.
+    """
+    if cores:
+        os.sched_setaffinity(0, cores)
+        # Keep the math libraries to the pinned cores (set before torch/CTranslate2 are imported).
+        os.environ["OMP_NUM_THREADS"] = str(len(cores))
+        os.environ["MKL_NUM_THREADS"] = str(len(cores))
+
+    from stt.classes.STTBackend import create_backend
+    from stt.classes.BatchScheduler import BatchScheduler
+
+    def on_batch(seconds, samples, batch_size):
+        # Decode timings go back to the front end, which owns the metrics.
+        result_queue.put(("batch", seconds, samples, batch_size))
+
+    backend = create_backend(backend_name, **backend_kwargs)
+    scheduler = BatchScheduler(backend.transcribe_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                               on_batch=on_batch)
+    print(f"[WorkerPool] Worker {worker_index} ready (pid {os.getpid()}, cores {sorted(cores) if cores else 'all'})")
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_id, shm_name, n_samples, key = task
+
+        # Read the audio straight out of the shared memory block, no copy.
+        shm = shared_memory.SharedMemory(name=shm_name)
+        audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf)
+
+        def on_done(future, task_id=task_id, shm=shm):
+            error = future.exception()
+            result_queue.put(("result", task_id, None if error else future.result(), str(error) if error else None))
+            shm.close()
+
+        scheduler.submit(audio, key).add_done_callback(on_done)
+        del audio
+
+    scheduler.stop()
+
+
+class WorkerPool:
+    """
+    Runs transcription in N worker processes, each with its own model and pinned to
+    its own subset of CPU cores, so inference is not limited by a single GIL.
+
+    Audio is handed over through shared memory: the front end copies each segment once
+    into a SharedMemory block and only its name goes through the task queue.
+    Tasks go to the worker with the fewest outstanding tasks; if a worker dies its tasks
+    fail and the worker is restarted, with exponential backoff while it keeps dying without
+    finishing a task. After MAX_CONSECUTIVE_FAILURES such deaths the pool reports itself
+    unhealthy (`is_healthy`), but keeps retrying.
+    """
+
+    CHECK_INTERVAL_SEC = 1.0        # How often worker liveness is checked
+    RESTART_BACKOFF_SEC = 1.0       # Delay before restarting a dead worker, doubled per consecutive failure
+    MAX_RESTART_BACKOFF_SEC = 60.0  # Upper bound of that delay
+    MAX_CONSECUTIVE_FAILURES = 5    # Deaths without a finished task before the pool is unhealthy
+
+    def __init__(self, num_workers, backend="whisper", backend_kwargs=None, max_batch_size=8, max_wait_ms=20,
+                 cores_per_worker=None, on_batch=None):
+        """
+        :param num_workers: Number of worker processes.
+        :param backend: Backend name passed to create_backend in every worker.
+        :param backend_kwargs: Keyword arguments for the backend (model size, memory budget, ...).
+        :param max_batch_size: Maximum batch size inside each worker.
+        :param max_wait_ms: Batching window inside each worker.
+        :param cores_per_worker: CPU cores pinned to each worker (default: available cores split evenly).
+        :param on_batch: Optional callable(seconds, samples, batch_size) called for every batch a worker decoded.
+        """
+        self.num_workers = num_workers
+        self.backend = backend
+        self.backend_kwargs = backend_kwargs or {}
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.on_batch = on_batch
+        self.worker_cores = self._plan_cores(num_workers, cores_per_worker)
+
+        # "spawn" gives every worker a clean interpreter (no forked torch/gRPC threads).
+        self._context = multiprocessing.get_context("spawn")
+        self._result_queue = self._context.Queue()
+        self._task_queues = [self._context.Queue() for _ in range(num_workers)]
+        self._processes = [None] * num_workers
+
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._tasks = {}                                   # task_id -> (worker index, Future, SharedMemory)
+        self._outstanding = [0] * num_workers
+        self._failures = [0] * num_workers                 # deaths since the worker last finished a task
+        self._restart_at = {}                              # dead worker index -> when to restart it
+        self._stop_event = threading.Event()
+
+        for index in range(num_workers):
+            self._start_worker(index)
+        self._result_thread = threading.Thread(target=self._collect_results, daemon=True)
+        self._result_thread.start()
+
+    @staticmethod
+    def _plan_cores(num_workers, cores_per_worker):
+        if not hasattr(os, "sched_getaffinity"):
+            return [None] * num_workers
+        available = sorted(os.sched_getaffinity(0))
+        per_worker = cores_per_worker or max(1, len(available) // num_workers)
+        plan = []
+        for index in range(num_workers):
+            cores = available[index * per_worker:(index + 1) * per_worker]
+            # More workers than cores: share them round-robin.
+            plan.append(set(cores) if cores else {available[index % len(available)]})
+        return plan
+
+    def _start_worker(self, index):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self.worker_cores[index], self.backend, self.backend_kwargs, self.max_batch_size,
+                  self.max_wait_ms, self._task_queues[index], self._result_queue),
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+
+    def submit(self, audio_data, key=None) -> Future:
+        """
+        Copy `audio_data` into shared memory and queue it on the least busy worker.
+        :return: a Future resolving to the transcription string.
+        """
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, audio_data.nbytes))
+        np.ndarray(audio_data.shape, dtype=np.float32, buffer=shm.buf)[:] = audio_data
+
+        future = Future()
+        with self._lock:
+            available = [i for i in range(self.num_workers) if i not in self._restart_at]
+            if not available:
+                shm.close()
+                shm.unlink()
+                future.set_exception(RuntimeError("No STT worker is running (all are waiting to restart)"))
+                return future
+            task_id = next(self._task_ids)
+            index = min(available, key=lambda i: self._outstanding[i])
+            self._outstanding[index] += 1
+            self._tasks[task_id] = (index, future, shm)
+            task_queue = self._task_queues[index]
+        task_queue.put((task_id, shm.name, len(audio_data), key))
+        return future
+
+    def transcribe(self, audio_data, key=None, timeout=None) -> str:
+        """
+        Blocking helper: submit `audio_data` and wait for its transcription.
+        :param timeout: Seconds to wait before giving up with TimeoutError (None = no limit).
+        """
+        return self.submit(audio_data, key).result(timeout)
+
+    def _finish(self, task_id, result=None, error=None):
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return
+            index, future, shm = task
+            self._outstanding[index] -= 1
+            if error is None:
+                self._failures[index] = 0
+
+        shm.close()
+        shm.unlink()
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(result)
+
+    def _collect_results(self):
+        last_check = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                message = self._result_queue.get(timeout=self.CHECK_INTERVAL_SEC)
+                if message[0] == "batch":
+                    if self.on_batch is not None:
+                        self.on_batch(*message[1:])
+                else:
+                    self._finish(*message[1:])
+            except queue.Empty:
+                pass
+            # Checked on a timer, not only when the queue is idle: under load the other workers
+            # keep results coming, and a dead worker's tasks would otherwise never fail.
+            if time.monotonic() - last_check >= self.CHECK_INTERVAL_SEC:
+                self._check_workers()
+                last_check = time.monotonic()
+
+    def is_healthy(self):
+        """
+        False once a worker has died MAX_CONSECUTIVE_FAILURES times without finishing a task
+        (e.g. its model cannot be loaded), until it finishes one again.
+        """
+        with self._lock:
+            return max(self._failures) < self.MAX_CONSECUTIVE_FAILURES
+
+    def _check_workers(self):
+        """
+        Fail the tasks of dead workers, and restart them once their backoff has passed.
+        """
+        now = time.monotonic()
+        for index, process in enumerate(self._processes):
+            if self._stop_event.is_set():
+                return
+            if index in self._restart_at:
+                if now >= self._restart_at[index]:
+                    self._start_worker(index)
+                    with self._lock:
+                        del self._restart_at[index]
+                continue
+            if process.is_alive():
+                continue
+
+            # Swap the queue under the lock: every task queued on the old one is in `lost`, and
+            # no later one is routed to this worker until it has been restarted.
+            with self._lock:
+                lost = [task_id for task_id, task in self._tasks.items() if task[0] == index]
+                self._task_queues[index] = self._context.Queue()
+                self._failures[index] += 1
+                failures = self._failures[index]
+                delay = min(self.MAX_RESTART_BACKOFF_SEC, self.RESTART_BACKOFF_SEC * 2 ** (failures - 1))
+                self._restart_at[index] = now + delay
+            print(f"[WorkerPool] Worker {index} died (exit code {process.exitcode}), restarting in {delay:.1f}s")
+            if failures == self.MAX_CONSECUTIVE_FAILURES:
+                print(f"[WorkerPool] Worker {index} died {failures} times in a row; pool is unhealthy")
+            for task_id in lost:
+                self._finish(task_id, error=f"Worker {index} died")
+
+    def stop(self):
+        self._stop_event.set()
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+        with self._lock:
+            remaining = list(self._tasks)
+        for task_id in remaining:
+            self._finish(task_id, error="Worker pool stopped")
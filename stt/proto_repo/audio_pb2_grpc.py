@@ -39,6 +39,11 @@ class AudioStreamStub(object):
                 request_serializer=audio__pb2.AudioChunk.SerializeToString,
                 response_deserializer=audio__pb2.STTResponse.FromString,
                 _registered_method=True)
+        self.StreamAudioV2 = channel.stream_stream(
+                '/AudioStream/StreamAudioV2',
+                request_serializer=audio__pb2.AudioChunkV2.SerializeToString,
+                response_deserializer=audio__pb2.STTResponse.FromString,
+                _registered_method=True)
 
 
 class AudioStreamServicer(object):
@@ -50,6 +55,12 @@ class AudioStreamServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamAudioV2(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_AudioStreamServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +69,11 @@ def add_AudioStreamServicer_to_server(servicer, server):
                     request_deserializer=audio__pb2.AudioChunk.FromString,
                     response_serializer=audio__pb2.STTResponse.SerializeToString,
             ),
+            'StreamAudioV2': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamAudioV2,
+                    request_deserializer=audio__pb2.AudioChunkV2.FromString,
+                    response_serializer=audio__pb2.STTResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'AudioStream', rpc_method_handlers)
@@ -95,3 +111,30 @@ class AudioStream(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamAudioV2(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/AudioStream/StreamAudioV2',
+            audio__pb2.AudioChunkV2.SerializeToString,
+            audio__pb2.STTResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
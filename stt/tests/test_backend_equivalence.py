@@ -0,0 +1,56 @@
+"""
+Transcripts of the whisper and faster-whisper backends must agree on the same audio.
+
+Needs both engines, ffmpeg and real speech, so it is skipped where they are missing:
+    STT_EQUIVALENCE_AUDIO=a.mp3:b.wav python -m pytest stt/tests
+Audio files default to client/resources/phone_call_example.mp3 (a list separated by os.pathsep);
+STT_EQUIVALENCE_MODEL picks the model size (default tiny) and STT_EQUIVALENCE_MAX_WER the
+largest word error rate allowed between the backends (default 0.1).
+"""
+import os
+
+import pytest
+
+from stt.check_backend_equivalence import word_error_rate
+
+DEFAULT_AUDIO = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             "client", "resources", "phone_call_example.mp3")
+AUDIO_FILES = [path for path in os.environ.get("STT_EQUIVALENCE_AUDIO", DEFAULT_AUDIO).split(os.pathsep) if path]
+MODEL_SIZE = os.environ.get("STT_EQUIVALENCE_MODEL", "tiny")
+MAX_WER = float(os.environ.get("STT_EQUIVALENCE_MAX_WER", "0.1"))
+
+
+def test_word_error_rate():
+    assert word_error_rate("Hello, world.", "hello world") == 0.0
+    assert word_error_rate("the cat sat", "the cat sat down") == pytest.approx(1 / 3)
+    assert word_error_rate("the cat sat", "a dog sat") == pytest.approx(2 / 3)
+    assert word_error_rate("", "") == 0.0
+    assert word_error_rate("", "noise") == 1.0
+
+
+@pytest.fixture(scope="module")
+def backends():
+    pytest.importorskip("whisper")
+    pytest.importorskip("faster_whisper")
+    from stt.classes.STTBackend import create_backend
+    return {
+        "whisper": create_backend("whisper", model_size=MODEL_SIZE),
+        "faster-whisper": create_backend("faster-whisper", model_size=MODEL_SIZE),
+    }
+
+
+@pytest.mark.parametrize("path", AUDIO_FILES)
+def test_backends_agree(backends, path):
+    if not os.path.isfile(path):
+        pytest.skip(f"Audio file {path} not found (set STT_EQUIVALENCE_AUDIO)")
+    import whisper
+
+    # Decode once (16 kHz mono float32) so both backends see exactly the same samples.
+    audio = whisper.load_audio(path)
+    transcripts = {name: backend.transcribe(audio) for name, backend in backends.items()}
+
+    assert transcripts["whisper"].strip(), f"whisper produced no text for {path}"
+    wer = word_error_rate(transcripts["whisper"], transcripts["faster-whisper"])
+    assert wer <= MAX_WER, (f"WER between backends {wer:.3f} > {MAX_WER} for {path}\n"
+                            f"whisper: {transcripts['whisper'].strip()}\n"
+                            f"faster-whisper: {transcripts['faster-whisper'].strip()}")